@@ -4,6 +4,7 @@ import numpy.fft as nfft
 from scipy.signal import butter, sosfiltfilt
 
 m = importlib.import_module('app')
+dc = importlib.import_module('dsp_core')
 SR = m.SR
 
 def make_noise(sr, sec=2.0, amp=0.08):
@@ -72,7 +73,7 @@ both = build(quality_tier='standard', bg_file=ir_wav, room_ir_file=ir_wav, room_
              bg_ir_file=ir_wav, bg_ir_gain_db=100.0, normalize_output=False)
 bgonly = build(quality_tier='standard', bg_file=ir_wav, room_ir_file=None,
                bg_ir_file=ir_wav, bg_ir_gain_db=100.0, normalize_output=False)
-pc1, sc1 = m.process_audio(in_wav, *both); pc2, sc2 = m.process_audio(in_wav, *bgonly)
+pc1, sc1 = m.process_audio(in_wav, *both, seed=3); pc2, sc2 = m.process_audio(in_wav, *bgonly, seed=3)
 _, y1 = read(pc1); _, y2 = read(pc2)
 L3 = min(len(y1), len(y2)); d = float(np.max(np.abs(y1[:L3]-y2[:L3]))) if L3>0 else 0.0
 okC = d < 1e-6 and ('IR:BG only' in sc1)
@@ -86,6 +87,487 @@ pbg, sdbg = m.process_audio(in_wav, *bgstat)
 okD = (wav_dec.size>0) and ogg_ok and (('BG:'+os.path.basename(ir_wav)) in sdbg)
 results.append(("D_bg_decode_status", okD, f"status={sdbg}"))
 
+# E) Envelope engine: vectorized kernel matches the per-sample reference loop
+sr_e, xe = read(in_wav)
+xe = np.concatenate([xe, np.zeros(SR//2, np.float32), xe*4.0])   # attack, silence tail, hot re-attack
+ref_e = m._env_ar_python(np.abs(xe), 720, 16800)
+err_np = float(np.max(np.abs(m._env_ar_numpy(np.abs(xe), 720, 16800) - ref_e)))
+err_auto = float(np.max(np.abs(m._env_ar(np.abs(xe), 720, 16800) - ref_e)))
+ride_e = np.empty(SR*2); ge = 0.1   # input riding the detector state, so the branch mask never settles
+for i in range(len(ride_e)):
+    ride_e[i] = ge * (1.0 + (1e-15 if i & 1 else -1e-15))
+    ge = (1 - 1/720)*ge + ride_e[i]/720 if ride_e[i] > ge else (1 - 1/16800)*ge + ride_e[i]/16800
+err_ride = float(np.max(np.abs(m._env_ar_numpy(ride_e, 720, 16800) - m._env_ar_python(ride_e, 720, 16800))))
+okE = max(err_np, err_auto) < 1e-6 * float(ref_e.max()) and err_ride < 1e-9
+results.append(("E_env_follow_parity", okE, f"maxerr numpy={err_np:.2e}, auto={err_auto:.2e}, riding={err_ride:.2e}"))
+
+# F) Leveler: every selectable envelope engine matches the pure-Python loop
+prev_eng = m.set_env_engine('python')
+lev_ref = {a: m.leveler(xe, a) for a in (0.35, 0.45, 0.55, 1.0)}
+lev_err = {}
+for eng in ('numpy', 'numba', 'auto'):
+    m.set_env_engine(eng)
+    lev_err[eng] = max(float(np.max(np.abs(m.leveler(xe, a) - r))) for a, r in lev_ref.items())
+m.set_env_engine(prev_eng)
+okF = max(lev_err.values()) < 1e-5
+results.append(("F_leveler_engine_parity", okF, ", ".join(f"{k}={v:.2e}" for k, v in lev_err.items())))
+
+# G) Decoded-asset cache: second load is a hit, rewriting the file invalidates, budget evicts
+m.ASSET_CACHE.clear(); st0 = m.asset_cache_stats()
+a1 = m.load_bed_cached(ir_wav); a2 = m.load_bed_cached(ir_wav)
+st1 = m.asset_cache_stats()
+sf.write(ir_wav, np.concatenate([sf.read(ir_wav, dtype='float32')[0], np.zeros(480, np.float32)]), 48000)
+a3 = m.load_bed_cached(ir_wav); st2 = m.asset_cache_stats()
+prev_budget = st2['budget'] / (1024*1024)
+m.ASSET_CACHE.set_budget(a3.nbytes / (1024*1024) * 1.5); m.load_event_cached(ir_wav); st3 = m.asset_cache_stats()
+m.ASSET_CACHE.set_budget(prev_budget)
+okG = (a1 is a2 and not a1.flags.writeable and st1['hits'] - st0['hits'] == 1
+       and len(a3) == len(a1) + 480 and st2['misses'] - st1['misses'] == 1
+       and st3['evictions'] >= 1 and st3['bytes'] <= st3['budget'])
+results.append(("G_asset_cache", okG, f"stats={st3}"))
+
+# H) IR store + partitioned overlap-save: matches fftconvolve, second use is a store hit
+from scipy.signal import fftconvolve
+ir_h = m.ir_load_cached(ir_wav)
+xh = np.concatenate([xe, xe[:12345]])
+ref_h = fftconvolve(xh, ir_h, mode='full')[:len(xh)]
+errs_h = [float(np.max(np.abs(m.ols_convolve(xh, m._ir_partitions(ir_h, B), B, chunk=B*3) - ref_h))) for B in (512, 4096)]
+h0 = m.IR_STORE.stats()['hits']; wet_h = m.convolve_ir(xh, ir_wav, 100.0); h1 = m.IR_STORE.stats()['hits']
+m.convolve_ir(xh, ir_wav, 100.0); h2 = m.IR_STORE.stats()['hits']
+err_wet = float(np.max(np.abs(wet_h - ref_h)))
+okH = max(errs_h + [err_wet]) < 1e-4 * float(np.max(np.abs(ref_h))) and h2 - h1 >= 2 and len(wet_h) == len(xh)
+results.append(("H_ir_store_ols", okH, f"maxerr={max(errs_h + [err_wet]):.2e}, store={m.IR_STORE.stats()}"))
+
+# I) Opus backends: same length/alignment as the file round trip, content-hash cache hit
+ti = np.arange(SR*2) / SR
+xi = (0.3*np.sin(2*np.pi*220*ti)*(0.5+0.5*np.sin(2*np.pi*2*ti))).astype(np.float32)
+ref_i, _ = m.opus_codec(xi, 16.0, SR, backend='file')
+info_i = []; okI = True
+for b in ('opuslib', 'pipe'):
+    yi, used = m.opus_codec(xi, 16.0, SR, backend=b)
+    if yi is None: info_i.append(f"{b}=n/a"); continue
+    corr = float(np.corrcoef(xi, yi)[0, 1]); info_i.append(f"{b} corr={corr:.3f}")
+    okI &= len(yi) == len(xi) and corr > 0.95
+hits0 = m.OPUS_CACHE.stats()['hits']; m.opus_codec(xi.copy(), 16.0, SR); hits1 = m.OPUS_CACHE.stats()['hits']
+okI &= (ref_i is None or len(ref_i) == len(xi)) and (hits1 - hits0 == 1 or ref_i is None)
+results.append(("I_opus_backends", okI, ", ".join(info_i) + f", file={'ok' if ref_i is not None else 'n/a'}"))
+
+# J) Streaming render: block-by-block output matches the whole-buffer render (deterministic chain)
+xj = np.tile(xe, 4)[:int(SR*12.5)]                   # > 2 stream blocks of 5.12 s
+j_wav = tempfile.NamedTemporaryFile(delete=False, suffix='.wav').name
+sf.write(j_wav, xj, SR, subtype='FLOAT')
+errs_j = {}
+for tier, norm in (('bad_landline', True), ('ultra_high', False)):
+    argj = build(quality_tier=tier, leveler_amt=0.5, src_hpf=80.0, room_ir_file=ir_wav, room_ir_gain_db=40.0,
+                 bg_file=ir_wav, bg_hpf=120.0, bg_lpf=3000.0, handset_ir_file=ir_wav, handset_ir_gain_db=30.0,
+                 dropout_prob=0.0, jitter_intensity=0.0, rf_amt=0.0, normalize_output=norm)
+    pw, sw = m.process_audio(j_wav, *argj, seed=1)
+    ps, ss = m.process_audio_stream(j_wav, *argj, block_s=5.0, seed=1)
+    _, yw = read(pw); _, ys = read(ps)
+    errs_j[tier] = float(np.max(np.abs(yw - ys))) if len(yw) == len(ys) and ss == sw + ' · Streamed' else float('inf')
+import pyloudnorm as pyln   # streamed meter: own K-weighting biquads, same reading as pyloudnorm's Meter
+sl_j = m._StreamLoudness(SR)
+for i in range(0, len(xj), 12345): sl_j.add(xj[i:i+12345])
+errs_j['lufs'] = abs(sl_j.integrated() - pyln.Meter(SR).integrated_loudness(xj))
+okJ = max(errs_j.values()) < 1e-4
+results.append(("J_stream_render_parity", okJ, ", ".join(f"{k}={v:.2e}" for k, v in errs_j.items())))
+
+# K) Batch CLI: inputs × preset through the pool, JSONL report, resume re-renders only what is missing,
+#    same-named reads from different folders get separate outputs
+import json, voicelab_batch as vb
+k_dir = tempfile.mkdtemp(); k_out = os.path.join(k_dir, 'out')
+k_in = [os.path.join(k_dir, f'read{i}.wav') for i in range(2)] + [os.path.join(k_dir, 'sub', 'read0.wav')]
+os.makedirs(os.path.join(k_dir, 'sub'))
+for p in k_in: sf.write(p, xe[:SR*2], SR)
+k_preset = next(iter(m.BOJAN_PRESET_CONFIGS))
+jobs_k = vb.load_jobs([os.path.join(k_dir, '*.wav'), os.path.join(k_dir, 'sub', '*.wav')], None, [k_preset])
+sum1 = vb.run(jobs_k, k_out, workers=2, log=lambda *_: None)
+recs = [json.loads(l) for l in open(os.path.join(k_out, vb.REPORT), encoding='utf-8')]
+os.remove(recs[0]['output'])
+sum2 = vb.run(jobs_k, k_out, workers=2, resume=True, log=lambda *_: None)
+okK = (len(jobs_k) == 3 and sum1['rendered'] == 3 and all(r['ok'] and os.path.exists(r['output']) for r in recs[1:])
+       and len({r['output'] for r in recs}) == 3 and all(r['audio_s'] == 2.0 for r in recs)
+       and sum2['rendered'] == 1 and sum2['skipped'] == 2 and sum1['renders_per_min'] > 0)
+results.append(("K_batch_cli_resume", okK, f"run1={sum1}, resume={sum2}"))
+
+# L) Seeded renders: every stochastic stage on, same seed → bit-identical, new seed → different take
+argl = build(quality_tier='low', bg_file=[ir_wav, in_wav], traffic_files=[ir_wav], traffic_ev_min=30.0, dropout_prob=0.3,
+             garble_prob=0.3, stutter_amt=0.05, jitter_intensity=0.2, buffer_prob=0.3, reorder_prob=0.1,
+             codec_type='amr_nb', codec_intensity=0.5, mic_type='car', mic_proximity=0.5, mp3_amt=0.3, rf_amt=0.3)
+m.RENDER_CACHE.set_budget(0)  # real re-renders, not cache hits
+yl = [read(m.process_audio(in_wav, *argl, seed=s)[0])[1] for s in (7, 7, 8)]
+ys = [read(m.process_audio_stream(in_wav, *argl, block_s=0.5, seed=7)[0])[1] for _ in range(2)]
+m.RENDER_CACHE.set_budget(m.RENDER_CACHE_MB)
+same_l = max(float(np.max(np.abs(yl[0] - yl[1]))), float(np.max(np.abs(ys[0] - ys[1]))))
+diff_l = float(np.max(np.abs(yl[0] - yl[2])))
+okL = same_l == 0.0 and diff_l > 1e-3
+results.append(("L_seeded_render", okL, f"same seed maxdiff={same_l:.1e}, other seed maxdiff={diff_l:.2e}"))
+
+# M) Render cache: seeded repeat is a hit with identical audio, param / asset change misses, LRU budget holds
+m.RENDER_CACHE.root = tempfile.mkdtemp(); m.RENDER_CACHE.set_budget(m.RENDER_CACHE_MB)
+h0 = m.render_cache_stats()['hits']
+pm1, sm1 = m.process_audio(in_wav, *argl, seed=11); pm2, sm2 = m.process_audio(in_wav, *argl, seed=11)
+_, sm3 = m.process_audio(in_wav, *build(**{**dict(zip(order, argl)), 'rf_amt': 0.31}), seed=11)
+sf.write(ir_wav, np.concatenate([sf.read(ir_wav, dtype='float32')[0], np.zeros(48, np.float32)]), 48000)
+_, sm4 = m.process_audio(in_wav, *argl, seed=11)
+_, sm5 = m.process_audio(in_wav, *argl)
+st_m = m.render_cache_stats()
+m.RENDER_CACHE.set_budget(os.path.getsize(pm1) * 1.5 / (1024*1024)); st_m2 = m.render_cache_stats()
+okM = (sm2.endswith(' · Cached') and not sm1.endswith('Cached') and pm1 != pm2
+       and np.array_equal(read(pm1)[1], read(pm2)[1]) and st_m['hits'] - h0 == 1
+       and not any(s.endswith('Cached') for s in (sm3, sm4, sm5)) and st_m['entries'] == 3
+       and st_m2['entries'] == 1 and st_m2['evictions'] >= 2)
+m.RENDER_CACHE.clear(); m.RENDER_CACHE.root = m.RENDER_CACHE_DIR
+results.append(("M_render_cache", okM, f"status={sm2}, stats={st_m2}"))
+
+# N) Stage profiling: status breakdown, per-stage records, one JSON log line per render, histogram
+import json, logging
+class _Grab(logging.Handler):
+    def __init__(self): super().__init__(); self.lines = []
+    def emit(self, r): self.lines.append(r.getMessage())
+grab = _Grab(); m.PROFILE_LOG.addHandler(grab); m.PROFILE_LOG.setLevel(logging.INFO)
+prev_prof = m.set_profiling(True); m.PROFILE_HIST.clear()
+_, sn = m.process_audio(in_wav, *argl)
+rep_n = m.last_render_profile()
+_, sn2 = m.process_audio_stream(in_wav, *argl, block_s=0.5)
+m.set_profiling(prev_prof); m.PROFILE_LOG.removeHandler(grab)
+hist_n = m.profile_histogram(); logged = [json.loads(l) for l in grab.lines]
+need_n = ("decode", "events", "phone_tier", "opus", "artifacts", "artifacts/garble", "artifacts/codec", "write")
+okN = (' · Profile ' in sn and ' · Profile ' in sn2 and all(k in rep_n['stages'] for k in need_n)
+       and rep_n['wall_s'] > 0 and rep_n['peak_mb'] > 0
+       and rep_n['stages']['render']['wall_s'] >= rep_n['stages']['artifacts']['wall_s'] >= rep_n['stages']['artifacts/garble']['wall_s']
+       and len(logged) == 2 and logged[0]['event'] == 'render_profile' and logged[1]['renderer'] == 'process_audio_stream'
+       and hist_n['render']['count'] == 2 and sum(hist_n['artifacts']['buckets'].values()) == 2
+       and m.last_render_profile() is not None and ' · Profile ' not in m.process_audio(in_wav, *argl)[1])
+results.append(("N_stage_profiling", okN, sn[sn.index(' · Profile'):] if ' · Profile' in sn else sn))
+
+# O) Batched garble: matches the per-window scipy resample on band-limited audio, rest untouched
+xo = m.hpf_lpf(np.random.default_rng(5).standard_normal(SR*3 + 1000).astype(np.float32) * 0.2, 300.0, 3400.0)
+gw = int(0.06 * SR)
+sel_o, fac_o = m._garble_plan(len(xo), 0.4, gw, np.random.default_rng(9))
+ref_o = m._garble_scipy(xo, sel_o, fac_o, gw); got_o = m._garble_batched(xo, sel_o, fac_o, gw)
+hit_o = np.zeros(len(xo), bool)
+for w in sel_o: hit_o[w*gw:(w+1)*gw] = True
+err_o = float(np.sqrt(np.mean((got_o[hit_o] - ref_o[hit_o])**2) / np.mean(ref_o[hit_o]**2)))
+g1 = m.apply_garble_old(xo, 0.4, SR, rng=np.random.default_rng(9))
+okO = (err_o < 1e-2 and np.array_equal(got_o[~hit_o], xo[~hit_o]) and got_o.dtype == np.float32
+       and len(got_o) == len(xo) and np.array_equal(g1, got_o) and (len(xo) - 1) // gw in set(sel_o.tolist()) | {-1})
+results.append(("O_garble_batched", okO, f"{len(sel_o)} windows, rel-rms vs scipy={err_o:.2e}"))
+
+# P) Dropout engine: grid mode matches the old chunk loop, events reproduce it, fades have no steps
+xp = np.random.default_rng(6).standard_normal(SR*4 + 777).astype(np.float32) * 0.3
+wp = int(40 * SR / 1000); ref_p = xp.copy(); rp = np.random.default_rng(4)
+for i in range(0, len(xp), wp):
+    if rp.random() < 0.3: ref_p[i:i+wp] = ref_p[i:i+wp] * (10 ** (-30 / 20.0))
+got_p, ev_p = m.apply_dropouts_old(xp, 0.3, 40.0, -30.0, rng=np.random.default_rng(4), return_events=True)
+again_p = m.apply_dropout_events(xp.copy(), ev_p, -30.0)
+ones = np.ones(SR * 2, np.float32)
+fd = m.apply_dropout_events(ones.copy(), [[1000, 9000], [5000, 20000], [40000, 40100]], -40.0, fade=240)
+step_db = float(np.max(np.abs(np.diff(20 * np.log10(fd[:30000])))))
+okP = (np.array_equal(got_p, ref_p) and np.array_equal(again_p, got_p) and ev_p.shape[1] == 2
+       and np.all(ev_p[1:, 0] > ev_p[:-1, 1]) and abs(fd[6000] - 1e-4) < 1e-7 and step_db < 0.2
+       and fd[0] == 1.0 and fd[-1] == 1.0)
+results.append(("P_dropout_engine", okP, f"{len(ev_p)} events, max fade step={step_db:.3f} dB"))
+
+# Q) Stutter / reorder gather maps: reorder matches the old packet-list loop, maps reproduce the audio
+xq = np.random.default_rng(7).standard_normal(SR*3 + 555).astype(np.float32)
+rq = np.random.default_rng(3); psz = int(rq.uniform(0.02, 0.04) * SR); out_q, buf_q = [], []
+for i in range(0, len(xq), psz):
+    pk = xq[i:i+psz]
+    if rq.random() < 0.5:
+        buf_q.append(pk)
+        if len(buf_q) >= 3 or rq.random() < 0.3: rq.shuffle(buf_q); out_q.extend(buf_q); buf_q = []
+        else: out_q.append(np.zeros_like(pk))
+    else:
+        if buf_q: rq.shuffle(buf_q); out_q.extend(buf_q); buf_q = []
+        out_q.append(pk)
+if buf_q: rq.shuffle(buf_q); out_q.extend(buf_q)
+ref_q = np.concatenate(out_q)[:len(xq)]
+got_q, map_q = m.apply_packet_reordering(xq, 0.5, SR, rng=np.random.default_rng(3), return_map=True)
+st_q, smap_q = m.apply_stutter_old(xq, 0.4, SR, rng=np.random.default_rng(3), return_map=True)
+runs_q = m.index_map_runs(smap_q)
+okQ = (np.array_equal(got_q, ref_q) and got_q.dtype == np.float32 and map_q.dtype == np.int32
+       and np.array_equal(m.reorder_index_map(len(xq), 0.5, SR, np.random.default_rng(3)), map_q)
+       and len(st_q) == len(xq) and np.array_equal(st_q, xq[smap_q]) and smap_q.min() == 0
+       and np.any(runs_q[1:, 1] <= runs_q[:-1, 1]) and runs_q[:, 2].sum() == len(xq)
+       and np.array_equal(m.apply_stutter_old(xq, 0.0), xq) and (map_q == -1).any())
+results.append(("Q_index_maps", okQ, f"reorder {len(m.index_map_runs(map_q))} runs, stutter {len(runs_q)} runs"))
+
+# R) Jitter / rebuffer: overlap-add matches the old chunk loop, batched stretches track the FFT resample
+xr = m.hpf_lpf(np.random.default_rng(8).standard_normal(SR*6 + 321).astype(np.float32) * 0.3, 300.0, 3400.0)
+rr = np.random.default_rng(2); mj = int(0.08 * SR * 0.3); jb = np.zeros(len(xr) + 2*mj, np.float32); ov = np.zeros_like(jb)
+for i in range(0, len(xr), int(0.02 * SR)):
+    ch = xr[i:i+int(0.02 * SR)]; pj = mj + i + int(rr.uniform(-mj, mj))
+    jb[pj:pj+len(ch)] += ch; ov[pj:pj+len(ch)] += 1.0
+ov[ov == 0] = 1.0; jb /= ov
+got_j = m.apply_jitter_buffering(xr, 0.3, 0.0, SR, rng=np.random.default_rng(2))
+plan_r = m._rebuffer_plan(len(xr), 1.0, SR, np.random.default_rng(4))
+ref_r = m._rebuffer_scipy(xr, *plan_r); got_r = m._rebuffer_batched(xr, *plan_r)
+touched = np.zeros(len(xr), bool)
+for s0, l0 in zip(plan_r[0], plan_r[1]): touched[s0:s0+l0] = True
+err_r = float(np.sqrt(np.mean((got_r - ref_r)**2) / np.mean(ref_r**2)))
+# heavy overlap (~40 events/s): waves are the plan-order overlap depth of the pairwise check, not one per
+# event; stretches stacked ~20 deep compound the interpolation error, hence the looser bound
+st_h, ln_h, f_h = m._rebuffer_plan(len(xr), 20.0, SR, np.random.default_rng(5)); en_h = st_h + ln_h
+wave_h = np.zeros(len(st_h), np.int64)
+for e in range(1, len(st_h)):
+    hit = (st_h[:e] < en_h[e]) & (en_h[:e] > st_h[e])
+    if hit.any(): wave_h[e] = wave_h[:e][hit].max() + 1
+ref_h = m._rebuffer_scipy(xr, st_h, ln_h, f_h)
+err_rh = float(np.sqrt(np.mean((m._rebuffer_batched(xr, st_h, ln_h, f_h) - ref_h)**2) / np.mean(ref_h**2)))
+okR = (np.array_equal(got_j, jb[mj:mj+len(xr)]) and err_r < 2e-2 and np.array_equal(got_r[~touched], xr[~touched])
+       and np.array_equal(m._rebuffer_waves(st_h, en_h), wave_h) and wave_h.max() + 1 < len(st_h) // 4 and err_rh < 5e-2
+       and got_r.dtype == np.float32 and len(m.apply_jitter_buffering(xr[:int(SR*0.2)], 0.2, 1.0, SR)) == int(SR*0.2))
+results.append(("R_jitter_engine", okR, f"{len(plan_r[0])} rebuffers, rel-rms vs scipy={err_r:.2e}; heavy overlap: "
+                                       f"{len(st_h)} rebuffers in {wave_h.max() + 1} waves, rel-rms={err_rh:.2e}"))
+
+# S) Opus pre-echo: ramp-kernel convolution matches the per-transient loop, shared envelope matches hilbert
+from scipy.signal import hilbert
+xs = (np.random.default_rng(9).standard_normal(SR*5) * 0.3).astype(np.float32)  # fast FFT length: no padding
+env_s = np.abs(hilbert(xs)); dif_s = np.diff(np.pad(env_s, (1, 0), 'edge')); tr_s = dif_s > np.std(dif_s) * 2
+ref_s = np.zeros_like(xs); ps = int(0.002 * SR)
+for i in np.flatnonzero(tr_s[ps:]) + ps: ref_s[i-ps:i] += xs[i] * 0.06 * env_s[i] * np.linspace(0, 1, ps)
+got_s = m.apply_codec_artifacts(xs, "opus", 0.6, SR) - xs
+err_s = float(np.sqrt(np.mean((got_s - ref_s)**2) / np.mean(ref_s**2)))
+okS = (err_s < 1e-4 and np.max(np.abs(m.analytic_envelope(xs) - env_s)) < 1e-5 and int(tr_s.sum()) > 1000
+       and m.analytic_envelope(xs[:SR + 1]).dtype == np.float32)
+results.append(("S_opus_pre_echo", okS, f"{int(tr_s.sum())} transients, rel-rms vs loop={err_s:.2e}"))
+
+# T) AMR-NB: polyphase 8 kHz round trip at a prime length keeps the length and stops at 4 kHz
+nt = SR*2 + 11  # 96011 is prime
+xt = np.random.default_rng(10).standard_normal(nt).astype(np.float32) * 0.3
+nb_t = m.narrowband_roundtrip(xt, SR)
+spec_t = np.abs(np.fft.rfft(nb_t))**2; fq_t = np.fft.rfftfreq(nt, 1/SR)
+leak_t = float(spec_t[fq_t > 4400].sum() / spec_t.sum())
+amr_t = m.apply_codec_artifacts(xt, "amr_nb", 0.5, SR, rng=np.random.default_rng(0))
+okT = (len(nb_t) == nt and leak_t < 1e-3 and len(amr_t) == nt and amr_t.dtype == np.float32
+       and np.isfinite(amr_t).all() and len(m.apply_codec_artifacts(xt[:100], "amr_nb", 0.5, SR)) == 100)
+results.append(("T_amr_polyphase", okT, f"n={nt}, energy above 4.4 kHz={leak_t:.1e}"))
+
+# U) Resampling service: streaming pieces join into the whole-signal result, filters are designed once
+xu = np.random.default_rng(11).standard_normal(44100 * 2 + 13).astype(np.float32)
+whole_u = m.resample_rate(xu, 44100, SR); sru = dc.StreamResampler(44100, SR); parts_u = []
+for i in range(0, len(xu), 7777): parts_u.append(sru(xu[i:i+7777]))
+stream_u = np.concatenate(parts_u + [sru(np.zeros(0, np.float32), final=True)])
+hits0 = m.resample_filter.cache_info().hits
+m.resample_rate(xu, 44100, SR); hits1 = m.resample_filter.cache_info().hits
+cust_u = dict(m.PHONE_QUALITY_TIERS["standard"], sample_rate_factor=0.37)
+tier_u, _ = m.apply_phone_quality_tier(xr[:SR + 3].copy(), "standard", cust_u, rng=np.random.default_rng(0))
+okU = (len(whole_u) == -(-len(xu) * 160 // 147) and np.array_equal(stream_u, whole_u) and hits1 == hits0 + 1
+       and len(tier_u) == SR + 3 and tier_u.dtype == np.float32 and np.isfinite(tier_u).all())
+results.append(("U_resample_service", okU, f"{len(parts_u)} stream blocks, filters cached: {m.resample_filter.cache_info().currsize}"))
+
+# V) SOS registry: fused HPF+LPF equals the two cascaded passes, designs are reused, block state carries
+from scipy.signal import butter, sosfilt, lfilter
+xv = xr[:SR * 2].copy()
+two_v = sosfilt(butter(4, 3400/(SR/2), output="sos"), sosfilt(butter(2, 300/(SR/2), btype="high", output="sos"), xv))
+h0 = m.design_sos.cache_info().hits
+fused_v = m.hpf_lpf(xv, 300.0, 3400.0); m.hpf_lpf(xv, 300.0, 3400.0)
+st_v = {}; blk_v = np.concatenate([m.hpf_lpf(xv[i:i+4096], 300.0, 3400.0, state=st_v) for i in range(0, len(xv), 4096)])
+car_v = lfilter(*butter(2, 5000/(SR/2)), lfilter(*butter(2, 150/(SR/2), btype="high"), xv))  # old lfilter path
+got_car = m.apply_mic_proximity_effects(xv, 0.0001, "car", SR, rng=np.random.default_rng(0))
+okV = (np.array_equal(fused_v, two_v.astype(np.float32)) and np.array_equal(blk_v, fused_v)
+       and m.hpf_lpf_sos(300.0, 3400.0).shape == (3, 6) and m.design_sos.cache_info().hits >= h0
+       and np.max(np.abs(got_car - car_v)) < 1e-3 and len(m.hpf_lpf_sos(0.0, SR/2)) == 0)
+results.append(("V_sos_registry", okV, f"designs cached: {m.design_sos.cache_info().currsize}, chains: {m.sos_chain.cache_info().currsize}"))
+
+# W) Fused μ-law kernels: every engine matches the original encode/decode + grit formulas; in place the
+#    only allocation is block scratch
+import tracemalloc
+yw = m.hpf_lpf(xr[:SR * 3].copy() * 3.0, 300.0, 3400.0); vw = m._zphf(yw, 300.0, 2400.0)
+ref_w = m._mulaw_curve(m._prelimit(vw, 0.707), 0.6, 255.0, 0.75) + (yw - vw)
+grit_w = ((1.0 - 0.1) * yw + 0.1 * np.sign(yw) * np.log1p(255.0 * np.abs(yw)) / np.log1p(255.0)).astype(np.float32)
+err_w = {}
+for eng in ('numpy', 'numexpr', 'numba'):
+    prev_w = m.set_mulaw_engine(eng)
+    col = m.apply_mulaw_color(vw.copy(), 0.6, drive=0.75, base=yw)
+    err_w[m.mulaw_engine()] = max(float(np.max(np.abs(col - ref_w))), float(np.max(np.abs(m.mulaw_grit_into(yw, 0.1) - grit_w))))
+    m.set_mulaw_engine(prev_w)
+vb_w = vw.copy(); tracemalloc.start()
+inpl = m.apply_mulaw_color(vb_w, 0.6, drive=0.75, base=yw, out=vb_w); m.mulaw_grit_into(inpl, 0.1, out=inpl)
+peak_w = tracemalloc.get_traced_memory()[1]; tracemalloc.stop()
+okW = (max(err_w.values()) < 1e-6 and inpl is vb_w and inpl.dtype == np.float32 and peak_w <= 2 * 4 * m.MULAW_BLOCK + 4096
+       and np.max(np.abs(inpl - m.mulaw_grit_into(ref_w.astype(np.float32), 0.1))) < 1e-6)
+results.append(("W_mulaw_fused", okW, ", ".join(f"{k}={v:.1e}" for k, v in err_w.items()) + f", peak={peak_w/1024:.0f} KiB"))
+
+# X) float32 contract: no profiled stage hands float64 on, across tiers, codecs and mic types
+prev_x = m.set_dtype_check(True); m.RENDER_CACHE.set_budget(0)
+for tier, codec, mic in (('low', 'amr_nb', 'car'), ('bad_landline', 'amr_wb', 'speakerphone'),
+                         ('standard', 'opus', 'headset'), ('high', 'evs', 'handset')):
+    argx = build(quality_tier=tier, codec_type=codec, codec_intensity=0.5, mic_type=mic, mic_proximity=0.7,
+                 bg_file=ir_wav, dropout_prob=0.3, garble_prob=0.3, stutter_amt=0.05, jitter_intensity=0.2,
+                 buffer_prob=0.3, reorder_prob=0.1, mp3_amt=0.3, rf_amt=0.3, post_mu_grit=0.1, leveler_amt=0.5)
+    m.process_audio(in_wav, *argx, seed=3); m.process_audio_stream(in_wav, *argx, block_s=0.5, seed=3)
+viol_x = m.dtype_violations(); m.set_dtype_check(prev_x); m.RENDER_CACHE.set_budget(m.RENDER_CACHE_MB)
+xx = xr[:SR]
+helpers_x = {"hpf_lpf": m.hpf_lpf(xx, 300.0, 3400.0), "hpf_lpf_zp": m.hpf_lpf(xx, 300.0, 3400.0, zero_phase=True),
+             "resample": m.resample_rate(xx, SR, 8000), "stream_resample": dc.StreamResampler(SR, 16000)(xx, final=True),
+             "soft_clip": m._soft_clip(xx), "box": m._box_same(np.abs(xx), 240), "sine": m._sine(len(xx), 200.0, 0.1),
+             "gauss": m._gauss(np.random.default_rng(0), len(xx), 0.1), "mic_car": m.apply_mic_proximity_effects(xx, 0.5, "car")}
+bad_x = {k: str(v.dtype) for k, v in helpers_x.items() if v.dtype != np.float32}
+okX = not viol_x and not bad_x
+results.append(("X_float32_contract", okX, f"stage violations={viol_x}, helper dtypes={bad_x}"))
+
+# Y) Shared-STFT cleanup: the in-spectrogram gate reproduces noisereduce, WPE blends like the separate
+#    stage, and a profiled render reports the transforms it saved
+import noisereduce  # noqa: F401 — reference for the gate
+ny = np.random.default_rng(11).standard_normal(len(xe)).astype(np.float32) * 0.02
+yy = xe + ny
+ref_y = m.dereverb_strong_chained(yy, 1.0); gate_y, _ = m.cleanup_shared_stft(yy, 0.0, 1.0)
+gate_err = float(np.max(np.abs(gate_y - ref_y)))
+wpe_y, wpe_ok = m.cleanup_shared_stft(yy, 0.5, 0.0)
+if wpe_ok:
+    sep_y = 0.5 * yy + 0.5 * m.wpe_dereverb(yy)[0]
+    wpe_err = float(np.max(np.abs(wpe_y - sep_y)[m.CLEANUP_NPERSEG:-m.CLEANUP_NPERSEG]))
+else:
+    wpe_err = 0.0
+prev_y = m.set_profiling(True); m.RENDER_CACHE.set_budget(0)
+m.process_audio(in_wav, *build(quality_tier='standard', wpe_strength=0.7, dereverb_amt=1.5, bg_file=None))
+cnt_y = (m.last_render_profile() or {}).get("counters", {}); stg_y = (m.last_render_profile() or {}).get("stages", {})
+m.set_profiling(prev_y); m.RENDER_CACHE.set_budget(m.RENDER_CACHE_MB)
+okY = (gate_err < 1e-4 and wpe_err < 1e-4 and cnt_y.get("stft_transforms") == 2
+       and cnt_y.get("stft_transforms_saved") == (2 if wpe_ok else 0)
+       and "cleanup/cleanup_stft" in stg_y and stg_y["cleanup"]["wall_s"] >= stg_y["cleanup/cleanup_stft"]["wall_s"])
+results.append(("Y_shared_stft_cleanup", okY, f"gate err={gate_err:.1e}, wpe={'on' if wpe_ok else 'n/a'} "
+                                              f"err={wpe_err:.1e}, counters={cnt_y}"))
+
+# Z) Single calibrated gate: dereverb amounts above 1.0 approximate the chained reduce_noise passes
+#    on reverberant voiced speech (error grows with amount), with one gate mask whatever the amount
+rz = np.random.default_rng(12); tz = np.arange(SR*4) / SR
+phz = 2*np.pi*np.cumsum(120.0 + 40.0*np.sin(2*np.pi*0.3*tz)) / SR
+vz = sum(np.sin(k*phz)/k for k in range(1, 30)) * (0.5 + 0.5*np.sin(2*np.pi*3.5*tz))**2
+vz *= (rz.random(len(tz)//4800 + 1) > 0.3).repeat(4800)[:len(tz)]
+irz = rz.standard_normal(SR//2) * np.exp(-np.arange(SR//2) / (0.08*SR)) * 0.05; irz[0] = 1.0
+yz = (np.convolve(0.1*vz, irz)[:len(tz)] + rz.standard_normal(len(tz))*0.01).astype(np.float32)
+par_z = {}
+for amt in (1.2, 2.0, 3.0):
+    a, b = m.dereverb_strong(yz, amt), m.dereverb_strong_chained(yz, amt)
+    par_z[amt] = (float(np.mean(a**2) / np.mean(b**2)), float(np.sqrt(np.mean((a - b)**2) / np.mean(b**2))))
+masks_z = []; _mask_z = m.spectral_gate_mask
+m.spectral_gate_mask = lambda *a, **kw: (masks_z.append(1), _mask_z(*a, **kw))[1]
+try:
+    for amt in (1.0, 1.2, 3.0): m.dereverb_strong(yz, amt)
+finally:
+    m.spectral_gate_mask = _mask_z
+okZ = (all(0.9 < e < 1.1 for e, _ in par_z.values()) and par_z[1.2][1] < 0.03
+       and par_z[2.0][1] < 0.18 and par_z[3.0][1] < 0.28 and len(masks_z) == 3)
+results.append(("Z_single_gate_parity", okZ, "energy/rel.err " + ", ".join(f"{k:g}: {e:.3f}/{d:.3f}" for k, (e, d) in par_z.items())
+                                              + f", masks for 3 renders={len(masks_z)}"))
+
+# AA) Chunked WPE: one block reproduces nara_wpe's offline estimate, overlapping blocks stay close
+#     to it, and splitting the bins over threads does not change a sample
+Ya = m._cleanup_stft(yz)
+blk_a = m.wpe_chunked(Ya, 2, block=512, overlap=64)
+thr_a = m.wpe_chunked(Ya, 2, workers=3, block=512, overlap=64)
+try:
+    from nara_wpe import wpe as nara_a
+    ref_a = nara_a.wpe(Ya[:, None, :], taps=12, delay=3, iterations=2)[:, 0, :]
+    one_a = float(np.max(np.abs(m.wpe_chunked(Ya, 2) - ref_a)) / np.max(np.abs(ref_a)))
+    blk_err_a = float(np.linalg.norm(blk_a - ref_a) / np.linalg.norm(ref_a))
+    in_err_a = float(np.linalg.norm(Ya - ref_a) / np.linalg.norm(ref_a))
+except ImportError:
+    one_a = blk_err_a = 0.0; in_err_a = 1.0
+okAA = one_a < 1e-5 and blk_err_a < 0.75 * in_err_a and np.array_equal(blk_a, thr_a) and blk_a.dtype == Ya.dtype
+results.append(("AA_wpe_chunked", okAA, f"one block vs nara={one_a:.1e}, blocks vs nara={blk_err_a:.3f} (input {in_err_a:.3f}), "
+                                       f"threads identical={np.array_equal(blk_a, thr_a)}"))
+
+# AB) Online noise estimate: push-mode denoising is block-size invariant, clears steady noise and
+#     keeps speech; with the online engine a streamed render cleans in one causal pass, so its
+#     output no longer depends on the stream block size
+nb = (np.random.default_rng(13).standard_normal(SR*6) * 0.01).astype(np.float32)
+den_b = m.OnlineDenoiser(1.0)
+push_b = np.concatenate([den_b(yz[i:i+7777], final=i+7777 >= len(yz)) for i in range(0, len(yz), 7777)])
+whole_b = m.denoise_online(yz, 1.0)
+push_err = float(np.max(np.abs(push_b - whole_b))) if len(push_b) == len(yz) else float('inf')
+att_b = float(10*np.log10(np.mean(m.denoise_online(nb, 1.0)[SR*2:]**2) / np.mean(nb[SR*2:]**2)))
+keep_b = float(np.mean(whole_b**2) / np.mean(yz**2))
+prev_b = m.set_denoise_engine('online')
+try:
+    argb = lambda d: build(quality_tier='bad_landline', dereverb_amt=d, wpe_strength=0.0, bg_file=None, dropout_prob=0.0,
+                           jitter_intensity=0.0, rf_amt=0.0)
+    yb = [read(m.process_audio_stream(j_wav, *argb(1.0), block_s=bs, seed=1)[0])[1] for bs in (5.0, 2.0)]
+    dry_b = read(m.process_audio_stream(j_wav, *argb(0.0), block_s=5.0, seed=1)[0])[1]
+    _, sb = m.process_audio(j_wav, *argb(1.0), seed=1)
+finally:
+    m.set_denoise_engine(prev_b)
+stream_b = float(np.max(np.abs(yb[0] - yb[1]))) if len(yb[0]) == len(yb[1]) else float('inf')
+cleaned_b = float(np.max(np.abs(yb[0] - dry_b))) if len(dry_b) == len(yb[0]) else 0.0
+okAB = push_err < 1e-5 and att_b < -20.0 and keep_b > 0.15 and stream_b < 1e-4 and cleaned_b > 1e-3 and sb.startswith('OK')
+results.append(("AB_online_noise_estimate", okAB, f"push err={push_err:.1e}, noise {att_b:.1f} dB, speech energy kept={keep_b:.2f}, "
+                                                 f"stream block-size diff={stream_b:.1e}, vs uncleaned={cleaned_b:.2f}"))
+
+# AC) Bed excerpts: windowed reads match the full decode rotated (wraparound, resampled, ogg) and
+#     a stream_background render holds only its own excerpt, not the decoded bed
+bed_x = (np.random.default_rng(25).standard_normal((SR * 40, 2)) * 0.1).astype(np.float32)
+bed_wav = tempfile.NamedTemporaryFile(delete=False, suffix='.wav').name; sf.write(bed_wav, bed_x, SR)
+bed_err = 0.0
+for p, start, n_c in [(bed_wav, SR * 39, SR * 3), (bed_wav, 12345, 7000), (in_wav, 50000, 40000)] + \
+                     ([(ogg_path, 20000, 9000)] if ogg_path else []):
+    full_c = m._decode_any_to_float32(p, SR); rd = m.open_bed(p, SR)
+    got_c = rd.read(start, n_c)
+    # ffmpeg's ogg decode can run a few codec-padding samples past the header length
+    ref_c = full_c[:rd.n][(start + np.arange(n_c)) % rd.n] if 0 <= len(full_c) - rd.n <= 1024 else None
+    bed_err = max(bed_err, float(np.max(np.abs(got_c - ref_c))) if ref_c is not None else float('inf'))
+prev_budget = m.ASSET_CACHE.budget / (1024*1024)
+m.ASSET_CACHE.clear(); m.ASSET_CACHE.set_budget(0)
+y_c = (np.random.default_rng(3).standard_normal(SR) * 0.05).astype(np.float32)
+tracemalloc.start()
+yc = m.stream_background(y_c, bed_wav, None, 0.0, -10.0, 100.0, 8000.0, -12.0, rng=np.random.default_rng(7))
+peak_c = tracemalloc.get_traced_memory()[1]; tracemalloc.stop()
+m.ASSET_CACHE.set_budget(prev_budget)
+okAC = bed_err < 1e-4 and peak_c < bed_x.nbytes / 8 and len(yc) == len(y_c) and np.all(np.isfinite(yc))
+results.append(("AC_bed_excerpt", okAC, f"excerpt vs full decode={bed_err:.1e}, stream_background peak="
+                                        f"{peak_c/1e6:.1f} MB (bed {bed_x.nbytes/2e6:.1f} MB mono)"))
+
+# AD) Render cache key covers engine selections and the code version: switching the denoise
+#     engine or bumping RENDER_CACHE_VERSION misses, switching back hits again
+m.RENDER_CACHE.root = tempfile.mkdtemp(); m.RENDER_CACHE.set_budget(m.RENDER_CACHE_MB)
+argd = argb(1.0)
+pd1, sd1 = m.process_audio(j_wav, *argd, seed=4)
+prev_d = m.set_denoise_engine('online')
+try:
+    pd2, sd2 = m.process_audio(j_wav, *argd, seed=4)
+finally:
+    m.set_denoise_engine(prev_d)
+_, sd3 = m.process_audio(j_wav, *argd, seed=4)
+prev_v = m.RENDER_CACHE_VERSION; m.RENDER_CACHE_VERSION += 1
+try:
+    _, sd4 = m.process_audio(j_wav, *argd, seed=4)
+finally:
+    m.RENDER_CACHE_VERSION = prev_v
+# Opus keys on the backend "auto" resolved to: naming that backend explicitly is the same entry,
+# any other backend is a different one
+prev_o = m.OPUS_BACKEND; auto_o = m._opus_resolved('auto')
+other_o = next(b for b in m.OPUS_BACKENDS[1:] if b != auto_o)
+try:
+    m.OPUS_BACKEND = auto_o; _, sd5 = m.process_audio(j_wav, *argd, seed=4)
+    m.OPUS_BACKEND = other_o; _, sd6 = m.process_audio(j_wav, *argd, seed=4)
+finally:
+    m.OPUS_BACKEND = prev_o
+diff_d = float(np.max(np.abs(read(pd1)[1] - read(pd2)[1])))
+m.RENDER_CACHE.clear(); m.RENDER_CACHE.root = m.RENDER_CACHE_DIR
+okAD = (not sd2.endswith('Cached') and diff_d > 1e-3 and sd3.endswith(' · Cached') and not sd4.endswith('Cached')
+        and sd5.endswith(' · Cached') and (not sd6.endswith('Cached') or m._opus_resolved(other_o) == auto_o))
+results.append(("AD_render_cache_engine_key", okAD, f"gate vs online maxdiff={diff_d:.2f}, statuses="
+                                                    f"{[s.endswith('Cached') for s in (sd1, sd2, sd3, sd4, sd5, sd6)]}"))
+
+# AE) Inputs only ffmpeg decodes (m4a): process_audio renders them whole, process_audio_stream
+#     decodes them whole onto its tape, both to the ffmpeg decode's length
+if shutil.which('ffmpeg'):
+    m4a_e = tempfile.NamedTemporaryFile(delete=False, suffix='.m4a').name
+    os.system(f'ffmpeg -hide_banner -loglevel error -y -i "{j_wav}" -c:a aac "{m4a_e}"')
+    n_e = len(m._ffmpeg_decode(m4a_e))
+    arge = build(quality_tier='standard', bg_file=None)
+    prev_e = m.STREAM_MIN_S; m.STREAM_MIN_S = 1.0
+    try:
+        pe1, se1 = m.process_audio(m4a_e, *arge, seed=2)
+        pe2, se2 = m.process_audio_stream(m4a_e, *arge, seed=2)
+    finally:
+        m.STREAM_MIN_S = prev_e
+    okAE = (n_e > SR and pe1 is not None and pe2 is not None and sf.info(pe1).frames == n_e
+            and sf.info(pe2).frames == n_e and 'Streamed' in se2)
+    results.append(("AE_ffmpeg_only_input", okAE, f"{n_e} samples, whole={se1}, stream={se2}"))
+
 OK = all(flag for _,flag,_ in results)
 print("PASS" if OK else "FAIL")
 for name, flag, info in results:
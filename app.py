@@ -4,16 +4,22 @@
 #        → Bandwidth → Opus → Network Artifacts (OLD garble/stutter/dropouts) → Handset IR → Normalize
 
 from __future__ import annotations
-import os, sys, json, glob, time, atexit, tempfile, hashlib, subprocess, shutil, random
-from typing import List, Tuple, Optional, Any, Dict
+import os, sys, json, glob, time, atexit, tempfile, hashlib, subprocess, shutil, threading, functools, logging, tracemalloc, warnings
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import List, Tuple, Optional, Any, Dict, Callable
 
 import numpy as np
 import soundfile as sf
 import gradio as gr
 
-from scipy.signal import resample_poly, butter, sosfilt, sosfiltfilt, fftconvolve, stft, istft, get_window
+from scipy.signal import resample_poly, sosfilt, sosfiltfilt, sosfilt_zi, lfilter, oaconvolve, stft, istft, get_window
+from scipy import fft as sp_fft
+from numpy.lib.stride_tricks import sliding_window_view
+
+from dsp_core import (SR, _rng, resample_filter, resample_ratio, resample_rate, design_sos, sos_chain,
+                      dropout_events_grid, apply_dropout_events)
 
-SR = 48000
 TMP_DIR = os.environ.get("VLAB_TMPDIR", tempfile.gettempdir())
 PRESETS_PATH = "presets.json"
 
@@ -258,19 +264,219 @@ def _coerce_paths_list(files) -> List[str]:
     return out
 
 def _load_audio(path: str) -> Tuple[np.ndarray, int]:
-    y, sr = sf.read(path, dtype="float32", always_2d=False); return y, sr
+    """(samples, rate) through libsndfile; formats it cannot open (m4a, …) decode via ffmpeg, mono at SR."""
+    try:
+        y, sr = sf.read(path, dtype="float32", always_2d=False); return y, sr
+    except RuntimeError:  # sf.LibsndfileError
+        y = _ffmpeg_decode(path, SR)
+        if not len(y): raise
+        return y, SR
+
+def _ffmpeg_decode(path: str, sr: int = SR) -> np.ndarray:
+    """Mono float32 at sr through an ffmpeg pipe (empty when ffmpeg is missing or fails)."""
+    if not shutil.which("ffmpeg"): return np.zeros(0, np.float32)
+    cmd = ["ffmpeg", "-hide_banner", "-loglevel", "error", "-i", path, "-f", "f32le", "-ac", "1", "-ar", str(sr), "-"]
+    return np.frombuffer(subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL).stdout, np.float32).copy()
+
+def _sf_duration(path: str) -> Optional[float]:
+    """Seconds of audio when libsndfile can open the file; None for ffmpeg-only formats."""
+    try: return sf.info(path).duration
+    except RuntimeError: return None
 
 def _mono_sr(y: np.ndarray, sr: int, target: int = SR) -> np.ndarray:
     if y.ndim>1: y=y.mean(axis=1)
-    if sr!=target:
-        g=np.gcd(int(sr), int(target)); up,down = target//g, sr//g
-        y=resample_poly(y, up, down).astype(np.float32)
+    if sr!=target: y=resample_rate(y, sr, target)
     return y.astype(np.float32)
 
 def _save_wav_tmp(y: np.ndarray, sr: int = SR) -> str:
     f = tempfile.NamedTemporaryFile(prefix="vlab_", delete=False, suffix=".wav", dir=TMP_DIR)
     sf.write(f.name, y.astype(np.float32), sr); return f.name
 
+def render_rng(seed: Optional[int] = None) -> np.random.Generator:
+    """Per-render Generator for every stochastic stage: same seed, same draws (None: fresh entropy)."""
+    return np.random.default_rng(None if seed is None or seed == "" else int(seed))
+
+def _gauss(rng: Optional[np.random.Generator], shape, sd: float) -> np.ndarray:
+    """N(0, sd²) noise drawn directly in float32 (no float64 draw + cast)."""
+    g = _rng(rng).standard_normal(shape, dtype=np.float32); g *= sd
+    return g
+
+# ───────────────── stage profiling ─────────────────
+# Opt-in (VLAB_PROFILE=1 or set_profiling(True)): each render records wall time, CPU time and
+# peak traced allocation (tracemalloc, above the stage's starting level) per stage. Stages nest
+# ("artifacts/garble"); a stage entered repeatedly in one render (streamed blocks) accumulates.
+# The breakdown is appended to the status, logged as one JSON line on "voicelab.profile" and
+# folded into PROFILE_HIST (profile_histogram(), /profile_histogram in the UI API).
+# tracemalloc is process-wide, so peaks are approximate while renders overlap on threads.
+PROFILE = os.environ.get("VLAB_PROFILE", "0").strip().lower() in ("1", "true", "yes", "on")
+PROFILE_LOG = logging.getLogger("voicelab.profile")
+PROFILE_BUCKETS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000, 30000, 60000, 120000)
+_prof_local = threading.local()
+_trace_lock = threading.Lock(); _trace_users = 0; _trace_owned = False
+
+def set_profiling(on: bool) -> bool:
+    """Turn per-render stage profiling on/off; returns the previous setting."""
+    global PROFILE
+    prev = PROFILE; PROFILE = bool(on); return prev
+
+class _RenderProfile:
+    def __init__(self):
+        self.stages: Dict[str, List[float]] = {}  # path -> [wall_s, cpu_s, peak_bytes, calls]
+        self.stack: List[list] = []                # [path, wall0, cpu0, mem0, peak]
+        self.counters: Dict[str, int] = {}          # profile_count totals
+
+    def _peak_since(self, mem0: int) -> int:
+        return max(0, tracemalloc.get_traced_memory()[1] - mem0)
+
+    def enter(self, name: str):
+        if self.stack:
+            top = self.stack[-1]; top[4] = max(top[4], self._peak_since(top[3]))
+            name = f"{top[0]}/{name}"
+        tracemalloc.reset_peak()
+        self.stack.append([name, time.perf_counter(), time.process_time(), tracemalloc.get_traced_memory()[0], 0])
+
+    def exit(self):
+        path, w0, c0, m0, pk = self.stack.pop()
+        rec = self.stages.setdefault(path, [0.0, 0.0, 0, 0])
+        rec[0] += time.perf_counter() - w0; rec[1] += time.process_time() - c0
+        rec[2] = max(rec[2], pk, self._peak_since(m0)); rec[3] += 1
+
+    def summary(self) -> Dict[str, Any]:
+        stages = {k.split("/", 1)[-1] if k != "render" else k:
+                  {"wall_s": round(w, 4), "cpu_s": round(c, 4), "peak_mb": round(p / 2**20, 2), "calls": n}
+                  for k, (w, c, p, n) in self.stages.items()}
+        top = stages.get("render", {"wall_s": 0.0, "cpu_s": 0.0, "peak_mb": 0.0})
+        rep = {"wall_s": top["wall_s"], "cpu_s": top["cpu_s"], "peak_mb": top["peak_mb"], "stages": stages}
+        if self.counters: rep["counters"] = dict(self.counters)
+        return rep
+
+@contextmanager
+def profile_stage(name: str):
+    """Time the enclosed block as a stage of the current render (no-op unless profiling)."""
+    prof = getattr(_prof_local, "prof", None)
+    if prof is None:
+        yield; return
+    prof.enter(name)
+    try: yield
+    finally: prof.exit()
+
+# dtype contract: audio moves between stages as float32. With VLAB_DTYPE_CHECK=1 (or
+# set_dtype_check(True)) every @_profiled stage whose audio result is some other float dtype is
+# recorded in dtype_violations() — a float64 hand-off is a silent 2x copy of that stage's output.
+DTYPE_CHECK = os.environ.get("VLAB_DTYPE_CHECK", "0").strip().lower() in ("1", "true", "yes", "on")
+_dtype_violations: Dict[str, str] = {}
+
+def set_dtype_check(on: bool) -> bool:
+    """Turn the per-stage float32 check on/off (clearing earlier findings); returns the previous setting."""
+    global DTYPE_CHECK
+    prev = DTYPE_CHECK; DTYPE_CHECK = bool(on); _dtype_violations.clear(); return prev
+
+def dtype_violations() -> Dict[str, str]:
+    """{stage: dtype} for stages seen returning non-float32 audio since the check was turned on."""
+    return dict(_dtype_violations)
+
+def _check_dtype(name: str, out):
+    y = out[0] if isinstance(out, tuple) and out else out
+    if isinstance(y, np.ndarray) and y.dtype.kind == "f" and y.dtype != np.float32:
+        _dtype_violations[name] = str(y.dtype)
+
+def profile_count(name: str, n: int = 1):
+    """Add n to a named counter of the current render's profile (no-op unless profiling)."""
+    prof = getattr(_prof_local, "prof", None)
+    if prof is not None: prof.counters[name] = prof.counters.get(name, 0) + int(n)
+
+def _profiled(name: str):
+    """Decorator form of profile_stage (also where the float32 stage contract is checked)."""
+    def deco(fn):
+        @functools.wraps(fn)
+        def inner(*a, **kw):
+            if getattr(_prof_local, "prof", None) is None: out = fn(*a, **kw)
+            else:
+                with profile_stage(name): out = fn(*a, **kw)
+            if DTYPE_CHECK: _check_dtype(name, out)
+            return out
+        return inner
+    return deco
+
+class _ProfileHistogram:
+    def __init__(self):
+        self._lock = threading.Lock(); self.data: Dict[str, Dict[str, Any]] = {}
+
+    def add(self, stages: Dict[str, Dict[str, Any]]):
+        with self._lock:
+            for k, v in stages.items():
+                d = self.data.setdefault(k, {"count": 0, "wall_s": 0.0, "cpu_s": 0.0, "max_ms": 0.0, "peak_mb_max": 0.0,
+                                             "hist": [0] * (len(PROFILE_BUCKETS_MS) + 1)})
+                ms = v["wall_s"] * 1000.0
+                d["count"] += 1; d["wall_s"] += v["wall_s"]; d["cpu_s"] += v["cpu_s"]
+                d["max_ms"] = max(d["max_ms"], ms); d["peak_mb_max"] = max(d["peak_mb_max"], v["peak_mb"])
+                d["hist"][int(np.searchsorted(PROFILE_BUCKETS_MS, ms))] += 1
+
+    def _quantile_ms(self, hist: List[int], q: float) -> float:
+        """Upper bucket edge holding the q-th render (inf for the overflow bucket)."""
+        need = q * sum(hist); acc = 0
+        for i, c in enumerate(hist):
+            acc += c
+            if c and acc >= need: return float(PROFILE_BUCKETS_MS[i]) if i < len(PROFILE_BUCKETS_MS) else float("inf")
+        return 0.0
+
+    def snapshot(self) -> Dict[str, Any]:
+        edges = [f"<={b}ms" for b in PROFILE_BUCKETS_MS] + [f">{PROFILE_BUCKETS_MS[-1]}ms"]
+        with self._lock:
+            return {k: {"count": d["count"], "mean_ms": round(d["wall_s"] * 1000.0 / d["count"], 2),
+                        "p50_ms": self._quantile_ms(d["hist"], 0.5), "p95_ms": self._quantile_ms(d["hist"], 0.95),
+                        "max_ms": round(d["max_ms"], 2), "cpu_s": round(d["cpu_s"], 3), "peak_mb_max": d["peak_mb_max"],
+                        "buckets": {e: c for e, c in zip(edges, d["hist"]) if c}}
+                    for k, d in sorted(self.data.items())}
+
+    def clear(self):
+        with self._lock: self.data.clear()
+
+PROFILE_HIST = _ProfileHistogram()
+
+def profile_histogram() -> Dict[str, Any]:
+    """Aggregate per-stage latency histogram over every profiled render in this process."""
+    return PROFILE_HIST.snapshot()
+
+def last_render_profile() -> Optional[Dict[str, Any]]:
+    """Profile of the last render finished on this thread (None if it was not profiled)."""
+    return getattr(_prof_local, "last", None)
+
+def _profiled_render(fn):
+    """Wrap a (path, status) renderer: profile it when enabled, report, log and aggregate."""
+    @functools.wraps(fn)
+    def inner(*a, **kw):
+        if getattr(_prof_local, "prof", None) is not None:
+            return fn(*a, **kw)  # nested inside an outer profiled render
+        if not PROFILE:
+            _prof_local.last = None; return fn(*a, **kw)
+        global _trace_users, _trace_owned
+        with _trace_lock:
+            if _trace_users == 0:
+                _trace_owned = not tracemalloc.is_tracing()
+                if _trace_owned: tracemalloc.start()
+            _trace_users += 1
+        prof = _prof_local.prof = _RenderProfile(); _prof_local.last = None
+        try:
+            with profile_stage("render"): path, status = fn(*a, **kw)
+        finally:
+            _prof_local.prof = None
+            with _trace_lock:
+                _trace_users -= 1
+                if _trace_users == 0 and _trace_owned: tracemalloc.stop()
+        rep = prof.summary(); _prof_local.last = rep
+        PROFILE_HIST.add(rep["stages"])
+        PROFILE_LOG.info(json.dumps({"event": "render_profile", "renderer": fn.__name__, "ok": bool(path), **rep},
+                                    ensure_ascii=False))
+        if path:
+            tops = sorted(((k, v["wall_s"]) for k, v in rep["stages"].items() if k != "render" and "/" not in k),
+                          key=lambda kv: -kv[1])[:3]
+            status += (f" · Profile {rep['wall_s']:.2f}s/{rep['peak_mb']:.0f}MB ["
+                       + ", ".join(f"{k} {w:.2f}s" for k, w in tops) + "]"
+                       + "".join(f" {k}={v}" for k, v in rep.get("counters", {}).items()))
+        return path, status
+    return inner
+
 def normalize_peak(x: np.ndarray, peak: float = 0.97) -> np.ndarray:
     m=float(np.max(np.abs(x)) or 0.0);
     return x if m<1e-9 else (x/m*peak).astype(np.float32)
@@ -337,6 +543,7 @@ def _same_file(a: str | None, b: str | None) -> bool:
     return False
 
 # Decode any audio (ogg/wav/mp3/...) to float32 mono via ffmpeg; fallback to soundfile
+@_profiled("decode_asset")
 def _decode_any_to_float32(path: str, sr: int = SR) -> np.ndarray:
     import os as _os, tempfile as _tmp
     if not path or not _os.path.exists(path):
@@ -381,6 +588,135 @@ def _decode_any_to_float32(path: str, sr: int = SR) -> np.ndarray:
         return np.zeros(0, dtype=np.float32)
 
 
+# ───────────────── decoded-asset cache ─────────────────
+# Beds and event one-shots are re-used across renders; keep their decoded 48 kHz mono
+# float32 samples in a process-wide LRU keyed by _file_sig (path, size, mtime) so a
+# replaced file is re-decoded. Budget via VLAB_ASSET_CACHE_MB (0 disables caching).
+ASSET_CACHE_MB = float(os.environ.get("VLAB_ASSET_CACHE_MB", "1024"))
+
+class _AssetCache:
+    def __init__(self, budget_mb: float):
+        self._lock = threading.Lock()
+        self._items: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self.budget = int(max(0.0, budget_mb) * 1024 * 1024)
+        self.nbytes = 0; self.hits = 0; self.misses = 0; self.evictions = 0
+
+    def get_or_load(self, key: str, loader: Callable[[], np.ndarray]) -> np.ndarray:
+        with self._lock:
+            arr = self._items.get(key)
+            if arr is not None:
+                self._items.move_to_end(key); self.hits += 1
+                return arr
+            self.misses += 1
+        arr = np.ascontiguousarray(loader())
+        arr.flags.writeable = False  # shared between renders: callers must copy before mutating
+        with self._lock:
+            if 0 < arr.nbytes <= self.budget and key not in self._items:
+                self._items[key] = arr; self.nbytes += arr.nbytes
+                self._evict()
+        return arr
+
+    def _evict(self):
+        while self.nbytes > self.budget and self._items:
+            _, old = self._items.popitem(last=False)
+            self.nbytes -= old.nbytes; self.evictions += 1
+
+    def set_budget(self, budget_mb: float):
+        with self._lock:
+            self.budget = int(max(0.0, budget_mb) * 1024 * 1024); self._evict()
+
+    def clear(self):
+        with self._lock:
+            self._items.clear(); self.nbytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"entries": len(self._items), "bytes": self.nbytes, "budget": self.budget,
+                    "hits": self.hits, "misses": self.misses, "evictions": self.evictions}
+
+ASSET_CACHE = _AssetCache(ASSET_CACHE_MB)
+
+def load_bed_cached(path: str, sr: int = SR) -> np.ndarray:
+    """_decode_any_to_float32 through the asset cache (read-only result)."""
+    if not path or not os.path.exists(path):
+        return np.zeros(0, dtype=np.float32)
+    return ASSET_CACHE.get_or_load(f"bed|{sr}|{_file_sig(path)}", lambda: _decode_any_to_float32(path, sr))
+
+def load_event_cached(path: str, sr: int = SR) -> np.ndarray:
+    """_load_audio + _mono_sr through the asset cache (read-only result)."""
+    def _load():
+        s, fsr = _load_audio(path); return _mono_sr(s, fsr, sr)
+    return ASSET_CACHE.get_or_load(f"event|{sr}|{_file_sig(path)}", _load)
+
+def asset_cache_stats() -> Dict[str, Any]:
+    return ASSET_CACHE.stats()
+
+# ───────────────── background bed excerpts ─────────────────
+# A render needs len(y) bed samples from a random offset, not the whole bed (a 15-minute pool file
+# is ~173 MB decoded). open_bed reads the bed length from the header and BedReader.read decodes
+# only the requested window, wrapping past the end back to the start: libsndfile formats
+# (wav/flac/ogg) by seeking and resampling just the window (plus filter reach), anything else
+# with ffmpeg -ss/-t (length from ffprobe). A window at least as long as the bed, or a bed
+# neither can probe, falls back to the whole bed through the asset cache.
+def _sf_window(f: "sf.SoundFile", j0: int, j1: int, up: int, down: int) -> np.ndarray:
+    """Output samples [j0, j1) of an open file, downmixed and resampled up/down exactly as
+    resample_rate over the whole file (the window reads filter reach on both sides)."""
+    if up == down:
+        f.seek(j0); return f.read(j1 - j0, dtype="float32", always_2d=True).mean(axis=1)
+    half = 10 * max(up, down) // up + 2  # filter reach in input samples
+    s0 = max(0, (j0 * down // up - half) // down * down); s1 = min(f.frames, j1 * down // up + half + 1)
+    f.seek(s0); y = f.read(s1 - s0, dtype="float32", always_2d=True).mean(axis=1)
+    y = resample_poly(y, up, down, window=resample_filter(up, down)).astype(np.float32)
+    k = j0 - s0 * up // down; return y[k:k + (j1 - j0)]
+
+class BedReader:
+    """Windowed, wrapping reads of a background bed at `sr` (see open_bed)."""
+    def __init__(self, path: str, n: int, mode: str, sr: int = SR, rate: Tuple[int, int] = (1, 1)):
+        self.path, self.n, self.mode, self.sr, self.up, self.down = path, int(n), mode, sr, rate[0], rate[1]
+
+    def _window(self, j0: int, m: int) -> np.ndarray:
+        if self.mode == "sf":
+            with sf.SoundFile(self.path) as f: return _sf_window(f, j0, j0 + m, self.up, self.down)
+        cmd = ["ffmpeg", "-hide_banner", "-loglevel", "error", "-ss", f"{j0 / self.sr:.6f}", "-t", f"{m / self.sr:.6f}",
+               "-i", self.path, "-f", "f32le", "-ac", "1", "-ar", str(self.sr), "-"]
+        raw = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL).stdout
+        return _fit_len(np.frombuffer(raw, np.float32), m)
+
+    @_profiled("decode_asset")
+    def read(self, start: int, m: int) -> np.ndarray:
+        """m samples from bed position start (mod length), wrapping around; a fresh float32 array."""
+        if self.n <= 0 or m <= 0: return np.zeros(max(0, m), np.float32)
+        if m >= self.n or self.mode == "full":
+            bed = load_bed_cached(self.path, self.sr)
+            return bed[(start + np.arange(m)) % len(bed)] if len(bed) else np.zeros(m, np.float32)
+        out = np.empty(m, np.float32); pos = start % self.n; k = 0
+        while k < m:
+            c = min(m - k, self.n - pos); out[k:k + c] = self._window(pos, c); k += c; pos = 0
+        return out
+
+@functools.lru_cache(maxsize=64)
+def _bed_probe(sig: str, path: str, sr: int) -> Tuple[int, str, Tuple[int, int]]:
+    try:
+        info = sf.info(path); up, down = resample_ratio(info.samplerate, sr)
+        if info.frames > 0: return -(-info.frames * up // down), "sf", (up, down)
+    except Exception:
+        pass
+    if shutil.which("ffprobe"):
+        r = subprocess.run(["ffprobe", "-v", "error", "-show_entries", "format=duration", "-of", "csv=p=0", path],
+                           stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True)
+        try:
+            n = int(round(float(r.stdout.strip()) * sr))
+            if n > 0: return n, "ffmpeg", (1, 1)
+        except ValueError:
+            pass
+    return len(load_bed_cached(path, sr)), "full", (1, 1)
+
+def open_bed(path: Optional[str], sr: int = SR) -> Optional[BedReader]:
+    """BedReader for a bed file (length from its header, cached per file signature); None when
+    the file is missing or empty."""
+    if not path or not os.path.exists(path): return None
+    n, mode, rate = _bed_probe(_file_sig(path), path, sr)
+    return BedReader(path, n, mode, sr, rate) if n > 0 else None
 
 BACKGROUND_POOL = [
     "assets/backgrounds/Street Noise -15db 15 min 1_48k.ogg",
@@ -428,19 +764,70 @@ def _purge_temp(prefix="vlab_", older_than_sec=24*3600):
 atexit.register(_purge_temp)
 
 # ───────────────── filters / env ─────────────────
-def hpf_lpf(x: np.ndarray, hpf_hz: float = 0.0, lpf_hz: float = SR/2, zero_phase: bool = False) -> np.ndarray:
-    y = x.astype(np.float32, copy=False)
-    if hpf_hz and hpf_hz >= 20:
-        sos = butter(2, hpf_hz/(SR/2), btype="high", output="sos")
-        y = (sosfiltfilt(sos, y) if zero_phase else sosfilt(sos, y))
-    if lpf_hz and lpf_hz < (SR/2):
-        sos = butter(4, lpf_hz/(SR/2), btype="low", output="sos")
-        y = (sosfiltfilt(sos, y) if zero_phase else sosfilt(sos, y))
-    return y.astype(np.float32)
+# float32 in, float32 out, float64 inside: the recursion runs in double precision (a float32
+# IIR state decays into subnormals in silent passages and slows ~10x) but only FILTER_BLOCK
+# samples at a time, so no full-length float64 copy of the signal or the result ever exists.
+FILTER_BLOCK = 1 << 16
+
+def sosfilt32(sos: np.ndarray, x: np.ndarray, zi: Optional[np.ndarray] = None, return_zf: bool = False,
+              block: int = FILTER_BLOCK):
+    """sosfilt(sos, x, zi) as float32, block by block (zi None: zeros); (y, zf) with return_zf."""
+    out = np.empty(len(x), np.float32)
+    z = np.zeros((sos.shape[0], 2)) if zi is None else zi
+    for s in range(0, len(x), block):
+        out[s:s+block], z = sosfilt(sos, x[s:s+block], zi=z)
+    return (out, z) if return_zf else out
+
+def _sosfiltfilt_blocks(sos: np.ndarray, n: int, read: Callable[[int, int], np.ndarray],
+                        write: Callable[[int, np.ndarray], None], reread: Callable[[int, int], np.ndarray], block: int):
+    """sosfiltfilt (odd padding as SciPy) of a length-n signal seen through block accessors: read from
+    the source, write/reread the destination (float32 storage between the passes)."""
+    ntaps=2*len(sos)+1 - min(int((sos[:,2]==0).sum()), int((sos[:,5]==0).sum()))
+    edge=3*ntaps
+    if n<=edge:
+        write(0, sosfiltfilt(sos, read(0, n))); return
+    head=read(0, edge+1); tail=read(n-edge-1, n)
+    zi=sosfilt_zi(sos)
+    left=2*head[:1]-head[edge:0:-1]; right=2*tail[-1:]-tail[-2::-1]
+    _, z=sosfilt(sos, left, zi=zi*left[:1])
+    for i0 in range(0, n, block):
+        y, z=sosfilt(sos, read(i0, i0+block), zi=z); write(i0, y)
+    yr, _=sosfilt(sos, right, zi=z)
+    _, z=sosfilt(sos, yr[::-1], zi=zi*yr[-1:])
+    for i0 in reversed(range(0, n, block)):
+        y, z=sosfilt(sos, reread(i0, i0+block)[::-1], zi=z); write(i0, y[::-1])
+
+def sosfiltfilt32(sos: np.ndarray, x: np.ndarray, block: int = FILTER_BLOCK) -> np.ndarray:
+    """sosfiltfilt(sos, x) as float32 through FILTER_BLOCK slices (the forward pass is kept float32)."""
+    x = np.asarray(x); out = np.empty(len(x), np.float32)
+    def write(i0, y): out[i0:i0+len(y)] = y
+    _sosfiltfilt_blocks(sos, len(x), lambda i0, i1: x[i0:i1], write, lambda i0, i1: out[i0:i1], block)
+    return out
+
+def hpf_lpf_sos(hpf_hz: float = 0.0, lpf_hz: float = SR/2) -> np.ndarray:
+    """The fused HPF (2nd order) → LPF (4th order) cascade hpf_lpf applies; (0, 6) when both are off."""
+    stages=[]
+    if hpf_hz and hpf_hz >= 20: stages.append(("high", 2, float(hpf_hz), SR))
+    if lpf_hz and lpf_hz < (SR/2): stages.append(("low", 4, float(lpf_hz), SR))
+    return sos_chain(*stages)
+
+def hpf_lpf(x: np.ndarray, hpf_hz: float = 0.0, lpf_hz: float = SR/2, zero_phase: bool = False,
+            state: Optional[dict] = None) -> np.ndarray:
+    """HPF (2nd order) then LPF (4th order) Butterworth, as one SOS cascade in a single pass.
+    state: carry dict for block streaming (causal mode only) — consecutive calls continue one signal.
+    Always returns a new float32 array."""
+    sos = hpf_lpf_sos(hpf_hz, lpf_hz)
+    if not len(sos): return x.astype(np.float32)
+    if zero_phase: return sosfiltfilt32(sos, x)
+    if state is not None:
+        y, state["sos"] = sosfilt32(sos, x, zi=state.get("sos"), return_zf=True)
+        return y
+    return sosfilt32(sos, x)
 
 def _soft_clip(x: np.ndarray, drive: float = 1.0) -> np.ndarray:
     # Gentle limiter for small overshoots; drive=1 is subtle
-    return np.tanh(drive * x).astype(np.float32)
+    y = np.multiply(x, drive, dtype=np.float32)
+    return np.tanh(y, out=y)
 
 def _prelimit(x: np.ndarray, threshold: float = 0.707) -> np.ndarray:
     # Pre-limit to prevent codec splattering
@@ -451,28 +838,24 @@ def _prelimit(x: np.ndarray, threshold: float = 0.707) -> np.ndarray:
 
 def _mulaw_color(x: np.ndarray, amount: float, mu: float = 255.0, drive: float = 0.75) -> np.ndarray:
     """Band-limited μ-law coloration for realistic phone character without harsh distortion"""
-    if amount <= 0.0:
-        return x.astype(np.float32)
-
-    x = _prelimit(x, 0.707)
-    # Encode pass
-    y = np.sign(x) * np.log1p(mu * np.abs(np.clip(x * drive, -1, 1))) / np.log1p(mu)
-    # Decode pass to make it "codec color" not harsh nonlinearity
-    y = np.sign(y) * (np.expm1(np.log1p(mu) * np.abs(y)) / mu)
-    # Parallel blend
-    out = (1.0 - amount) * x + amount * y
-    return _soft_clip(out, 1.02).astype(np.float32)
+    return apply_mulaw_color(x, amount, mu, drive)
 
 def _zphf(x: np.ndarray, hpf_hz: float = 0.0, lpf_hz: float = SR/2, sr: int = SR) -> np.ndarray:
     """Zero-phase filtering for band extraction"""
     return hpf_lpf(x, hpf_hz, lpf_hz, zero_phase=True)
 
-def apply_mulaw_color(x: np.ndarray, amount: float, mu: float = 255.0, drive: float = 0.75) -> np.ndarray:
-    """Apply μ-law coloration with encode/decode cycle for realistic codec character"""
+def apply_mulaw_color(x: np.ndarray, amount: float, mu: float = 255.0, drive: float = 0.75,
+                      base: Optional[np.ndarray] = None, out: Optional[np.ndarray] = None) -> np.ndarray:
+    """Apply μ-law coloration with encode/decode cycle for realistic codec character.
+    base: full signal x was split from — returns base - x + color(x) (the band-limited landline path)
+    in the same pass; out: preallocated float32 destination (may alias x or base)."""
     if amount <= 0.0:
-        return x.astype(np.float32)
+        return x.astype(np.float32) if base is None else np.asarray(base, np.float32)
+    peak = float(max(np.max(x), -np.min(x))) if len(x) else 0.0  # no |x| temporary
+    return mulaw_color_into(x, amount, drive, 0.707 / peak if peak > 0.707 else 1.0, base, out)
 
-    x = _prelimit(x, 0.707)
+def _mulaw_curve(x: np.ndarray, amount: float, mu: float = 255.0, drive: float = 0.75) -> np.ndarray:
+    """Reference pointwise part of apply_mulaw_color (input already pre-limited), as written originally."""
     # Encode pass
     y = np.sign(x) * np.log1p(mu * np.abs(np.clip(x * drive, -1, 1))) / np.log1p(mu)
     # Decode pass to make it "codec color" not harsh nonlinearity
@@ -481,12 +864,219 @@ def apply_mulaw_color(x: np.ndarray, amount: float, mu: float = 255.0, drive: fl
     out = (1.0 - amount) * x + amount * y
     return _soft_clip(out, 1.02).astype(np.float32)
 
-def env_follow(x: np.ndarray, atk_ms=15.0, rel_ms=350.0) -> np.ndarray:
-    atk=max(1,int(SR*atk_ms/1000.0)); rel=max(1,int(SR*rel_ms/1000.0))
-    e=np.zeros_like(x,dtype=np.float32); g=0.0; ax=np.abs(x)
+# ───────────────── μ-law kernels ─────────────────
+# The colour stage is an encode/decode pair with no quantizer between them, so it collapses to
+# the clip it starts from: decode(encode(c)) == c for c = clip(drive·x, ±1) (float32 round trip
+# ≤ 3e-7, see _mulaw_curve). What is left — pre-limit gain, blend, tanh(1.02·), plus the
+# out-of-band remainder on the landline path — and the post_mu_grit compander each run as one
+# pass into a preallocated buffer, with no full-length temporaries: NumPy over MULAW_BLOCK slices
+# with block-sized scratch, numexpr, or a numba loop. "auto" takes numexpr only when it is built
+# with VML; otherwise NumPy's SIMD tanh/log1p loops beat both scalar kernels (benchmark.py mulaw).
+MULAW_ENGINES = ("auto", "numexpr", "numba", "numpy")
+MULAW_ENGINE = os.environ.get("VLAB_MULAW_ENGINE", "auto").strip().lower()
+MULAW_BLOCK = 1 << 16
+
+def set_mulaw_engine(name: str) -> str:
+    """Select the μ-law kernel backend at runtime; returns the previous one."""
+    global MULAW_ENGINE
+    name = (name or "auto").strip().lower()
+    if name not in MULAW_ENGINES: raise ValueError(f"Unknown μ-law engine '{name}' (choose from {', '.join(MULAW_ENGINES)})")
+    prev, MULAW_ENGINE = MULAW_ENGINE, name
+    return prev
+
+def _mulaw_color_loop(x, base, out, dry, wet, cd):
+    """Per-sample colour kernel (numba source): out = tanh(dry·x + wet·clip(cd·x, ±1)) [+ base - x]."""
+    for i in range(len(x)):
+        v = x[i]
+        w = np.tanh(dry * v + wet * min(max(cd * v, -1.0), 1.0))
+        out[i] = w + (base[i] - v) if len(base) else w
+
+def _mulaw_grit_loop(x, out, a, mu):
+    """Per-sample grit kernel (numba source): out = (1-a)·x + a·sign(x)·log1p(mu|x|)/log1p(mu)."""
+    k = a / np.log1p(mu); d = 1.0 - a
+    for i in range(len(x)):
+        v = x[i]; c = k * np.log1p(mu * abs(v))
+        out[i] = d * v + (c if v >= 0 else -c)
+
+_MULAW_NUMBA = None
+def _mulaw_numba_kernels():
+    """(color, grit) compiled with numba on first use; False when numba is not installed."""
+    global _MULAW_NUMBA
+    if _MULAW_NUMBA is None:
+        try:
+            from numba import njit
+            jit = njit(cache=True, nogil=True)
+            _MULAW_NUMBA = (jit(_mulaw_color_loop), jit(_mulaw_grit_loop))
+        except Exception:
+            _MULAW_NUMBA = False
+    return _MULAW_NUMBA
+
+def _mulaw_numexpr():
+    try:
+        import numexpr
+        return numexpr
+    except Exception:
+        return None
+
+def mulaw_engine(engine: Optional[str] = None) -> str:
+    """Backend a μ-law call resolves to: the requested/selected engine, degraded to what is installed."""
+    engine = (engine or MULAW_ENGINE or "auto").lower()
+    ne = _mulaw_numexpr() if engine in ("auto", "numexpr") else None
+    if ne is not None and (engine == "numexpr" or getattr(ne, "use_vml", False)): return "numexpr"
+    if engine == "numba" and _mulaw_numba_kernels(): return "numba"
+    return "numpy"
+
+def _mulaw_out(x: np.ndarray, out: Optional[np.ndarray]) -> np.ndarray:
+    return np.empty(len(x), np.float32) if out is None else out
+
+def mulaw_color_into(x: np.ndarray, amount: float, drive: float = 0.75, gain: float = 1.0,
+                     base: Optional[np.ndarray] = None, out: Optional[np.ndarray] = None,
+                     engine: Optional[str] = None) -> np.ndarray:
+    """Fused colour pass: out = tanh(1.02·((1-amount)·g·x + amount·clip(drive·g·x, ±1))) [+ base - x],
+    g the pre-limit gain. out may alias x or base; returns out."""
+    x = np.asarray(x, np.float32); out = _mulaw_out(x, out)
+    if base is not None: base = np.asarray(base, np.float32)
+    a = float(amount); dry = 1.02 * (1.0 - a) * gain; wet = 1.02 * a; cd = float(drive) * gain
+    eng = mulaw_engine(engine)
+    if eng == "numexpr":
+        f32 = np.float32
+        expr = "tanh(dry*x + wet*where(cd*x > 1, one, where(cd*x < -1, -one, cd*x)))" + (" + (b - x)" if base is not None else "")
+        _mulaw_numexpr().evaluate(expr, local_dict=dict(x=x, b=base, dry=f32(dry), wet=f32(wet), cd=f32(cd), one=f32(1.0)),
+                                  out=out, casting="unsafe")
+    elif eng == "numba":
+        _mulaw_numba_kernels()[0](x, np.zeros(0, np.float32) if base is None else base, out, dry, wet, cd)
+    else:
+        n = min(MULAW_BLOCK, len(x)); t = np.empty(n, np.float32); u = np.empty(n, np.float32)
+        for s in range(0, len(x), MULAW_BLOCK):
+            xb = x[s:s+MULAW_BLOCK]; k = len(xb); tb = t[:k]; ub = u[:k]
+            np.multiply(xb, cd, out=tb); np.clip(tb, -1.0, 1.0, out=tb); tb *= wet
+            np.multiply(xb, dry, out=ub); tb += ub; np.tanh(tb, out=tb)
+            if base is not None: tb += base[s:s+k]; tb -= xb
+            out[s:s+k] = tb
+    return out
+
+def mulaw_grit_into(x: np.ndarray, amount: float, mu: float = 255.0, out: Optional[np.ndarray] = None,
+                    engine: Optional[str] = None) -> np.ndarray:
+    """Fused post_mu_grit compander: out = (1-a)·x + a·sign(x)·log1p(mu|x|)/log1p(mu). out may alias x."""
+    x = np.asarray(x, np.float32); out = _mulaw_out(x, out)
+    a = float(amount); mu = float(mu); eng = mulaw_engine(engine)
+    if eng == "numexpr":
+        f32 = np.float32
+        _mulaw_numexpr().evaluate("d*x + where(x < 0, -k, k)*log1p(mu*abs(x))",
+                                  local_dict=dict(x=x, d=f32(1.0 - a), k=f32(a / np.log1p(mu)), mu=f32(mu)),
+                                  out=out, casting="unsafe")
+    elif eng == "numba":
+        _mulaw_numba_kernels()[1](x, out, a, mu)
+    else:
+        n = min(MULAW_BLOCK, len(x)); t = np.empty(n, np.float32)
+        for s in range(0, len(x), MULAW_BLOCK):
+            xb = x[s:s+MULAW_BLOCK]; k = len(xb); tb = t[:k]
+            np.abs(xb, out=tb); tb *= mu; np.log1p(tb, out=tb); tb *= a / np.log1p(mu)
+            np.copysign(tb, xb, out=tb)
+            np.multiply(xb, 1.0 - a, out=out[s:s+k]); out[s:s+k] += tb
+    return out
+
+# Attack/release envelope engine.
+# The detector  g = (1-1/atk)·g + v/atk if v>g else (1-1/rel)·g + v/rel  is a plain
+# one-pole filter once the attack/release branch of every sample is known. The NumPy
+# kernel guesses the branch mask, solves that time-varying one-pole in closed form
+# (log-domain prefix scan, block by block), re-derives the mask from the result and
+# repeats until it stops changing — a self-consistent mask reproduces the loop exactly.
+# Samples before the first wrong branch are already exact, so each pass keeps them and
+# scans a window ahead sized by how far the mask last held. Input that keeps flipping
+# branches (signal riding the envelope) hands the next stretch to the loop after each
+# near-useless pass, and the whole block to it once `budget` block-lengths have been
+# scanned, which keeps it close to the loop's own cost.
+def _env_ar_python(ax: np.ndarray, atk: int, rel: int, g: float = 0.0) -> np.ndarray:
+    """Reference per-sample detector (the original loop)."""
+    e=np.zeros(len(ax),dtype=np.float64)
     for i,v in enumerate(ax):
         g = (1-1/atk)*g + (1/atk)*v if v>g else (1-1/rel)*g + (1/rel)*v
         e[i]=g
+    return e
+
+def _one_pole_scan(a: np.ndarray, b: np.ndarray, g0: float) -> np.ndarray:
+    """Closed form of g[i] = a[i]*g[i-1] + b[i] for a in (0,1]; caller bounds the block length."""
+    L=np.cumsum(np.log(a))
+    return np.exp(L) * (g0 + np.cumsum(b * np.exp(-L)))
+
+def _env_ar_numpy(ax: np.ndarray, atk: int, rel: int, budget: float = 8.0, g0: float = 0.0) -> np.ndarray:
+    ka, kr = 1.0/atk, 1.0/rel
+    if ka >= 1.0 or kr >= 1.0:  # one-sample time constant: pole at 0, nothing to scan
+        return _env_ar_python(ax, atk, rel, g0)
+    # keep exp(-cumsum(log a)) well inside float64 range within a block
+    block=int(np.clip(600.0/max(-np.log1p(-ka), -np.log1p(-kr)), 256, 1<<18))
+    e=np.empty(len(ax), dtype=np.float64); g=float(g0)
+    for s in range(0, len(ax), block):
+        v=np.asarray(ax[s:s+block], dtype=np.float64); n=len(v)  # float64 one block at a time
+        mask=np.zeros(n, dtype=bool); i=0; w=4096; run=1024; work=budget*n  # release-only first guess
+        while i < n:
+            if work < n-i:  # not settling: finish the block exactly
+                e[s+i:s+n]=_env_ar_python(v[i:], atk, rel, g); break
+            vs, ms=v[i:i+w], mask[i:i+w]; work-=len(vs)
+            gi=_one_pole_scan(np.where(ms, 1.0-ka, 1.0-kr), np.where(ms, ka, kr)*vs, g)
+            prev=np.empty_like(gi); prev[0]=g; prev[1:]=gi[:-1]
+            m=vs>prev; bad=np.flatnonzero(m != ms)
+            j=int(bad[0]) if len(bad) else len(vs)  # everything before the first wrong branch is exact
+            e[s+i:s+i+j]=gi[:j]
+            if j < len(vs):  # its input state is exact too, so take that sample with the right branch
+                k=ka if m[j] else kr; gi[j]=(1.0-k)*prev[j] + k*vs[j]; e[s+i+j]=gi[j]; j+=1
+                w=max(1024, 4*j)  # scan ahead about as far as the mask has been holding
+            else:
+                w*=2
+            g=float(gi[j-1]); ms[:]=m; i+=j
+            if j >= 64: run=1024
+            elif i < n:  # branches flip on every pass: the loop is cheaper for the next stretch, longer each time
+                t=min(n-i, run); e[s+i:s+i+t]=_env_ar_python(v[i:i+t], atk, rel, g); g=float(e[s+i+t-1]); i+=t; run*=2
+    return e
+
+ENV_ENGINES = ("auto", "numba", "numpy", "python")
+ENV_ENGINE = "auto"
+
+def set_env_engine(name: str) -> str:
+    """Select the detector kernel used by env_follow/leveler at runtime; returns the previous one."""
+    global ENV_ENGINE
+    name = (name or "auto").strip().lower()
+    if name not in ENV_ENGINES: raise ValueError(f"Unknown envelope engine '{name}' (choose from {', '.join(ENV_ENGINES)})")
+    prev, ENV_ENGINE = ENV_ENGINE, name
+    return prev
+
+set_env_engine(os.environ.get("VLAB_ENV_ENGINE", "auto"))  # a typo fails at import, not as a silent numpy fallback
+
+_ENV_NUMBA = None
+def _env_numba_kernel():
+    """Compile the loop with numba on first use; False when numba is not installed."""
+    global _ENV_NUMBA
+    if _ENV_NUMBA is None:
+        try:
+            from numba import njit
+            _ENV_NUMBA = njit(cache=True, nogil=True)(_env_ar_python)
+        except Exception:
+            _ENV_NUMBA = False
+    return _ENV_NUMBA
+
+def _env_ar(ax: np.ndarray, atk: int, rel: int, engine: Optional[str] = None, g0: float = 0.0) -> np.ndarray:
+    """Attack/release envelope of a rectified signal (float64 — the recursion needs it), starting from
+    state g0. float32 input is read as is, never copied to float64 in full.
+    engine: auto|numba|numpy|python (default ENV_ENGINE); numba falls back to numpy when missing."""
+    engine = (engine or ENV_ENGINE or "auto").lower()
+    if engine == "python":
+        return _env_ar_python(ax, int(atk), int(rel), float(g0))
+    kern=_env_numba_kernel() if engine in ("auto", "numba") else False
+    if kern:
+        ax = np.ascontiguousarray(ax)
+        return kern(ax if ax.dtype in (np.float32, np.float64) else ax.astype(np.float64), int(atk), int(rel), float(g0))
+    return _env_ar_numpy(ax, int(atk), int(rel), g0=float(g0))
+
+def env_engine(engine: Optional[str] = None) -> str:
+    """Backend an _env_ar call resolves to: the requested/selected engine, degraded to what is installed."""
+    engine = (engine or ENV_ENGINE or "auto").lower()
+    if engine == "python": return "python"
+    return "numba" if engine in ("auto", "numba") and _env_numba_kernel() else "numpy"
+
+def env_follow(x: np.ndarray, atk_ms=15.0, rel_ms=350.0) -> np.ndarray:
+    atk=max(1,int(SR*atk_ms/1000.0)); rel=max(1,int(SR*rel_ms/1000.0))
+    e=_env_ar(np.abs(x), atk, rel).astype(np.float32)
     m=float(e.max() or 1.0); return (e/m).astype(np.float32)
 
 def fade_window(n: int, fade: int) -> np.ndarray:
@@ -494,6 +1084,17 @@ def fade_window(n: int, fade: int) -> np.ndarray:
     w=np.ones(n,dtype=np.float32); r=np.linspace(0,1,fade,dtype=np.float32)
     w[:fade]=r; w[-fade:]=r[::-1]; return w
 
+def analytic_envelope(x: np.ndarray) -> np.ndarray:
+    """|hilbert(x)| in single precision: hypot(x, H(x)) with H from one rfft/irfft pair, zero-padded
+    to a fast FFT length (scipy's hilbert is a complex128 transform at len(x), slow when it's prime)."""
+    n = len(x); x = np.asarray(x, np.float32)
+    if n == 0: return np.zeros(0, np.float32)
+    N = sp_fft.next_fast_len(n, real=True)
+    X = sp_fft.rfft(x, N); X[0] = 0
+    if N % 2 == 0: X[-1] = 0
+    X *= np.complex64(-1j)
+    return np.hypot(x, sp_fft.irfft(X, N, overwrite_x=True)[:n])
+
 # ───────────────── stronger dereverb ─────────────────
 # Keep original (single-pass) for easy revert if needed
 def dereverb_strong_original(y: np.ndarray, amount: float) -> np.ndarray:
@@ -505,8 +1106,8 @@ def dereverb_strong_original(y: np.ndarray, amount: float) -> np.ndarray:
     except ImportError:
         return y.astype(np.float32)
 
-# Enhanced: allow >1.0 by chaining multiple passes internally
-def dereverb_strong(y: np.ndarray, amount: float) -> np.ndarray:
+# Chained reference: amounts above 1.0 as repeated reduce_noise passes (parity/bench baseline only)
+def dereverb_strong_chained(y: np.ndarray, amount: float) -> np.ndarray:
     if amount <= 0: return y.astype(np.float32)
     try:
         import noisereduce as nr
@@ -520,55 +1121,392 @@ def dereverb_strong(y: np.ndarray, amount: float) -> np.ndarray:
     except ImportError:
         return y.astype(np.float32)
 
-# True dereverberation (late reflections) via WPE. Falls back gracefully if unavailable.
-def wpe_dereverb(y: np.ndarray, iters: int = 1, taps: int = 12, delay: int = 3) -> Tuple[np.ndarray, str]:
+# Enhanced: allow >1.0 as one deeper gate (GATE_OVERSUB), cost constant in amount
+@_profiled("dereverb")
+def dereverb_strong(y: np.ndarray, amount: float) -> np.ndarray:
+    if amount <= 0: return y.astype(np.float32)
+    return cleanup_shared_stft(y, 0.0, amount)[0]
+
+# True dereverberation (late reflections) via WPE (nara_wpe, or the chunked native backend when selected).
+CLEANUP_NPERSEG, CLEANUP_HOP = 512, 128  # WPE's frame; the shared cleanup STFT uses it too
+
+def _cleanup_stft(y: np.ndarray) -> np.ndarray:
+    win = get_window("hann", CLEANUP_NPERSEG)
+    return stft(y, fs=SR, window=win, nperseg=CLEANUP_NPERSEG, noverlap=CLEANUP_NPERSEG - CLEANUP_HOP, boundary=None)[2]
+
+def _cleanup_istft(S: np.ndarray, n: int) -> np.ndarray:
+    win = get_window("hann", CLEANUP_NPERSEG)
+    with warnings.catch_warnings():  # boundary=None: only the very first sample lacks window overlap
+        warnings.filterwarnings("ignore", message="NOLA condition failed")
+        _, x = istft(S, fs=SR, window=win, nperseg=CLEANUP_NPERSEG, noverlap=CLEANUP_NPERSEG - CLEANUP_HOP,
+                     input_onesided=True, boundary=None)
+    return _fit_len(x.astype(np.float32, copy=False), n)
+
+# WPE is independent per frequency bin, so the chunked backend splits the bins into WPE_BINS-wide
+# groups handed to a thread pool (NumPy's matmul/solve release the GIL) and walks the time axis in
+# WPE_BLOCK-frame blocks overlapping by WPE_OVERLAP. Each block estimates its own filters from its
+# statistics plus WPE_CARRY times the previous block's (so blocks do not start cold), runs its own
+# iterations and is crossfaded into the output over the overlap. Working memory is bounded by the
+# block (delayed-tap stack WPE_BINS × taps × WPE_BLOCK per task) rather than the file, and an input
+# that fits one block gets exactly nara_wpe's offline estimate. "nara" (the default) hands the whole
+# spectrogram to nara_wpe.wpe in one call; chunked stays opt-in until its multi-block output is shown
+# to match nara_wpe at the real WPE_BLOCK, not just the short blocks case AA checks.
+WPE_ENGINES = ("nara", "chunked")
+WPE_ENGINE = os.environ.get("VLAB_WPE_ENGINE", "nara").strip().lower()
+WPE_WORKERS = int(os.environ.get("VLAB_WPE_WORKERS", "0")) or (os.cpu_count() or 1)
+WPE_BLOCK, WPE_OVERLAP = 4096, 512  # frames (~11 s / ~1.4 s at the 128 hop)
+WPE_BINS, WPE_CARRY = 16, 0.5
+
+def set_wpe_engine(name: str) -> str:
+    """Select the WPE backend at runtime; returns the previous one."""
+    global WPE_ENGINE
+    name = (name or "nara").strip().lower()
+    if name not in WPE_ENGINES: raise ValueError(f"Unknown WPE engine '{name}' (choose from {', '.join(WPE_ENGINES)})")
+    prev, WPE_ENGINE = WPE_ENGINE, name
+    return prev
+
+_WPE_POOL: Dict[int, Any] = {}; _wpe_pool_lock = threading.Lock()
+def _wpe_pool(workers: int):
+    with _wpe_pool_lock:  # Gradio renders on several threads; one executor per worker count
+        if workers not in _WPE_POOL:
+            from concurrent.futures import ThreadPoolExecutor
+            _WPE_POOL[workers] = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="vlab-wpe")
+        return _WPE_POOL[workers]
+
+def _wpe_solve(R: np.ndarray, P: np.ndarray) -> np.ndarray:
+    try: return np.linalg.solve(R, P)
+    except np.linalg.LinAlgError: return np.stack([np.linalg.lstsq(r, p, rcond=None)[0] for r, p in zip(R, P)])
+
+def _wpe_group(Y, Xb, ip, f0, f1, a, b, taps, delay, prev):
+    """One bin group of one block: filter from frames [a, b) (+ carried statistics), written into Xb."""
+    L = taps + delay - 1; seg = Y[f0:f1, max(0, a - L):b]
+    if a < L: seg = np.pad(seg, ((0, 0), (L - a, 0)))
+    Yt = np.stack([seg[:, L - delay - k:L - delay - k + b - a] for k in range(taps)], 1)  # (bins, taps, frames)
+    W = Yt * ip[f0:f1, None, :]
+    R = W @ Yt.conj().transpose(0, 2, 1); P = W @ Y[f0:f1, a:b, None].conj()
+    if prev is not None: R += WPE_CARRY * prev[0]; P += WPE_CARRY * prev[1]
+    G = _wpe_solve(R, P)
+    Xb[f0:f1] = Y[f0:f1, a:b] - (G.conj().transpose(0, 2, 1) @ Yt)[:, 0, :]
+    return R, P
+
+def wpe_chunked(Y: np.ndarray, iters: int = 1, taps: int = 12, delay: int = 3, workers: Optional[int] = None,
+                block: int = WPE_BLOCK, overlap: int = WPE_OVERLAP) -> np.ndarray:
+    """Single-channel WPE of a (F, T) spectrogram in bin groups × overlapping time blocks."""
+    F, T = Y.shape; workers = max(1, int(workers or WPE_WORKERS))
+    pool = _wpe_pool(workers) if workers > 1 else None
+    groups = [(f, min(F, f + WPE_BINS)) for f in range(0, F, WPE_BINS)]
+    out = np.empty_like(Y); prev: List[Any] = [None] * len(groups); a = 0
+    while True:
+        b = min(T, a + block); Xb = Y[:, a:b].copy()
+        for _ in range(max(1, int(iters))):
+            pw = Xb.real**2 + Xb.imag**2; eps = 1e-10 * float(pw.max())
+            ip = np.ones_like(pw) if eps == 0 else 1.0 / np.maximum(pw, eps)
+            args = [(Y, Xb, ip, f0, f1, a, b, taps, delay, prev[g]) for g, (f0, f1) in enumerate(groups)]
+            stats = list(pool.map(lambda t: _wpe_group(*t), args)) if pool else [_wpe_group(*t) for t in args]
+        prev = stats
+        if a == 0: out[:, :b] = Xb
+        else:
+            ov = min(overlap, b - a); r = ((np.arange(ov) + 0.5) / ov).astype(np.float32)
+            out[:, a:a+ov] *= 1.0 - r; out[:, a:a+ov] += r * Xb[:, :ov]; out[:, a+ov:b] = Xb[:, ov:]
+        if b >= T: return out
+        a = b - overlap
+
+def _wpe_tf(Y: np.ndarray, iters: int = 1, taps: int = 12, delay: int = 3) -> Optional[np.ndarray]:
+    """WPE estimate of a (F, T) spectrogram; None when the engine is unavailable or fails."""
+    if WPE_ENGINE == "chunked":
+        try: return wpe_chunked(Y, iters, taps, delay)
+        except Exception: return None
     try:
         from nara_wpe import wpe as wpe_module
     except (ImportError, AttributeError, ModuleNotFoundError):
-        return y.astype(np.float32), "WPE unavailable"
-    # Use SciPy STFT/ISTFT to avoid extra dependencies
-    nperseg = 512
-    hop = 128
-    noverlap = nperseg - hop
-    win = get_window("hann", nperseg)
-    _, _, Y = stft(y, fs=SR, window=win, nperseg=nperseg, noverlap=noverlap, boundary=None)
-    # Shape to (F, C, T) with C=1
-    Yc = Y[:, None, :]
+        return None
     try:
-        Xc = wpe_module.wpe(Yc, taps=int(taps), delay=int(delay), iterations=int(iters))
+        return wpe_module.wpe(Y[:, None, :], taps=int(taps), delay=int(delay), iterations=int(iters))[:, 0, :]
     except Exception:
-        return y.astype(np.float32), "WPE unavailable"
-    X = Xc[:, 0, :]
-    _, x = istft(X, fs=SR, window=win, nperseg=nperseg, noverlap=noverlap, input_onesided=True, boundary=None)
-    return x.astype(np.float32), "WPE applied"
+        return None
+
+@_profiled("wpe")
+def wpe_dereverb(y: np.ndarray, iters: int = 1, taps: int = 12, delay: int = 3) -> Tuple[np.ndarray, str]:
+    # Use SciPy STFT/ISTFT to avoid extra dependencies
+    X = _wpe_tf(_cleanup_stft(y), iters, taps, delay)
+    if X is None: return y.astype(np.float32), "WPE unavailable"
+    profile_count("stft_transforms", 2)
+    return _cleanup_istft(X, len(y)), "WPE applied"
+
+# ───────────────── shared-STFT source cleanup ─────────────────
+# WPE and the dereverb spectral gate work on one spectrogram: the WPE estimate is blended in
+# the time-frequency domain, the gate (noisereduce's non-stationary gate, one mask whatever the
+# amount) multiplies into the same spectrum, and a single ISTFT resynthesizes. With the gate in
+# play the shared frame is noisereduce's (1024/256, signal zero-padded by its 30000-sample chunk padding, gated in its 600000-sample chunks), so the
+# gate alone reproduces reduce_noise; WPE then runs at that frame with taps/delay rescaled to the
+# same span in seconds. WPE alone keeps its own 512/128 frame. Transforms the separate stages
+# would have taken — an STFT/ISTFT pair for WPE plus one per noisereduce chunk for the gate —
+# minus the shared pair are reported as stft_transforms_saved in the render profile.
+# Amounts above 1.0 used to chain reduce_noise passes (dereverb_strong_chained); one full-depth
+# mask raised to 1 + GATE_OVERSUB·(amount − 1) approximates them. It is not exact: each chained
+# pass re-estimates noise on already-gated audio, which no single exponent reproduces. On
+# reverberant noisy speech the spectral error is ~1% at 1.2, ~15% at 2 and ~24% at 3, with
+# energy within 10%; an exponent fitted per amount only gains a couple of points.
+NR_NFFT, NR_HOP = 1024, 256
+NR_CHUNK, NR_PAD = 600000, 30000  # noisereduce.reduce_noise defaults (chunk_size / padding, samples)
+GATE_FRAMES, GATE_PAD = NR_CHUNK // NR_HOP, NR_PAD // NR_HOP
+GATE_OVERSUB = 0.5  # mask exponent per unit of amount above 1.0, least-squares fit to the chained passes
+
+@functools.lru_cache(maxsize=4)
+def _gate_smoothing(sr: int = SR, n_fft: int = NR_NFFT, hop: int = NR_HOP,
+                    freq_hz: float = 500.0, time_ms: float = 50.0) -> np.ndarray:
+    """noisereduce's triangular mask-smoothing kernel for this frame size."""
+    nf = max(1, int(freq_hz / (sr / (n_fft / 2)))); nt = max(1, int(time_ms / (hop / sr * 1000)))
+    tri = lambda k: np.concatenate([np.linspace(0, 1, k + 1, endpoint=False), np.linspace(1, 0, k + 2)])[1:-1]
+    k = np.outer(tri(nf), tri(nt)); return (k / k.sum()).astype(np.float32)
+
+def spectral_gate_mask(mag: np.ndarray, prop_decrease: float, sr: int = SR, hop: int = NR_HOP,
+                       time_constant_s: float = 2.0, thresh: float = 2.0, slope: float = 10.0) -> np.ndarray:
+    """Non-stationary spectral gate mask (float32, same shape as mag): sigmoid of how far each bin
+    stands above its filtfilt-smoothed level, smoothed, blended to 1 - prop_decrease. Above 1.0 the
+    full mask is raised to 1 + GATE_OVERSUB·(prop_decrease - 1) instead."""
+    from scipy.signal import filtfilt
+    t = time_constant_s * sr / float(hop); b = (np.sqrt(1 + 4 * t**2) - 1) / (2 * t**2)
+    smooth = filtfilt([b], [1, b - 1], mag, axis=-1, padtype=None).astype(np.float32)
+    smooth += np.finfo(np.float32).tiny
+    m = (mag - smooth) / smooth; m -= thresh; m *= -slope; np.exp(m, out=m); m += 1; np.reciprocal(m, out=m)
+    m = oaconvolve(m, _gate_smoothing(sr, hop=hop), mode="same").astype(np.float32, copy=False)
+    if prop_decrease > 1.0:
+        np.clip(m, 0.0, 1.0, out=m); m **= np.float32(1.0 + GATE_OVERSUB * (prop_decrease - 1.0))
+    else:
+        m *= prop_decrease; m += 1.0 - prop_decrease
+    return m
+
+def apply_spectral_gate(S: np.ndarray, amount: float, chunk: int = GATE_FRAMES, pad: int = GATE_PAD):
+    """Gate a (F, T) spectrogram in place with one mask of `amount`; longer than one chunk it goes
+    chunk by chunk with pad frames of context (silent past the ends)."""
+    T = S.shape[1]
+    if T <= chunk + 2 * pad: chunk, pad = T, 0
+    for a in range(0, T, chunk):
+        lo, hi = max(0, a - pad), min(T, a + chunk + pad)
+        mag = np.zeros((S.shape[0], chunk + 2 * pad), np.float32)
+        o = lo - (a - pad); mag[:, o:o + hi - lo] = np.abs(S[:, lo:hi])
+        S[:, a:a+chunk] *= spectral_gate_mask(mag, amount)[:, pad:pad + min(chunk, T - a)]
+
+@_profiled("cleanup_stft")
+def cleanup_shared_stft(y: np.ndarray, wpe_strength: float, dereverb_amt: float, wpe_iters: int = 1,
+                        taps: int = 12, delay: int = 3) -> Tuple[np.ndarray, bool]:
+    """WPE blend (strength wpe_strength) then dereverb gating (amount dereverb_amt) on one STFT,
+    one ISTFT. Returns (audio, WPE applied)."""
+    n = len(y); y = np.asarray(y, np.float32)
+    if dereverb_amt > 0.0:
+        xp = np.pad(y, NR_PAD); nov = NR_NFFT - NR_HOP
+        S = stft(xp, nperseg=NR_NFFT, noverlap=nov, padded=False)[2]
+        k = CLEANUP_HOP / NR_HOP; taps, delay = max(1, round(taps * k)), max(1, round(delay * k))
+    else:
+        S = _cleanup_stft(y)
+    wpe_ok = False
+    if wpe_strength > 0.0:
+        with profile_stage("wpe"):
+            X = _wpe_tf(S, wpe_iters, taps, delay)
+        if X is not None:
+            wpe_ok = True; S *= 1.0 - wpe_strength; S += wpe_strength * X
+    if dereverb_amt > 0.0:
+        with profile_stage("gate"):
+            if DENOISE_ENGINE == "online": S *= OnlineNoiseEstimator(NR_HOP).gain(S, dereverb_amt)
+            else: apply_spectral_gate(S, dereverb_amt, S.shape[1] if n <= NR_CHUNK else GATE_FRAMES)
+        x = istft(S, nperseg=NR_NFFT, noverlap=nov)[1]
+        y = _fit_len(x[NR_PAD:NR_PAD + n].astype(np.float32, copy=False), n)
+    else:
+        y = _cleanup_istft(S, n)
+    separate = (2 if wpe_ok else 0) + (2 * max(1, -(-n // NR_CHUNK)) if dereverb_amt > 0.0 else 0)
+    profile_count("stft_transforms", 2); profile_count("stft_transforms_saved", max(0, separate - 2))
+    return y, wpe_ok
+
+# ───────────────── online noise estimate ─────────────────
+# MCRA (Cohen & Berdugo, minima-controlled recursive averaging): per bin, a time/frequency smoothed
+# power S, its minimum over the last one to two NOISE_WIN_S windows, a speech-presence probability
+# from S/Smin > NOISE_DELTA, and a noise power that only averages in |Y|² while speech is unlikely.
+# The mask is the spectral gate's sigmoid with the noise magnitude sqrt(λ) as its reference, the
+# gate's smoothing kernel across frequency and a causal NOISE_TAU_G one-pole across time, shaped
+# by amount as the gate (blend below 1.0, GATE_OVERSUB exponent above). State is O(1) per bin, so it runs frame
+# by frame: inside the shared cleanup STFT (DENOISE_ENGINE "online", instead of the
+# look-ahead-and-behind noisereduce gate) and push-mode on a stream (OnlineDenoiser). Each call
+# takes a batch of frames, vectorized over time except for one step per window (minimum) and per
+# NOISE_STEP frames (noise recursion). Exact digital silence does not update the statistics, and
+# until a full window has passed the noise power is a plain recursive average, capped at
+# NOISE_BIAS times the running minimum so speech at the very start is not taken for noise.
+DENOISE_ENGINES = ("gate", "online")
+DENOISE_ENGINE = os.environ.get("VLAB_DENOISE_ENGINE", "gate").strip().lower()
+NOISE_TAU_S, NOISE_TAU_P, NOISE_TAU_D, NOISE_TAU_G = 0.036, 0.005, 0.156, 0.01  # time constants (s): power, presence, noise, mask
+NOISE_WIN_S, NOISE_DELTA, NOISE_STEP, NOISE_BIAS = 1.0, 5.0, 32, 2.0
+
+def set_denoise_engine(name: str) -> str:
+    """Select the dereverb/denoise estimator ("gate" or "online") at runtime; returns the previous one."""
+    global DENOISE_ENGINE
+    name = (name or "gate").strip().lower()
+    if name not in DENOISE_ENGINES: raise ValueError(f"Unknown denoise engine '{name}' (choose from {', '.join(DENOISE_ENGINES)})")
+    prev, DENOISE_ENGINE = DENOISE_ENGINE, name
+    return prev
+
+class OnlineNoiseEstimator:
+    """MCRA noise power for (F, t) batches of spectrogram frames fed in time order."""
+    def __init__(self, hop: int, sr: int = SR):
+        a = lambda tau: float(np.exp(-hop / (tau * sr)))
+        self.a_s, self.a_p, self.a_d, self.a_g = a(NOISE_TAU_S), a(NOISE_TAU_P), a(NOISE_TAU_D), a(NOISE_TAU_G)
+        self.win = max(1, int(round(NOISE_WIN_S * sr / hop))); self.sr, self.hop = sr, hop
+        self.S = self.p = self.lam = self.prev = self.cur = self.g = None; self.pos = self.seen = 0
+
+    def __call__(self, P: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """(smoothed power S, noise power λ) for power frames P (F, t), both float64."""
+        P = np.asarray(P, np.float64); F, t = P.shape
+        Sf = 0.5 * P; Sf[1:] += 0.25 * P[:-1]; Sf[:-1] += 0.25 * P[1:]; Sf[0] += 0.25 * P[0]; Sf[-1] += 0.25 * P[-1]
+        if self.S is None:
+            self.S, self.lam, self.p = Sf[:, 0].copy(), P[:, 0].copy(), np.zeros(F)
+            self.prev = self.cur = np.full(F, np.inf)
+        S = lfilter([1 - self.a_s], [1, -self.a_s], Sf, axis=1, zi=self.a_s * self.S[:, None])[0]
+        Smin = np.empty_like(S); i = 0
+        while i < t:
+            k = min(t - i, self.win - self.pos)
+            run = np.minimum(np.minimum.accumulate(S[:, i:i+k], axis=1), self.cur[:, None])
+            Smin[:, i:i+k] = np.minimum(run, self.prev[:, None])
+            self.cur = run[:, -1]; self.pos += k; i += k
+            if self.pos == self.win: self.prev, self.cur, self.pos = self.cur, np.full(F, np.inf), 0
+        pres = lfilter([1 - self.a_p], [1, -self.a_p], (S > NOISE_DELTA * Smin).astype(np.float64), axis=1,
+                       zi=self.a_p * self.p[:, None])[0]
+        ad = self.a_d + (1 - self.a_d) * pres; lam = np.empty_like(P); l0 = self.lam
+        w = min(t, max(0, self.win - self.seen))
+        if w: ad[:, :w] = self.a_d  # no full window yet: plain averaging, capped by the running minimum
+        self.seen += t
+        for i in range(0, t, NOISE_STEP):  # λ_j = a_j λ_{j-1} + (1 - a_j) P_j, unrolled per step
+            a = ad[:, i:i+NOISE_STEP]; A = np.cumprod(a, axis=1)
+            lam[:, i:i+NOISE_STEP] = A * (l0[:, None] + np.cumsum((1 - a) * P[:, i:i+NOISE_STEP] / A, axis=1))
+            l0 = lam[:, min(t, i + NOISE_STEP) - 1].copy()
+        self.S, self.p, self.lam = S[:, -1], pres[:, -1], l0
+        if w: lam[:, :w] = np.minimum(lam[:, :w], NOISE_BIAS * Smin[:, :w])
+        return S, lam
+
+    def gain(self, Y: np.ndarray, amount: float, thresh: float = 2.0, slope: float = 10.0) -> np.ndarray:
+        """Suppression mask (float32, Y's shape) for complex frames Y at this amount; silent frames pass."""
+        g = np.ones(Y.shape, np.float32); P = Y.real**2 + Y.imag**2; live = P.sum(axis=0) > 0
+        if live.any():
+            P = P[:, live]; lam = self(P)[1]
+            m = np.sqrt(P / np.maximum(lam, 1e-20)); m -= 1.0 + thresh; m *= -slope; np.exp(m, out=m); m += 1; np.reciprocal(m, out=m)
+            kf = _gate_smoothing(self.sr, 2 * (Y.shape[0] - 1), self.hop).sum(axis=1)
+            m = oaconvolve(m, kf[:, None], mode="same")
+            if self.g is None: self.g = m[:, 0].copy()
+            m = lfilter([1 - self.a_g], [1, -self.a_g], m, axis=1, zi=self.a_g * self.g[:, None])[0]
+            self.g = m[:, -1]; m = m.astype(np.float32)
+            if amount > 1.0: np.clip(m, 0.0, 1.0, out=m); m **= np.float32(1.0 + GATE_OVERSUB * (amount - 1.0))
+            else: m *= amount; m += 1.0 - amount
+            g[:, live] = m
+        return g
+
+class OnlineDenoiser:
+    """Push-mode online denoise of a sample stream (same call convention as StreamResampler):
+    each call returns the samples whose overlap-add is complete, final=True flushes the rest, and
+    the concatenated output is time-aligned with the input, sample for sample."""
+    def __init__(self, amount: float, sr: int = SR, nperseg: int = NR_NFFT, hop: int = NR_HOP):
+        self.amount, self.n, self.hop = float(amount), nperseg, hop
+        self.win = get_window("hann", nperseg).astype(np.float32)
+        self.syn = self.win / np.float32(np.sum(self.win**2) / hop)
+        self.est = OnlineNoiseEstimator(hop, sr)
+        self.buf = np.zeros(nperseg - hop, np.float32)  # frame j spans input [j·hop - (n - hop), j·hop + hop)
+        self.ola = np.zeros(nperseg - hop, np.float32); self.n_in = self.done = 0; self.skip = nperseg - hop
+
+    def __call__(self, x: np.ndarray, final: bool = False) -> np.ndarray:
+        n, hop = self.n, self.hop
+        self.buf = np.concatenate([self.buf, np.asarray(x, np.float32)]); self.n_in += len(x)
+        if final: self.buf = np.concatenate([self.buf, np.zeros((-len(self.buf)) % hop + n - hop, np.float32)])
+        k = (len(self.buf) - (n - hop)) // hop
+        if k <= 0: return np.zeros(0, np.float32)
+        fr = sliding_window_view(self.buf[:(k - 1) * hop + n], n)[::hop] * self.win
+        Y = sp_fft.rfft(fr, axis=1).T
+        Y *= self.est.gain(Y, self.amount)
+        fr = sp_fft.irfft(Y.T, n, axis=1).astype(np.float32) * self.syn
+        out = np.zeros(k * hop + n - hop, np.float32); out[:n - hop] = self.ola
+        for j in range(n // hop):  # overlap-add, one strided add per window segment
+            seg = fr[:, j * hop:(j + 1) * hop]; out[j * hop:j * hop + k * hop] += seg.reshape(-1)
+        self.buf = self.buf[k * hop:]; self.ola = out[k * hop:]
+        y = out[:k * hop][self.skip:]; self.skip = max(0, self.skip - k * hop)
+        if final: y = y[:self.n_in - self.done]
+        self.done += len(y); return y
+
+@_profiled("denoise_online")
+def denoise_online(y: np.ndarray, amount: float) -> np.ndarray:
+    """Whole-array OnlineDenoiser pass (the streaming estimator applied offline, fed in cache-sized blocks)."""
+    if amount <= 0: return np.asarray(y, np.float32)
+    den, n = OnlineDenoiser(amount), len(y); B = 1 << 18
+    return np.concatenate([den(y[i:i + B], final=i + B >= n) for i in range(0, max(n, 1), B)])
+
+# ───────────────── IR store + partitioned convolution ─────────────────
+# Normalized IRs and their per-block-size partition spectra live in their own LRU
+# (VLAB_IR_CACHE_MB), so after the first render an IR costs no disk/resample/FFT work.
+# Convolution is uniformly partitioned overlap-save: memory is O(chunk + IR), not O(len(x)).
+IR_CACHE_MB = float(os.environ.get("VLAB_IR_CACHE_MB", "128"))
+IR_STORE = _AssetCache(IR_CACHE_MB)
+OLS_CHUNK = 1 << 18  # input samples transformed per batch of partitions
+
+def ir_load_cached(ir_path: str, sr: int = SR) -> np.ndarray:
+    """Mono, resampled, peak-normalized IR (read-only); empty when unusable."""
+    def _load():
+        ir,isr=_load_audio(ir_path); ir=_mono_sr(ir,isr,sr)
+        if len(ir)<8: return np.zeros(0, dtype=np.float32)
+        return (ir/(np.max(np.abs(ir))+1e-9)).astype(np.float32)
+    return IR_STORE.get_or_load(f"ir|{sr}|{_file_sig(ir_path)}", _load)
+
+def _ols_block(n_ir: int) -> int:
+    """Partition length: ~8 partitions per IR, power of two, 512..16384."""
+    return int(np.clip(1 << int(np.ceil(np.log2(max(1, n_ir // 8)))), 512, 16384))
+
+def _ir_partitions(ir: np.ndarray, block: int) -> np.ndarray:
+    """rfft (size 2*block) of each block-long IR partition → (P, block+1) complex64."""
+    P=-(-len(ir)//block)
+    h=np.zeros(P*block, dtype=np.float32); h[:len(ir)]=ir
+    return sp_fft.rfft(h.reshape(P, block), n=2*block, axis=1)
+
+def ir_partitions_cached(ir_path: str, block: int, sr: int = SR) -> np.ndarray:
+    return IR_STORE.get_or_load(f"irpart|{sr}|{block}|{_file_sig(ir_path)}",
+                                lambda: _ir_partitions(ir_load_cached(ir_path, sr), block))
+
+def ols_convolve(x: np.ndarray, H: np.ndarray, block: int, chunk: int = OLS_CHUNK,
+                 state: Optional[dict] = None) -> np.ndarray:
+    """First len(x) samples of x * h, with h given as partition spectra H (see _ir_partitions).
+    state: carry dict for block streaming; every call but the last must be a multiple of block long."""
+    P=H.shape[0]; n=len(x); K=-(-n//block); M=max(1, chunk//block)
+    y=np.empty(K*block, dtype=np.float32)
+    seg=np.zeros((M+1)*block, dtype=np.float32)
+    fdl=np.zeros((P-1, block+1), dtype=H.dtype)  # spectra of the previous P-1 input frames
+    prev=None
+    if state:
+        fdl=state.get("fdl", fdl); prev=state.get("prev")
+    for k0 in range(0, K, M):
+        mb=min(M, K-k0); lo=(k0-1)*block
+        a=max(lo, 0); b=min((k0+mb)*block, n)
+        seg[:]=0.0; seg[a-lo:b-lo]=x[a:b]
+        if lo<0 and prev is not None: seg[:block]=prev
+        X=sp_fft.rfft(sliding_window_view(seg[:(mb+1)*block], 2*block)[::block], axis=1)
+        if P>1: X=np.concatenate([fdl, X])
+        Y=X[P-1:P-1+mb]*H[0]
+        for p in range(1, P):
+            Y+=X[P-1-p:P-1-p+mb]*H[p]
+        y[k0*block:(k0+mb)*block]=sp_fft.irfft(Y, n=2*block, axis=1)[:, block:].ravel()
+        if P>1: fdl=X[-(P-1):]
+    if state is not None and n>=block:
+        state["fdl"]=fdl; state["prev"]=np.array(x[(K-1)*block:K*block], dtype=np.float32)
+    return y[:n]
 
 # ───────────────── background + BG-IR ─────────────────
-def convolve_ir(x: np.ndarray, ir_path: Optional[str], mix_percent: float = 0.0) -> np.ndarray:
-    """Apply IR with wet/dry mixing. mix_percent: 0=dry, 100=wet"""
+def convolve_ir(x: np.ndarray, ir_path: Optional[str], mix_percent: float = 0.0, state: Optional[dict] = None) -> np.ndarray:
+    """Apply IR with wet/dry mixing. mix_percent: 0=dry, 100=wet (state: see ols_convolve)"""
     if not ir_path or not os.path.exists(ir_path) or mix_percent <= 0: return x
     mix = np.clip(mix_percent / 100.0, 0.0, 1.0)
-    ir,sr=_load_audio(ir_path); ir=_mono_sr(ir,sr,SR)
+    ir=ir_load_cached(ir_path, SR)
     if len(ir)<8: return x
-    ir=ir/(np.max(np.abs(ir))+1e-9)
-    # Use mode="full" and trim to prevent time-shift/echo
-    wet=fftconvolve(x, ir, mode="full")[:len(x)].astype(np.float32)
+    # Causal convolution trimmed to len(x) (same as fftconvolve "full"[:len(x)]) — no time-shift/echo
+    block=_ols_block(len(ir))
+    wet=ols_convolve(np.asarray(x, dtype=np.float32), ir_partitions_cached(ir_path, block, SR), block, state=state)
     return (x + mix * (wet - x)).astype(np.float32)
 
-def _bg_random_start(bed: np.ndarray, target_len: int) -> np.ndarray:
-    """Randomize background start point for uniqueness, then tile/trim to target length."""
-    if len(bed) == 0:
-        return bed
-    # Pick random start position
-    start = random.randint(0, len(bed) - 1)
-    # Rotate: concatenate from start to end, then beginning to start
-    rotated = np.concatenate([bed[start:], bed[:start]])
-    # Tile if needed
-    if len(rotated) < target_len:
-        reps = int(np.ceil(target_len / len(rotated)))
-        rotated = np.tile(rotated, reps)
-    # Trim to exact length
-    return rotated[:target_len]
+def _bg_pick_start(n_bed: int, rng: Optional[np.random.Generator] = None) -> int:
+    return int(_rng(rng).integers(0, n_bed))
 
+@_profiled("background")
 def stream_background(y: np.ndarray,
                       bg_path: Optional[str],
                       bg_ir_path: Optional[str],
@@ -576,14 +1514,13 @@ def stream_background(y: np.ndarray,
                       bg_gain_db: float,
                       bg_hpf: float, bg_lpf: float,
                       duck_db: float,
-                      block_s: float = 10.0) -> np.ndarray:
-    if not bg_path:
-        return y
-    bed = _decode_any_to_float32(bg_path, SR)
-    if bed.size == 0:
+                      block_s: float = 10.0,
+                      rng: Optional[np.random.Generator] = None) -> np.ndarray:
+    reader = open_bed(bg_path, SR)
+    if reader is None:
         return y
-    # Randomize start point, then loop/tile to length
-    bed = _bg_random_start(bed, len(y))
+    # Random start point, looped to length: only that excerpt is decoded
+    bed = reader.read(_bg_pick_start(reader.n, rng), len(y))
     # Background IR on bed
     if bg_ir_path:
         bed = convolve_ir(bed, bg_ir_path, float(bg_ir_gain_db))
@@ -599,25 +1536,114 @@ def stream_background(y: np.ndarray,
     return (y + g_bg * bed * g_duck).astype(np.float32)
 
 # ───────────────── one-knob leveler ─────────────────
-def leveler(x: np.ndarray, amount: float) -> np.ndarray:
+@_profiled("leveler")
+def leveler(x: np.ndarray, amount: float, state: Optional[dict] = None) -> np.ndarray:
     a=float(np.clip(amount,0.0,1.0))
     if a<=0: return x
     target_rms_db = -28.0 + 12.0*a
     atk_ms = 10.0 - 6.0*a; rel_ms = 320.0 - 200.0*a
     atk=max(1,int(SR*atk_ms/1000.0)); rel=max(1,int(SR*rel_ms/1000.0))
-    env=np.zeros_like(x,dtype=np.float32); g=0.0; ax=np.abs(x)+1e-9
-    for i,v in enumerate(ax):
-        g = (1-1/atk)*g + (1/atk)*v if v>g else (1-1/rel)*g + (1/rel)*v
-        env[i]=g
+    env=_env_ar(np.abs(x)+1e-9, atk, rel, g0=(state or {}).get("g", 0.0))  # gain computer: shared envelope engine
+    if state is not None and len(env): state["g"]=float(env[-1])
+    env=env.astype(np.float32)
     tgt=10**(target_rms_db/20.0); y=x*(tgt/(env+1e-9))
     t=0.92 - 0.25*a
     return (np.tanh(y/t)*t).astype(np.float32)
 
 # ───────────────── Opus round-trip ─────────────────
-def opus_round_trip(in_wav_path: str, bitrate_kbps: float = 12.0, samplerate: int = SR) -> Optional[str]:
+# Backends (VLAB_OPUS_BACKEND, "auto" tries them in this order):
+#   opuslib — encode/decode numpy frames in-process through libopus
+#   pipe    — raw float32 through ffmpeg encode→decode chained over pipes, no temp files
+#   file    — the original temp-WAV round trip (opus_round_trip)
+# Decoded results are cached in memory (VLAB_OPUS_CACHE_MB) by a hash of the audio content.
+OPUS_BACKENDS = ("auto", "opuslib", "pipe", "file")
+OPUS_BACKEND = os.environ.get("VLAB_OPUS_BACKEND", "auto").strip().lower()
+OPUS_CACHE = _AssetCache(float(os.environ.get("VLAB_OPUS_CACHE_MB", "256")))
+
+def _content_key(y: np.ndarray, *extra) -> str:
+    h=hashlib.sha1(np.ascontiguousarray(y, dtype=np.float32).tobytes())
+    h.update(repr(extra).encode()); return h.hexdigest()
+
+def _fit_len(y: np.ndarray, n: int) -> np.ndarray:
+    y=np.asarray(y, dtype=np.float32)
+    return y[:n] if len(y)>=n else np.pad(y, (0, n-len(y)))
+
+def _opus_opuslib(y: np.ndarray, bps: float, sr: int) -> np.ndarray:
+    import opuslib  # raises a bare Exception when libopus itself is missing
+    frame=sr//50  # 20 ms, as ffmpeg's libopus encoder
+    enc=opuslib.Encoder(sr, 1, "audio"); enc.bitrate=int(bps*1000)
+    dec=opuslib.Decoder(sr, 1)
+    skip=int(enc.lookahead)
+    n=len(y)+skip; x=np.zeros(-(-n//frame)*frame, dtype=np.float32); x[:len(y)]=y
+    out=[np.frombuffer(dec.decode_float(enc.encode_float(x[i:i+frame].tobytes(), frame), frame), dtype=np.float32)
+         for i in range(0, len(x), frame)]
+    return _fit_len(np.concatenate(out)[skip:], len(y))
+
+def _opus_pipe(y: np.ndarray, bps: float, sr: int) -> np.ndarray:
+    if not have_ffmpeg(): raise RuntimeError("ffmpeg not found")
+    q=["ffmpeg","-hide_banner","-loglevel","error"]
+    enc=subprocess.Popen(q+["-f","f32le","-ar",str(sr),"-ac","1","-i","pipe:0","-c:a","libopus","-b:a",f"{int(bps)}k","-f","ogg","pipe:1"],
+                         stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+    dec=subprocess.Popen(q+["-i","pipe:0","-f","f32le","-ac","1","-ar",str(sr),"pipe:1"],
+                         stdin=enc.stdout, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    enc.stdout.close()  # decoder owns the read end now
+    def _feed():
+        try: enc.stdin.write(np.ascontiguousarray(y, dtype=np.float32).tobytes())
+        except (BrokenPipeError, OSError): pass
+        finally:
+            try: enc.stdin.close()
+            except OSError: pass
+    feeder=threading.Thread(target=_feed, daemon=True); feeder.start()
+    raw,err=dec.communicate(); feeder.join(); enc.wait()
+    if enc.returncode!=0 or dec.returncode!=0: raise RuntimeError(err.decode(errors="ignore")[:400])
+    return _fit_len(np.frombuffer(raw, dtype=np.float32), len(y))
+
+def _opus_file(y: np.ndarray, bps: float, sr: int) -> np.ndarray:
+    tmp_in=_save_wav_tmp(y, sr)
+    try:
+        path=opus_round_trip(tmp_in, bps, sr, retry=False)
+        if not path: raise RuntimeError("ffmpeg round trip failed")
+        yc,osr=_load_audio(path); return _fit_len(_mono_sr(yc,osr,sr), len(y))
+    finally:
+        try: os.remove(tmp_in)
+        except OSError: pass
+
+_OPUS_IMPLS = {"opuslib": _opus_opuslib, "pipe": _opus_pipe, "file": _opus_file}
+
+@functools.lru_cache(maxsize=8)
+def _opus_resolved(backend: str) -> str:
+    """The backend opus_codec's chain for `backend` lands on here: opuslib when libopus loads, else
+    the ffmpeg ones when ffmpeg is on PATH ("unavailable": none). Probed once per selection."""
+    for name in (b for b in OPUS_BACKENDS[1:] if backend in ("auto", b)):
+        if name == "opuslib":
+            try:
+                import opuslib
+                opuslib.Encoder(SR, 1, "audio"); return name
+            except Exception:  # bare Exception when libopus itself is missing
+                continue
+        if have_ffmpeg(): return name
+    return "unavailable"
+
+@_profiled("opus")
+def opus_codec(y: np.ndarray, bitrate_kbps: float = 12.0, sr: int = SR, backend: Optional[str] = None) -> Tuple[Optional[np.ndarray], str]:
+    """Opus encode→decode of a mono float32 buffer (same length out, read-only).
+    Returns (audio, backend) or (None, "unavailable"); retries at 12 kbps like opus_round_trip."""
+    backend=(backend or OPUS_BACKEND or "auto").lower()
+    chain=[b for b in OPUS_BACKENDS[1:] if backend in ("auto", b)]
+    for bps in dict.fromkeys((float(bitrate_kbps), 12.0)):
+        for name in chain:
+            try:
+                key=f"opus|{name}|{_content_key(y, int(bps), sr)}"
+                return OPUS_CACHE.get_or_load(key, lambda: _OPUS_IMPLS[name](y, bps, sr)), name
+            except Exception:
+                continue
+    return None, "unavailable"
+
+def opus_round_trip(in_wav_path: str, bitrate_kbps: float = 12.0, samplerate: int = SR, retry: bool = True) -> Optional[str]:
     if not have_ffmpeg(): return None
     def run(bps):
-        key=hashlib.sha1(f"{_file_sig(in_wav_path)}:{bps}:{samplerate}".encode()).hexdigest()
+        with open(in_wav_path, "rb") as f: digest=hashlib.sha1(f.read()).hexdigest()  # content, not temp-file name
+        key=hashlib.sha1(f"{digest}:{bps}:{samplerate}".encode()).hexdigest()
         tmp_opus=os.path.join(TMP_DIR, f"vlab_{key}.opus")
         tmp_out =os.path.join(TMP_DIR, f"vlab_{key}.wav")
         if os.path.exists(tmp_out): return tmp_out
@@ -631,36 +1657,85 @@ def opus_round_trip(in_wav_path: str, bitrate_kbps: float = 12.0, samplerate: in
     try:
         return run(bitrate_kbps)
     except Exception:
+        if not retry: return None
         try: return run(12.0)
         except Exception:
             return None
 
 # ───────────────── OLD EFFECTS you liked ─────────────────
-def apply_stutter_old(x: np.ndarray, amt: float, sr: int = SR) -> np.ndarray:
-    if amt <= 0: return x
-    window = int(sr * 0.05)  # ~50ms
-    out=[]; i=0
-    while i < len(x):
-        chunk = x[i:i+window]
-        if random.random() < amt:
-            repeats = random.randint(1,3)
-            for _ in range(repeats): out.append(chunk)
-        else:
-            out.append(chunk)
-        i += window
-    y = np.concatenate(out)
-    return y[:len(x)]
+# Stutter and packet reordering only rearrange samples. Each plans its output as back-to-back source
+# runs (src, length; src -1 = inserted silence) that expand to an int32 gather map (output sample →
+# source sample, -1 = silence); the audio is np.take into one preallocated buffer, with the map
+# expanded a block at a time. return_map=True (or the *_index_map planners fed the same Generator)
+# hands the whole map out for QA, and index_map_runs() condenses it to (out_start, src_start, length).
+GATHER_BLOCK = 1 << 18  # np.take casts indices to intp, so expand and gather in blocks
+
+def _runs_to_map(src: np.ndarray, lens: np.ndarray, lo: int, hi: int) -> np.ndarray:
+    """int32 map for output samples [lo, hi) of runs [src, src+len) laid back to back (past the end: -1)."""
+    end = np.cumsum(lens); at = end - lens
+    j0, j1 = int(np.searchsorted(end, lo, 'right')), int(np.searchsorted(at, hi, 'left'))
+    s, l, a = src[j0:j1].copy(), lens[j0:j1].copy(), at[j0:j1] - lo
+    idx = np.ones(hi - lo, np.int32)  # per-sample steps; one cumsum in place turns them into indices
+    if len(s):
+        cut = -int(a[0]); l[0] -= cut; a[0] = 0
+        if s[0] >= 0: s[0] += cut
+        idx[0] = s[0]
+        idx[a[1:]] = s[1:] - (s[:-1] + l[:-1] - 1)
+        np.cumsum(idx, out=idx)
+    for p, k in zip(a[s < 0].tolist(), l[s < 0].tolist()): idx[p:p + k] = -1
+    idx[int(a[-1] + l[-1]) if len(s) else 0:] = -1
+    return idx
+
+def _gather_runs(x: np.ndarray, src: np.ndarray, lens: np.ndarray, dtype=None) -> np.ndarray:
+    n = len(x); out = np.empty(n, dtype=dtype or x.dtype)
+    for i in range(0, n, GATHER_BLOCK):
+        ib, ob = _runs_to_map(src, lens, i, min(n, i + GATHER_BLOCK)), out[i:i + GATHER_BLOCK]
+        np.take(x, ib, out=ob, mode='clip')
+        if ib.min(initial=0) < 0: ob[ib < 0] = 0.0
+    return out
 
-def apply_mp3_sizzle_old(x: np.ndarray, amt: float) -> np.ndarray:
+def index_map_runs(idx: np.ndarray) -> np.ndarray:
+    """(k, 3) int64 rows (out_start, src_start, length) of a gather map; src_start -1 = silence."""
+    idx = np.asarray(idx, np.int64)
+    if not len(idx): return np.zeros((0, 3), np.int64)
+    brk = np.flatnonzero((np.diff(idx) != 1) & ~((idx[1:] < 0) & (idx[:-1] < 0))) + 1
+    st = np.concatenate([[0], brk])
+    return np.stack([st, idx[st], np.diff(np.append(st, len(idx)))], axis=1)
+
+def _stutter_runs(n: int, amt: float, sr: int, rng: Optional[np.random.Generator]):
+    """50 ms windows; each hit (probability amt) plays 1–3 times back to back."""
+    rng = _rng(rng)
+    window = int(sr * 0.05)  # ~50ms
+    nw = -(-n // window)
+    reps = np.ones(nw, np.int64); hit = rng.random(nw) < amt
+    reps[hit] = rng.integers(1, 4, int(hit.sum()))
+    src = np.repeat(np.arange(nw, dtype=np.int64) * window, reps)
+    return src, np.minimum(window, n - src)
+
+def stutter_index_map(n: int, amt: float, sr: int = SR, rng: Optional[np.random.Generator] = None) -> np.ndarray:
+    return _runs_to_map(*_stutter_runs(n, amt, sr, rng), 0, n)
+
+@_profiled("stutter")
+def apply_stutter_old(x: np.ndarray, amt: float, sr: int = SR, rng: Optional[np.random.Generator] = None,
+                      return_map: bool = False):
+    if amt <= 0: return (x, np.arange(len(x), dtype=np.int32)) if return_map else x
+    runs = _stutter_runs(len(x), amt, sr, rng)
+    y = _gather_runs(x, *runs)
+    return (y, _runs_to_map(*runs, 0, len(x))) if return_map else y
+
+@_profiled("mp3")
+def apply_mp3_sizzle_old(x: np.ndarray, amt: float, rng: Optional[np.random.Generator] = None) -> np.ndarray:
     if amt <= 0: return x
-    noise = np.random.normal(0, amt*0.01, size=x.shape).astype(np.float32)
-    return (x + noise).astype(np.float32)
+    noise = _gauss(rng, x.shape, amt*0.01); noise += x
+    return noise
 
-def apply_rf_noise_old(x: np.ndarray, amt: float) -> np.ndarray:
+@_profiled("rf")
+def apply_rf_noise_old(x: np.ndarray, amt: float, rng: Optional[np.random.Generator] = None) -> np.ndarray:
     if amt <= 0: return x
-    noise = np.random.normal(0, amt*0.02, size=x.shape).astype(np.float32)
-    return (x + noise).astype(np.float32)
+    noise = _gauss(rng, x.shape, amt*0.02); noise += x
+    return noise
 
+@_profiled("normalize")
 def normalize_audio_lufs(y: np.ndarray, target_lufs: float = -23.0) -> np.ndarray:
     """Normalize audio to target LUFS level for consistent output"""
     if len(y) == 0:
@@ -691,99 +1766,107 @@ def normalize_audio_lufs(y: np.ndarray, target_lufs: float = -23.0) -> np.ndarra
 
 # ═══════════════════ COMPREHENSIVE PHONE QUALITY SYSTEM ═══════════════════
 
-def apply_phone_quality_tier(y: np.ndarray, tier: str, custom_params: dict = None) -> tuple[np.ndarray, str]:
-    """Apply tiered phone quality processing with predefined or custom parameters"""
-
-    # Predefined quality tiers
-    tiers = {
-        "good_landline": {
-            "bandwidth": (300, 3400),      # Standard PSTN bandwidth
-            "sample_rate_factor": 1.0,     # Disable resampling to prevent distortion
-            "bitrate_sim": 64,             # G.711 64 kbps
-            "mu_law_intensity": 0.0,       # Disable μ-law to prevent distortion
-            "noise_level": 0.0,            # Clean line
-            "dropout_boost": 0.0,          # No digital dropouts
-            "garble_boost": 0.0,           # No digital garble
-            "description": "Clean PSTN Landline"
-        },
-        "bad_landline": {
-            "bandwidth": (300, 3000),      # Narrower due to poor line
-            "sample_rate_factor": 1.0,     # Disable resampling to prevent distortion
-            "bitrate_sim": 64,             # Still G.711
-            "mu_law_intensity": 0.0,       # Disable μ-law to prevent distortion
-            "noise_level": 0.003,          # Reduced steady hiss/hum
-            "dropout_boost": 0.3,          # Occasional crackles (not digital)
-            "garble_boost": 0.0,           # No digital garble
-            "description": "Poor Landline - Hiss & Crackles"
-        },
-        "cordless": {
-            "bandwidth": (300, 2800),      # High-cut at 2.8kHz
-            "sample_rate_factor": 1.0,     # Disable resampling to prevent distortion
-            "bitrate_sim": 24,             # 16-24 kbps equivalent
-            "mu_law_intensity": 0.0,       # Disable μ-law to prevent distortion
-            "noise_level": 0.002,          # Reduced RF noise (use RF slider for more)
-            "dropout_boost": 0.5,          # Range interference
-            "garble_boost": 0.2,           # Slight digital artifacts
-            "description": "Cordless Phone - RF Interference"
-        },
-        "ultra_low": {
-            "bandwidth": (200, 1800),      # Back to original narrow range
-            "sample_rate_factor": 1.0,     # Disable resampling to prevent distortion
-            "bitrate_sim": 8,              # Less aggressive bitrate
-            "mu_law_intensity": 0.0,       # Disable μ-law to prevent distortion
-            "noise_level": 0.005,          # Reduced noise (was 0.01)
-            "dropout_boost": 1.5,          # Moderate dropouts
-            "garble_boost": 1.2,           # Moderate garble
-            "description": "2G/3G Poor Signal"
-        },
-        "low": {
-            "bandwidth": (200, 4000),      # Improved from 3G era
-            "sample_rate_factor": 1.0,     # Disable resampling to prevent distortion
-            "bitrate_sim": 16,             # Better bitrate
-            "mu_law_intensity": 0.0,       # Disable μ-law to prevent distortion
-            "noise_level": 0.002,          # Reduced noise (was 0.005)
-            "dropout_boost": 1.2,          # Light dropouts
-            "garble_boost": 1.0,           # Normal garble
-            "description": "3G/Weak 4G Signal"
-        },
-        "standard": {
-            "bandwidth": (250, 6000),      # Modern 4G LTE quality
-            "sample_rate_factor": 1.0,     # Disable resampling to prevent distortion
-            "bitrate_sim": 24,             # Better bitrate
-            "mu_law_intensity": 0.0,       # Disable μ-law to prevent distortion
-            "noise_level": 0.001,          # Reduced noise (was 0.002)
-            "dropout_boost": 0.8,          # Fewer dropouts
-            "garble_boost": 0.8,           # Less garble
-            "description": "Standard Cellular/PSTN"
-        },
-        "high": {
-            "bandwidth": (20, 8000),       # HD Voice - wider for modern quality
-            "sample_rate_factor": 1.0,     # NO downsampling to prevent distortion
-            "bitrate_sim": 32,             # Good bitrate
-            "mu_law_intensity": 0.0,       # Disable μ-law to prevent distortion
-            "noise_level": 0.0,            # No noise (was 0.001)
-            "dropout_boost": 0.3,          # Very few dropouts
-            "garble_boost": 0.3,           # Very little garble
-            "description": "HD Voice/High-Quality VoIP"
-        },
-        "ultra_high": {
-            "bandwidth": (20, SR/2),     # Full bandwidth up to Nyquist
-            "sample_rate_factor": 1.0,     # Full 48kHz - no downsampling
-            "bitrate_sim": 128,            # Very high bitrate
-            "mu_law_intensity": 0.0,       # No compression artifacts
-            "noise_level": 0.0,            # No added noise
-            "dropout_boost": 0.0,          # No dropouts
-            "garble_boost": 0.0,           # No garble
-            "description": "FaceTime/WhatsApp (Near-Source Quality)"
-        }
+# Predefined quality tiers
+PHONE_QUALITY_TIERS: Dict[str, Dict[str, Any]] = {
+    "good_landline": {
+        "bandwidth": (300, 3400),      # Standard PSTN bandwidth
+        "sample_rate_factor": 1.0,     # Disable resampling to prevent distortion
+        "bitrate_sim": 64,             # G.711 64 kbps
+        "mu_law_intensity": 0.0,       # Disable μ-law to prevent distortion
+        "noise_level": 0.0,            # Clean line
+        "dropout_boost": 0.0,          # No digital dropouts
+        "garble_boost": 0.0,           # No digital garble
+        "description": "Clean PSTN Landline"
+    },
+    "bad_landline": {
+        "bandwidth": (300, 3000),      # Narrower due to poor line
+        "sample_rate_factor": 1.0,     # Disable resampling to prevent distortion
+        "bitrate_sim": 64,             # Still G.711
+        "mu_law_intensity": 0.0,       # Disable μ-law to prevent distortion
+        "noise_level": 0.003,          # Reduced steady hiss/hum
+        "dropout_boost": 0.3,          # Occasional crackles (not digital)
+        "garble_boost": 0.0,           # No digital garble
+        "description": "Poor Landline - Hiss & Crackles"
+    },
+    "cordless": {
+        "bandwidth": (300, 2800),      # High-cut at 2.8kHz
+        "sample_rate_factor": 1.0,     # Disable resampling to prevent distortion
+        "bitrate_sim": 24,             # 16-24 kbps equivalent
+        "mu_law_intensity": 0.0,       # Disable μ-law to prevent distortion
+        "noise_level": 0.002,          # Reduced RF noise (use RF slider for more)
+        "dropout_boost": 0.5,          # Range interference
+        "garble_boost": 0.2,           # Slight digital artifacts
+        "description": "Cordless Phone - RF Interference"
+    },
+    "ultra_low": {
+        "bandwidth": (200, 1800),      # Back to original narrow range
+        "sample_rate_factor": 1.0,     # Disable resampling to prevent distortion
+        "bitrate_sim": 8,              # Less aggressive bitrate
+        "mu_law_intensity": 0.0,       # Disable μ-law to prevent distortion
+        "noise_level": 0.005,          # Reduced noise (was 0.01)
+        "dropout_boost": 1.5,          # Moderate dropouts
+        "garble_boost": 1.2,           # Moderate garble
+        "description": "2G/3G Poor Signal"
+    },
+    "low": {
+        "bandwidth": (200, 4000),      # Improved from 3G era
+        "sample_rate_factor": 1.0,     # Disable resampling to prevent distortion
+        "bitrate_sim": 16,             # Better bitrate
+        "mu_law_intensity": 0.0,       # Disable μ-law to prevent distortion
+        "noise_level": 0.002,          # Reduced noise (was 0.005)
+        "dropout_boost": 1.2,          # Light dropouts
+        "garble_boost": 1.0,           # Normal garble
+        "description": "3G/Weak 4G Signal"
+    },
+    "standard": {
+        "bandwidth": (250, 6000),      # Modern 4G LTE quality
+        "sample_rate_factor": 1.0,     # Disable resampling to prevent distortion
+        "bitrate_sim": 24,             # Better bitrate
+        "mu_law_intensity": 0.0,       # Disable μ-law to prevent distortion
+        "noise_level": 0.001,          # Reduced noise (was 0.002)
+        "dropout_boost": 0.8,          # Fewer dropouts
+        "garble_boost": 0.8,           # Less garble
+        "description": "Standard Cellular/PSTN"
+    },
+    "high": {
+        "bandwidth": (20, 8000),       # HD Voice - wider for modern quality
+        "sample_rate_factor": 1.0,     # NO downsampling to prevent distortion
+        "bitrate_sim": 32,             # Good bitrate
+        "mu_law_intensity": 0.0,       # Disable μ-law to prevent distortion
+        "noise_level": 0.0,            # No noise (was 0.001)
+        "dropout_boost": 0.3,          # Very few dropouts
+        "garble_boost": 0.3,           # Very little garble
+        "description": "HD Voice/High-Quality VoIP"
+    },
+    "ultra_high": {
+        "bandwidth": (20, SR/2),     # Full bandwidth up to Nyquist
+        "sample_rate_factor": 1.0,     # Full 48kHz - no downsampling
+        "bitrate_sim": 128,            # Very high bitrate
+        "mu_law_intensity": 0.0,       # No compression artifacts
+        "noise_level": 0.0,            # No added noise
+        "dropout_boost": 0.0,          # No dropouts
+        "garble_boost": 0.0,           # No garble
+        "description": "FaceTime/WhatsApp (Near-Source Quality)"
     }
+}
+
+# Band-limited μ-law per landline tier: (amount, band low Hz, band high Hz, drive)
+LANDLINE_MULAW = {
+    "good_landline": (0.20, 300.0, 2400.0, 0.70),
+    "bad_landline":  (0.35, 300.0, 2400.0, 0.65),
+    "cordless":      (0.35, 300.0, 2400.0, 0.75),
+}
+
+@_profiled("phone_tier")
+def apply_phone_quality_tier(y: np.ndarray, tier: str, custom_params: dict = None, rng: Optional[np.random.Generator] = None) -> tuple[np.ndarray, str]:
+    """Apply tiered phone quality processing with predefined or custom parameters"""
 
     # Use custom parameters if provided, otherwise use tier defaults
     if custom_params:
         params = custom_params
         description = "Custom Quality"
     else:
-        params = tiers.get(tier, tiers["standard"])
+        params = PHONE_QUALITY_TIERS.get(tier, PHONE_QUALITY_TIERS["standard"])
         description = params["description"]
 
     # Apply bandwidth filtering
@@ -793,223 +1876,285 @@ def apply_phone_quality_tier(y: np.ndarray, tier: str, custom_params: dict = Non
     # Apply sample rate simulation (downsample/upsample for artifacts)
     if params["sample_rate_factor"] < 1.0:
         target_sr = int(SR * params["sample_rate_factor"])
-        from scipy.signal import resample
-        y_down = resample(y, int(len(y) * target_sr / SR))
-        y = resample(y_down, len(y))
+        y = _fit_len(resample_rate(resample_rate(y, SR, target_sr), target_sr, SR), len(y))
 
     # Apply μ-law processing based on tier type
     if tier in ("high", "ultra_high"):
         mu_amt = 0.0  # Modern VoIP/cellular - no μ-law
     elif tier in ("good_landline", "bad_landline", "cordless"):
         # Band-limited μ-law for authentic landline character
-        cfg = {
-            "good_landline": (0.20, 300.0, 2400.0, 0.70),
-            "bad_landline":  (0.35, 300.0, 2400.0, 0.65),
-            "cordless":      (0.35, 300.0, 2400.0, 0.75),
-        }[tier]
-        mu_amt, lo, hi, drive = cfg
+        mu_amt, lo, hi, drive = LANDLINE_MULAW[tier]
         vband = _zphf(y, hpf_hz=lo, lpf_hz=hi, sr=SR)
-        rest = y - vband
-        vband = apply_mulaw_color(vband, amount=mu_amt, mu=255.0, drive=drive)
-        y = vband + rest
+        y = apply_mulaw_color(vband, amount=mu_amt, mu=255.0, drive=drive, base=y, out=vband)  # rest + colored band
     else:
         mu_amt = 0.0  # All other cellular tiers - no μ-law
 
     # Apply noise
     if params["noise_level"] > 0:
-        noise = np.random.normal(0, params["noise_level"] * np.max(np.abs(y)), y.shape)
-        y = (y + noise).astype(np.float32)
+        noise = _gauss(rng, y.shape, params["noise_level"] * float(max(np.max(y), -np.min(y))))
+        noise += y; y = noise
 
     return y, description
 
-def apply_dropouts_old(v: np.ndarray, drop_p: float, chunk_ms: float, depth_db: float) -> np.ndarray:
-    if drop_p<=0: return v
+@_profiled("dropouts")
+def apply_dropouts_old(v: np.ndarray, drop_p: float, chunk_ms: float, depth_db: float, rng: Optional[np.random.Generator] = None,
+                       fade_ms: float = 0.0, return_events: bool = False):
+    """Chunk-grid dropouts (plc_ms slots at depth_db). return_events: (audio, (k, 2) event spans)."""
+    if drop_p<=0: return (v, np.zeros((0, 2), np.int64)) if return_events else v
     w = max(8, int(chunk_ms*SR/1000.0))
-    y = v.copy()
-    for i in range(0, len(y), w):
-        if random.random() < drop_p:
-            seg = y[i:i+w]
-            y[i:i+w] = seg * (10**(depth_db/20.0))  # attenuate or near-zero
+    events = dropout_events_grid(len(v), drop_p, w, rng)
+    y = apply_dropout_events(v.copy(), events, depth_db, int(fade_ms*SR/1000.0))
+    return (y, events) if return_events else y
+
+# Garble: random 60 ms windows time-warped by ±20 % (FFT resample, cut/zero-padded to the window).
+# The chosen windows are gathered into one 2-D array and warped together with a periodic
+# Catmull-Rom interpolator; _garble_scipy is the original per-window resample, kept as reference.
+GARBLE_CHUNK = 64  # windows per vectorized pass (keeps temporaries cache-sized)
+
+def _garble_plan(n: int, garb_prob: float, gwin: int, rng: np.random.Generator) -> Tuple[np.ndarray, np.ndarray]:
+    """Indices of the garbled windows and their warp factors."""
+    sel = np.flatnonzero(rng.random(-(-n // gwin)) < garb_prob)
+    return sel, 1.0 + rng.uniform(-0.2, 0.2, len(sel))
+
+def _garble_scipy(v: np.ndarray, sel: np.ndarray, factors: np.ndarray, gwin: int) -> np.ndarray:
+    from scipy.signal import resample
+    out = np.array(v, dtype=np.float32)
+    for w, f in zip(sel, factors):
+        seg = v[w*gwin:(w+1)*gwin]; new_len = int(len(seg) / f)
+        if new_len > 0: out[w*gwin:w*gwin+len(seg)] = _fit_len(resample(seg, new_len), len(seg))
+    return out
+
+def _warp_rows(V: np.ndarray, new_len: np.ndarray) -> np.ndarray:
+    """Each row resampled to new_len[i] samples (periodic, as the FFT resample) and cut or
+    zero-filled back to the row length."""
+    m, L = V.shape
+    P = np.empty((m, L + 3), np.float32); P[:, 1:L+1] = V
+    P[:, 0] = P[:, L]; P[:, L+1:] = P[:, 1:3]  # wrap-around neighbours
+    pos = np.arange(L, dtype=np.float32) * (L / new_len).astype(np.float32)[:, None]
+    i = pos.astype(np.int32); t = np.subtract(pos, i, out=pos, dtype=np.float32, casting="unsafe")  # exact
+    np.minimum(i, L - 1, out=i); i += (np.arange(m, dtype=np.int32) * (L + 3))[:, None]
+    fl = P.ravel(); p0 = fl[i]; p1 = fl[i+1]; p2 = fl[i+2]; p3 = fl[i+3]
+    o = 3*(p1 - p2) + p3 - p0; o *= t; o += 2*p0 - 5*p1 + 4*p2 - p3; o *= t; o += p2 - p0; o *= 0.5*t; o += p1
+    o[np.arange(L)[None, :] >= new_len[:, None]] = 0.0
+    return o
+
+def _garble_batched(v: np.ndarray, sel: np.ndarray, factors: np.ndarray, gwin: int, chunk: int = GARBLE_CHUNK) -> np.ndarray:
+    y = np.array(v, dtype=np.float32)
+    nfull = len(y) // gwin; Y = y[:nfull*gwin].reshape(nfull, gwin)
+    lens = np.minimum(gwin, len(y) - sel*gwin)
+    new_len = (lens / factors).astype(np.int64)
+    ok = new_len > 0; sel, lens, new_len = sel[ok], lens[ok], new_len[ok]
+    full = lens == gwin
+    rows, nl = sel[full], new_len[full]
+    for a in range(0, len(rows), chunk):
+        Y[rows[a:a+chunk]] = _warp_rows(Y[rows[a:a+chunk]], nl[a:a+chunk])
+    for w, n, k in zip(sel[~full], lens[~full], new_len[~full]):  # short last window
+        y[w*gwin:w*gwin+n] = _warp_rows(y[None, w*gwin:w*gwin+n], np.array([k]))[0]
     return y
 
-def apply_garble_old(v: np.ndarray, garb_prob: float, sr: int = SR) -> np.ndarray:
-    """EXACT garble from old fx app.py - single resampling with length preservation"""
+@_profiled("garble")
+def apply_garble_old(v: np.ndarray, garb_prob: float, sr: int = SR, rng: Optional[np.random.Generator] = None) -> np.ndarray:
+    """Garble from the old fx app (60 ms windows, ±20 % resample, length preserved), batched."""
     if garb_prob <= 0: return v
     gwin = int(0.06 * sr)  # 60ms windows like old app
-    out = []
-    for i in range(0, len(v), gwin):
-        seg = v[i:i + gwin]
-        original_len = len(seg)
-        if random.random() < garb_prob:  # Use as probability like old app
-            from scipy.signal import resample
-            # Apply resampling factor like old app
-            factor = 1 + random.uniform(-0.2, 0.2)
-            new_len = int(len(seg) / factor)
-            if new_len > 0:
-                seg = resample(seg, new_len)
-                # Pad or truncate to maintain segment length for concatenation
-                if len(seg) < original_len:
-                    seg = np.pad(seg, (0, original_len - len(seg)), 'constant')
-                elif len(seg) > original_len:
-                    seg = seg[:original_len]
-        out.append(seg)
-    result = np.concatenate(out)
-    # Ensure exact same length as input
-    if len(result) != len(v):
-        if len(result) > len(v):
-            result = result[:len(v)]
-        else:
-            result = np.pad(result, (0, len(v) - len(result)), 'constant')
-    return result.astype(np.float32)
+    sel, factors = _garble_plan(len(v), garb_prob, gwin, _rng(rng))
+    return _garble_batched(v, sel, factors, gwin)
+
+# Jitter / rebuffering. Jitter re-places each 20 ms chunk at a random delay within ±80 ms·intensity
+# and overlap-adds them (np.add.at on block-local int32 offsets), dividing by how many chunks cover
+# each sample. Rebuffering replaces 70–300 ms segments with a ±20 % time-stretched copy (the FFT
+# resample, cut or edge-padded) crossfaded in over ≤10 ms at both ends; the stretches are one
+# periodic Catmull-Rom gather per batch of events. Events overlapping an earlier one go to a later
+# wave so they still see its output. _rebuffer_scipy is the original per-event resample.
+JITTER_BLOCK = 1 << 18  # samples per overlap-add pass
+REBUFFER_CHUNK = 64     # events per stretch pass
+
+def _jitter_plan(n: int, intensity: float, sr: int, rng: np.random.Generator) -> Tuple[int, np.ndarray]:
+    """Max delay and the delay of every 20 ms chunk."""
+    max_d = int(0.08 * sr * intensity)
+    return max_d, rng.uniform(-max_d, max_d, -(-n // int(0.02 * sr))).astype(np.int64)
+
+def _jitter_ola(x: np.ndarray, max_d: int, delays: np.ndarray, chunk: int) -> np.ndarray:
+    n = len(x); L = n + 2 * max_d
+    shift = (np.clip(delays, -max_d, max_d) + max_d).astype(np.int32)  # placements stay inside the buffer
+    acc = np.zeros(L, np.float32)
+    B = max(chunk, JITTER_BLOCK // chunk * chunk); ar = np.arange(B, dtype=np.int32)
+    for a in range(0, n, B):
+        e = min(n, a + B)
+        dest = np.repeat(shift[a // chunk:-(-e // chunk)], chunk)[:e - a]; dest += ar[:e - a]
+        np.add.at(acc[a:e + 2 * max_d], dest, x[a:e])
+    # normalize where chunks overlap: coverage is constant between sorted chunk edges
+    src = np.arange(len(shift), dtype=np.int64) * chunk
+    edges = np.concatenate([src + shift, np.minimum(src + chunk, n) + shift])
+    order = np.argsort(edges, kind='stable'); edges = edges[order]
+    cover = np.cumsum(np.where(order < len(shift), 1, -1))
+    multi = np.flatnonzero(cover[:-1] > 1); lens = edges[multi + 1] - edges[multi]
+    idx = np.repeat(edges[multi] - (np.cumsum(lens) - lens), lens) + np.arange(int(lens.sum()))
+    acc[idx] /= np.repeat(cover[multi].astype(np.float32), lens)
+    return acc[max_d:max_d + n]
+
+def _rebuffer_plan(n: int, buffer_probability: float, sr: int, rng: np.random.Generator):
+    """Start, length and stretch factor of every rebuffer smear (~2 per second at probability 1)."""
+    count = int(buffer_probability * n / sr * 2) if n >= sr * 0.1 else 0
+    ev = np.zeros((count, 3))
+    for e in range(count):
+        start = int(rng.integers(0, max(1, n - int(0.3 * sr) + 1)))
+        ev[e] = start, min(int(rng.uniform(0.07, 0.3) * sr), n - start), rng.uniform(0.8, 1.2)  # 70-300ms
+    return ev[:, 0].astype(np.int64), ev[:, 1].astype(np.int64), ev[:, 2]
+
+def _rebuffer_scipy(y: np.ndarray, starts: np.ndarray, lens: np.ndarray, factors: np.ndarray, sr: int = SR) -> np.ndarray:
+    from scipy.signal import resample
+    out = np.array(y, dtype=np.float32)
+    for s, ln, f in zip(starts, lens, factors):
+        seg = out[s:s+ln]; st = resample(seg, int(ln * f))
+        st = st[:ln] if len(st) >= ln else np.pad(st, (0, ln - len(st)), 'edge')
+        fl = min(ln // 4, int(0.01 * sr))
+        if fl > 0:
+            fi = np.linspace(0, 1, fl); fo = np.linspace(1, 0, fl)
+            st[:fl] = seg[:fl] * fo + st[:fl] * fi; st[-fl:] = seg[-fl:] * fo + st[-fl:] * fi
+        out[s:s+ln] = st
+    return out
 
-# NEW: micro robotization (max 0.01 is subtle)
-def apply_jitter_buffering(x: np.ndarray, jitter_intensity: float, buffer_probability: float, sr: int = SR) -> np.ndarray:
+def _rebuffer_waves(starts: np.ndarray, ends: np.ndarray) -> np.ndarray:
+    """Wave of each event: 1 + the highest wave among earlier (plan order) events it overlaps, so
+    a wave's events are disjoint and each runs after every earlier event it overlaps. Tracked on
+    the elementary spans between event edges; an event only touches the spans it covers."""
+    wave = np.zeros(len(starts), np.int64)
+    if not len(starts): return wave
+    edges = np.unique(np.concatenate([starts, ends]))
+    lo = np.searchsorted(edges, starts); hi = np.searchsorted(edges, ends)
+    level = np.full(len(edges), -1, np.int64)  # highest wave so far on [edges[k], edges[k+1])
+    for e, (a, b) in enumerate(zip(lo.tolist(), hi.tolist())):
+        if b > a:
+            w = int(level[a:b].max()) + 1; wave[e] = w; level[a:b] = w
+    return wave
+
+def _rebuffer_batched(y: np.ndarray, starts: np.ndarray, lens: np.ndarray, factors: np.ndarray, sr: int = SR,
+                      chunk: int = REBUFFER_CHUNK) -> np.ndarray:
+    out = np.array(y, dtype=np.float32); ends = starts + lens
+    wave = _rebuffer_waves(starts, ends)
+    order = np.argsort(wave, kind="stable")
+    for ids in np.split(order, np.cumsum(np.bincount(wave))[:-1]) if len(wave) else []:
+        for a in range(0, len(ids), chunk):
+            sel = ids[a:a + chunk]; s, ln = starts[sel], lens[sel]
+            m = (ln * factors[sel]).astype(np.int64)  # resampled length
+            # every segment with its wrap-around neighbours: [seg[-1], seg, seg[0], seg[1]]
+            pl = ln + 3; poff = np.cumsum(pl) - pl; e = poff + ln
+            P = out[np.repeat(s - poff - 1, pl) + np.arange(int(pl.sum()))]
+            P[poff] = out[s + ln - 1]; P[e + 1] = out[s]; P[e + 2] = out[s + 1]
+            ostart = np.cumsum(ln) - ln
+            jl = np.arange(int(ln.sum())) - np.repeat(ostart, ln)  # sample index within its event
+            pos = np.minimum(jl, np.repeat(m - 1, ln)).astype(np.float32)  # edge-pad past m
+            pos *= np.repeat((ln / m).astype(np.float32), ln)
+            i = pos.astype(np.int32); t = pos - i; i += np.repeat(poff.astype(np.int32), ln)
+            p0 = P[i]; p1 = P[i+1]; p2 = P[i+2]; p3 = P[i+3]
+            o = 3*(p1 - p2) + p3 - p0; o *= t; o += 2*p0 - 5*p1 + 4*p2 - p3; o *= t; o += p2 - p0; o *= 0.5*t; o += p1
+            # ≤10 ms linear crossfades from the original segment at both ends
+            fl = np.minimum(ln // 4, int(0.01 * sr))
+            q = np.arange(int(fl.sum())) - np.repeat(np.cumsum(fl) - fl, fl)
+            w = (q / np.repeat(np.maximum(fl - 1, 1), fl)).astype(np.float32)
+            for h in (np.repeat(ostart, fl) + q, np.repeat(ostart + ln - fl, fl) + q):
+                src = h + np.repeat(s - ostart, fl)
+                o[h] = out[src] * (1 - w) + o[h] * w
+            jl += np.repeat(s, ln); out[jl] = o
+    return out
+
+@_profiled("jitter")
+def apply_jitter_buffering(x: np.ndarray, jitter_intensity: float, buffer_probability: float, sr: int = SR,
+                           rng: Optional[np.random.Generator] = None) -> np.ndarray:
     """VoIP jitter and buffering artifacts - realistic network timing issues"""
     if jitter_intensity <= 0 and buffer_probability <= 0: return x
+    rng = _rng(rng)
+    out = np.array(x, dtype=np.float32)
+    if jitter_intensity > 0:  # variable latency: timing wobble
+        max_d, delays = _jitter_plan(len(out), jitter_intensity, sr, rng)
+        out = _jitter_ola(out, max_d, delays, int(0.02 * sr))
+    if buffer_probability > 0:  # occasional rebuffering smears
+        out = _rebuffer_batched(out, *_rebuffer_plan(len(out), buffer_probability, sr, rng), sr)
+    return out
 
-    out = x.copy()
-    n = len(x)
-
-    # 1. JITTER: Variable latency causing timing wobble
-    if jitter_intensity > 0:
-        # Create small timing variations (10-80ms like ChatGPT suggested)
-        max_jitter_samples = int(0.08 * sr * jitter_intensity)  # Scale by intensity
-        jitter_buffer = np.zeros(n + max_jitter_samples * 2, dtype=np.float32)
-        overlap = np.zeros_like(jitter_buffer)
-
-        # Process in chunks with variable delay
-        chunk_size = int(0.02 * sr)  # 20ms chunks
-        write_pos = max_jitter_samples
-
-        for i in range(0, n, chunk_size):
-            chunk = out[i:i + chunk_size]
-            if len(chunk) == 0: break
-
-            # Add random jitter delay
-            jitter_delay = int(random.uniform(-max_jitter_samples, max_jitter_samples))
-            actual_pos = write_pos + jitter_delay
-
-            # Bounds check
-            if actual_pos >= 0 and actual_pos + len(chunk) < len(jitter_buffer):
-                jitter_buffer[actual_pos:actual_pos + len(chunk)] += chunk
-            overlap[actual_pos:actual_pos + len(chunk)] += 1.0
-
-            write_pos += len(chunk)
-
-        # Extract result with original length
-        overlap[overlap == 0] = 1.0
-        jitter_buffer /= overlap
-        out = jitter_buffer[max_jitter_samples:max_jitter_samples + n]
-
-    # 2. BUFFERING: Occasional rebuffering smears (70-300ms like ChatGPT suggested)
-    if buffer_probability > 0:
-        # Random rebuffering events
-        rebuffer_events = int(buffer_probability * n / sr * 2)  # ~2 events per second at prob=1.0
-
-        for _ in range(rebuffer_events):
-            if n < sr * 0.1: break  # Skip if audio too short
-
-            # Random rebuffer location and duration
-            start = random.randint(0, n - int(0.3 * sr))
-            duration = int(random.uniform(0.07, 0.3) * sr)  # 70-300ms
-            end = min(start + duration, n)
-
-            # Create smear effect by crossfading with delayed version
-            segment = out[start:end]
-            if len(segment) > 0:
-                # Smear: blend with time-stretched version
-                stretch_factor = random.uniform(0.8, 1.2)
-                from scipy.signal import resample
-                stretched = resample(segment, int(len(segment) * stretch_factor))
-
-                # Fit back to original length with crossfade
-                if len(stretched) != len(segment):
-                    if len(stretched) > len(segment):
-                        stretched = stretched[:len(segment)]
-                    else:
-                        stretched = np.pad(stretched, (0, len(segment) - len(stretched)), 'edge')
-
-                # Crossfade blend for smooth smear
-                fade_len = min(len(segment) // 4, int(0.01 * sr))
-                if fade_len > 0:
-                    fade_in = np.linspace(0, 1, fade_len)
-                    fade_out = np.linspace(1, 0, fade_len)
-                    stretched[:fade_len] = segment[:fade_len] * fade_out + stretched[:fade_len] * fade_in
-                    stretched[-fade_len:] = segment[-fade_len:] * fade_out + stretched[-fade_len:] * fade_in
-
-                out[start:end] = stretched
-
-    return out.astype(np.float32)
-
-def apply_packet_reordering(x: np.ndarray, reorder_probability: float, sr: int = SR) -> np.ndarray:
-    """Packet reordering artifacts - different from dropouts, packets arrive out of order"""
-    if reorder_probability <= 0: return x
-
-    # Process in packet-sized chunks (20-40ms typical)
-    packet_size = int(random.uniform(0.02, 0.04) * sr)  # 20-40ms packets
-    out = []
-    packet_buffer = []
-
-    for i in range(0, len(x), packet_size):
-        packet = x[i:i + packet_size]
-
-        if random.random() < reorder_probability:
-            # This packet gets reordered - add to buffer
-            packet_buffer.append(packet)
-
-            # Sometimes flush buffer in random order
-            if len(packet_buffer) >= 3 or random.random() < 0.3:
-                # Shuffle and flush buffer
-                random.shuffle(packet_buffer)
-                out.extend(packet_buffer)
-                packet_buffer = []
-            # If not flushing, add silence for missing packet
-            else:
-                out.append(np.zeros_like(packet))
-        else:
-            # Normal packet - flush any buffered packets first
-            if packet_buffer:
-                random.shuffle(packet_buffer)
-                out.extend(packet_buffer)
-                packet_buffer = []
-            out.append(packet)
-
-    # Flush remaining buffered packets
-    if packet_buffer:
-        random.shuffle(packet_buffer)
-        out.extend(packet_buffer)
-
-    result = np.concatenate(out) if out else x
-
-    # Ensure same length as input
-    if len(result) != len(x):
-        if len(result) > len(x):
-            result = result[:len(x)]
+def _reorder_runs(n: int, reorder_probability: float, sr: int, rng: Optional[np.random.Generator]):
+    """20–40 ms packets; a hit is held back (silence in its slot) and released, shuffled with the
+    other held packets, when the buffer reaches 3, by chance (30 %), or at the next normal packet."""
+    rng = _rng(rng)
+    size = int(rng.uniform(0.02, 0.04) * sr)  # 20-40ms packets
+    src: List[int] = []; held: List[int] = []
+    def flush():
+        rng.shuffle(held); src.extend(held); held.clear()
+    for i in range(0, n, size):
+        if rng.random() < reorder_probability:
+            held.append(i)
+            if len(held) >= 3 or rng.random() < 0.3: flush()
+            else: src.append(-1 - i)  # gap where the packet should be, as long as the packet
         else:
-            result = np.pad(result, (0, len(x) - len(result)), 'constant')
+            if held: flush()
+            src.append(i)
+    if held: flush()
+    src = np.asarray(src, np.int64); start = np.where(src < 0, -1 - src, src)
+    return np.maximum(src, -1), np.minimum(size, n - start)
+
+def reorder_index_map(n: int, reorder_probability: float, sr: int = SR, rng: Optional[np.random.Generator] = None) -> np.ndarray:
+    return _runs_to_map(*_reorder_runs(n, reorder_probability, sr, rng), 0, n)
+
+@_profiled("reorder")
+def apply_packet_reordering(x: np.ndarray, reorder_probability: float, sr: int = SR, rng: Optional[np.random.Generator] = None,
+                            return_map: bool = False):
+    """Packet reordering artifacts - different from dropouts, packets arrive out of order"""
+    if reorder_probability <= 0: return (x, np.arange(len(x), dtype=np.int32)) if return_map else x
+    runs = _reorder_runs(len(x), reorder_probability, sr, rng)
+    y = _gather_runs(x, *runs, np.float32)
+    return (y, _runs_to_map(*runs, 0, len(x))) if return_map else y
+
+def narrowband_roundtrip(x: np.ndarray, sr: int = SR, nb_sr: int = 8000) -> np.ndarray:
+    """x resampled to nb_sr and back (resample_rate both ways), same length as x."""
+    return _fit_len(resample_rate(resample_rate(x, sr, nb_sr), nb_sr, sr), len(x))
+
+def _box_same(a: np.ndarray, m: int) -> np.ndarray:
+    """np.convolve(a, ones(m)/m, 'same') as a running sum (double accumulator, float32 in and out)."""
+    from scipy.ndimage import uniform_filter1d
+    return uniform_filter1d(np.asarray(a, np.float32), int(m), mode="constant")
+
+def opus_pre_echo(x: np.ndarray, envelope: np.ndarray, intensity: float, sr: int = SR) -> np.ndarray:
+    """Every transient (envelope step > 2σ) leaks a 2 ms rising ramp of intensity·0.1·env·x ahead of
+    itself: the impulse train of those weights convolved with one fixed ramp kernel."""
+    n = len(x); pre = int(0.002 * sr)  # 2ms pre-echo
+    out = np.zeros(n, np.float32)
+    if n < 2 or pre < 1: return out
+    d = np.diff(envelope, prepend=envelope[:1])
+    hit = d > np.std(d, dtype=np.float64) * 2; hit[:pre] = False
+    imp = np.zeros(n, np.float32); imp[hit] = x[hit] * envelope[hit] * (intensity * 0.1)
+    ramp = np.linspace(0, 1, pre, dtype=np.float32)
+    out[:-1] = oaconvolve(imp, ramp)[pre:pre + n - 1]  # an impulse at i lands on [i-pre, i)
+    return out
 
-    return result.astype(np.float32)
+OSC_BLOCK = 1 << 16
 
-def apply_codec_artifacts(x: np.ndarray, codec_type: str, intensity: float, sr: int = SR) -> np.ndarray:
+def _sine(n: int, freq: float, depth: float, bias: float = 1.0, sr: int = SR) -> np.ndarray:
+    """bias + depth·sin(2π·freq·i/sr) as float32; the phase is float64 but only OSC_BLOCK samples at a time."""
+    out = np.empty(n, np.float32); w = 2 * np.pi * float(freq) / sr
+    for s in range(0, n, OSC_BLOCK):
+        np.sin(w * np.arange(s, min(n, s + OSC_BLOCK)), out=out[s:s+OSC_BLOCK], casting="same_kind")
+    out *= depth; out += bias
+    return out
+
+@_profiled("codec")
+def apply_codec_artifacts(x: np.ndarray, codec_type: str, intensity: float, sr: int = SR, rng: Optional[np.random.Generator] = None) -> np.ndarray:
     """Codec-specific artifacts: AMR, Opus, EVS emulation"""
     if intensity <= 0: return x
+    rng = _rng(rng)
 
     if codec_type == "amr_nb":
         # AMR Narrowband (GSM) - 8kHz, spectral combing, transient softening
-        # Downsample to 8kHz and back up for aliasing
-        from scipy.signal import resample
-        downsampled = resample(x, int(len(x) * 8000 / sr))
-        upsampled = resample(downsampled, len(x))
+        # Down to 8kHz and back up for the band-limit (polyphase: cost linear in length, any length)
+        upsampled = narrowband_roundtrip(x, sr)
 
         # Add spectral combing (formant artifacts)
-        comb_freq = 200 + random.uniform(-50, 50)  # ~200Hz comb
-        t = np.arange(len(x)) / sr
-        comb_mod = 1 + intensity * 0.1 * np.sin(2 * np.pi * comb_freq * t)
+        comb_freq = 200 + rng.uniform(-50, 50)  # ~200Hz comb
+        comb_mod = _sine(len(x), comb_freq, intensity * 0.1, sr=sr)
 
         # Transient softening - reduce attack sharpness
-        from scipy.signal import hilbert
-        envelope = np.abs(hilbert(x))
-        smooth_env = np.convolve(envelope, np.ones(int(0.005*sr))/int(0.005*sr), mode='same')
+        envelope = analytic_envelope(x)
+        smooth_env = _box_same(envelope, int(0.005*sr))
         transient_mask = envelope / (smooth_env + 1e-10)
         transient_reduction = 1 - intensity * 0.3 * np.clip(transient_mask - 1, 0, 1)
 
@@ -1017,9 +2162,8 @@ def apply_codec_artifacts(x: np.ndarray, codec_type: str, intensity: float, sr:
 
     elif codec_type == "amr_wb":
         # AMR Wideband - 16kHz, less artifacts but some warble
-        warble_freq = random.uniform(0.5, 2.0)  # Slow warble
-        t = np.arange(len(x)) / sr
-        warble_mod = 1 + intensity * 0.05 * np.sin(2 * np.pi * warble_freq * t)
+        warble_freq = rng.uniform(0.5, 2.0)  # Slow warble
+        warble_mod = _sine(len(x), warble_freq, intensity * 0.05, sr=sr)
 
         # Mild spectral smearing
         from scipy.signal import savgol_filter
@@ -1032,55 +2176,33 @@ def apply_codec_artifacts(x: np.ndarray, codec_type: str, intensity: float, sr:
 
     elif codec_type == "opus":
         # Opus - high quality but some transient pre-echo
-        # Add subtle pre-echo before transients
-        from scipy.signal import hilbert
-        envelope = np.abs(hilbert(x))
-
-        # Detect transients
-        env_diff = np.diff(np.pad(envelope, (1,0), 'edge'))
-        transient_mask = env_diff > np.std(env_diff) * 2
-
-        # Add pre-echo
-        pre_echo = np.zeros_like(x)
-        pre_echo_samples = int(0.002 * sr)  # 2ms pre-echo
-
-        for i in range(pre_echo_samples, len(x)):
-            if transient_mask[i]:
-                echo_start = max(0, i - pre_echo_samples)
-                echo_strength = intensity * 0.1 * envelope[i]
-                pre_echo[echo_start:i] += x[i] * echo_strength * np.linspace(0, 1, i - echo_start)
-
-        result = x + pre_echo
+        result = x + opus_pre_echo(x, analytic_envelope(x), intensity, sr)
 
     else:  # Default/EVS
         # EVS/Generic - minimal artifacts, just slight warble
-        warble_freq = random.uniform(0.1, 0.5)
-        t = np.arange(len(x)) / sr
-        warble_mod = 1 + intensity * 0.02 * np.sin(2 * np.pi * warble_freq * t)
+        warble_freq = rng.uniform(0.1, 0.5)
+        warble_mod = _sine(len(x), warble_freq, intensity * 0.02, sr=sr)
         result = x * warble_mod
 
-    return result.astype(np.float32)
+    return result.astype(np.float32, copy=False)
 
-def apply_mic_proximity_effects(x: np.ndarray, proximity: float, mic_type: str = "handset", sr: int = SR) -> np.ndarray:
+@_profiled("mic")
+def apply_mic_proximity_effects(x: np.ndarray, proximity: float, mic_type: str = "handset", sr: int = SR,
+                                rng: Optional[np.random.Generator] = None) -> np.ndarray:
     """Mic proximity effects - distance and mic type characteristics"""
     if proximity <= 0: return x
 
-    from scipy.signal import butter, lfilter
-
     if mic_type == "handset":
         # Handset mic: 2-6cm distance, proximity effect on low end
         # Closer = more bass boost, more breath sounds
         if proximity > 0.5:  # Close talking
             # Bass boost (proximity effect)
-            b, a = butter(2, 200 / (sr / 2), btype='high')
-            highpassed = lfilter(b, a, x)
+            highpassed = sosfilt32(design_sos("high", 2, 200.0, sr), x)
             bass_boost = x - highpassed
             result = x + bass_boost * proximity * 0.3
 
             # Add subtle breath emphasis
-            nyquist = sr / 2
-            b, a = butter(2, [80 / nyquist, 300 / nyquist], btype='band')
-            breath_band = lfilter(b, a, x)
+            breath_band = sosfilt32(design_sos("band", 2, (80.0, 300.0), sr), x)
             result += breath_band * proximity * 0.1
         else:
             result = x
@@ -1088,16 +2210,13 @@ def apply_mic_proximity_effects(x: np.ndarray, proximity: float, mic_type: str =
     elif mic_type == "headset":
         # Headset: consistent distance, less proximity effect
         # Slight presence boost
-        nyquist = sr / 2
-        b, a = butter(2, [2000 / nyquist, 4000 / nyquist], btype='band')
-        presence = lfilter(b, a, x)
+        presence = sosfilt32(design_sos("band", 2, (2000.0, 4000.0), sr), x)
         result = x + presence * proximity * 0.15
 
     elif mic_type == "speakerphone":
         # Speakerphone: far-field, room reflections, less direct sound
         # Reduce high frequencies, add slight reverb-like smear
-        b, a = butter(2, 6000 / (sr / 2), btype='low')
-        muffled = lfilter(b, a, x)
+        muffled = sosfilt32(design_sos("low", 2, 6000.0, sr), x)
 
         # Simple reverb-like delay
         delay_samples = int(0.01 * sr)  # 10ms delay
@@ -1110,21 +2229,17 @@ def apply_mic_proximity_effects(x: np.ndarray, proximity: float, mic_type: str =
     elif mic_type == "car":
         # Car environment: road noise filtering, confined space
         # Boost mids, reduce extremes
-        b, a = butter(2, 150 / (sr / 2), btype='high')
-        highpassed = lfilter(b, a, x)
-        b, a = butter(2, 5000 / (sr / 2), btype='low')
-        result = lfilter(b, a, highpassed)
+        result = sosfilt32(sos_chain(("high", 2, 150.0, sr), ("low", 2, 5000.0, sr)), x)
 
         # Add slight resonance (car interior)
-        resonance_freq = random.uniform(200, 400)
-        t = np.arange(len(x)) / sr
-        resonance = np.sin(2 * np.pi * resonance_freq * t) * proximity * 0.05
-        result += x * resonance
+        resonance_freq = _rng(rng).uniform(200, 400)
+        resonance = _sine(len(x), resonance_freq, proximity * 0.05, bias=0.0, sr=sr)
+        resonance *= x; result += resonance
 
     else:  # Default/studio
         result = x
 
-    return result.astype(np.float32)
+    return result.astype(np.float32, copy=False)
 
 # Warble effect removed - was not in original working "old fx app.py" and was inaudible
 
@@ -1145,25 +2260,45 @@ def _expand_files_with_warnings(spec) -> Tuple[List[str], List[str]]:
         else: miss.append(str(spec))
     return found, miss
 
-def _random_slice(y: np.ndarray, min_s: float, max_s: float) -> np.ndarray:
+def _random_slice(y: np.ndarray, min_s: float, max_s: float, rng: Optional[np.random.Generator] = None) -> np.ndarray:
     n=len(y); min_n=int(min_s*SR); max_n=int(max_s*SR)
     if n<=min_n: return y[:min_n]
-    L=np.random.randint(min_n, min(max_n, n))
-    start=np.random.randint(0, max(1, n-L))
+    rng=_rng(rng)
+    L=int(rng.integers(min_n, min(max_n, n)))
+    start=int(rng.integers(0, max(1, n-L)))
     return y[start:start+L]
 
-def place_events(xlen: int, files: List[str], events_per_min: float,
-                 vol_db: float, min_len_s=0.8, max_len_s=2.0, max_overlap=0.5) -> np.ndarray:
-    """Smart event placement with 3-second threshold: short=one-shots, long=ambient with random start"""
-    out=np.zeros(xlen,dtype=np.float32)
-    if events_per_min<=0 or not files: return out
-    occ=np.zeros(xlen,dtype=np.uint8)
+def _occupancy(spans: List[Tuple[int, int]], a: int, b: int, cap: int = 3) -> int:
+    """sum(min(#spans covering t, cap) for t in [a, b)) — the old uint8 occ map, kept as intervals."""
+    pts=sorted(p for s,e in spans if max(s,a)<min(e,b) for p in ((max(s,a),1),(min(e,b),-1)))
+    tot=0; c=0; prev=a
+    for p,d in pts:
+        tot+=min(c,cap)*(p-prev); c+=d; prev=p
+    return tot
+
+def _fade_slice(n: int, fade: int, a: int, b: int) -> np.ndarray:
+    """fade_window(n, fade)[a:b] without building the full window."""
+    w=np.ones(b-a, dtype=np.float32)
+    if fade<=0 or fade*2>=n: return w
+    r=np.linspace(0,1,fade,dtype=np.float32); i=np.arange(a,b)
+    h=i<fade; w[h]=r[i[h]]
+    t=i>=n-fade; w[t]=r[n-1-i[t]]
+    return w
+
+def _plan_events(xlen: int, files: List[str], events_per_min: float,
+                 vol_db: float, min_len_s=0.8, max_len_s=2.0, max_overlap=0.5,
+                 rng: Optional[np.random.Generator] = None) -> List[tuple]:
+    """Draw the placements place_events renders: [(clip, start, fade, rms_scale, gain), ...].
+    Memory is per event, not per xlen, so long renders can mix events block by block."""
+    plan=[]
+    if events_per_min<=0 or not files: return plan
+    spans=[]; rng=_rng(rng)
     n_events=int(events_per_min*(xlen/SR)/60.0)
 
     for _ in range(n_events):
-        f=np.random.choice(files)
+        f=files[int(rng.integers(len(files)))]
         try:
-            s,sr=_load_audio(f); s=_mono_sr(s,sr,SR)
+            s=load_event_cached(f, SR)
             original_duration = len(s) / SR
 
             # Smart handling based on 3-second threshold
@@ -1172,7 +2307,7 @@ def place_events(xlen: int, files: List[str], events_per_min: float,
                 # Random start point to avoid repetition for different callers
                 max_start_offset = max(0, len(s) - int(xlen * 0.8))  # Don't exceed 80% of clip length
                 if max_start_offset > 0:
-                    start_offset = np.random.randint(0, max_start_offset)
+                    start_offset = int(rng.integers(0, max_start_offset))
                     s = s[start_offset:]  # Start from random position
 
                 # Take reasonable length for ambient background
@@ -1192,7 +2327,7 @@ def place_events(xlen: int, files: List[str], events_per_min: float,
                     pass  # Keep original s
                 else:
                     # File is longer than max - slice it
-                    s=_random_slice(s,min_len_s,max_len_s)
+                    s=_random_slice(s,min_len_s,max_len_s,rng)
 
             L=len(s)
             if L>=xlen:
@@ -1204,11 +2339,11 @@ def place_events(xlen: int, files: List[str], events_per_min: float,
                 for _try in range(4):
                     if original_duration >= 3.0:
                         # Long samples: prefer early placement for natural background feel
-                        start = np.random.randint(0, min(xlen-L, int(xlen*0.2)))
+                        start = int(rng.integers(0, min(xlen-L, int(xlen*0.2))))
                     else:
                         # Short samples: random placement throughout
-                        start=np.random.randint(0,xlen-L)
-                    overlap=occ[start:start+L].sum()/max(1,L)
+                        start=int(rng.integers(0,xlen-L))
+                    overlap=_occupancy(spans,start,start+L)/max(1,L)
                     if overlap<=max_overlap: placed=True; break
                 if not placed: continue
 
@@ -1222,16 +2357,283 @@ def place_events(xlen: int, files: List[str], events_per_min: float,
             # RMS normalization for consistent event levels
             rms = np.sqrt(np.mean(s**2) + 1e-9)
             target_rms = 0.1  # Consistent RMS level for all events
-            if rms > 0:
-                s = s * (target_rms / rms)
-
-            out[start:end]+= s*fade_window(L,fade) * 10**(vol_db/20.0)
-            occ[start:end]=np.minimum(occ[start:end]+1,3)
+            plan.append((s, start, fade, (target_rms / rms) if rms > 0 else None, 10**(vol_db/20.0)))
+            spans.append((start,end))
         except Exception:
             continue
+    return plan
+
+def _render_events(out: np.ndarray, plan: List[tuple], i0: int = 0) -> np.ndarray:
+    """Mix planned events into out, which holds timeline samples [i0, i0+len(out))."""
+    i1=i0+len(out)
+    for s, start, fade, scale, g in plan:
+        L=len(s); a=max(start,i0); b=min(start+L,i1)
+        if a>=b: continue
+        seg=s[a-start:b-start]
+        if scale is not None: seg=seg*scale
+        out[a-i0:b-i0]+=seg*_fade_slice(L,fade,a-start,b-start)*g
     return out
 
+@_profiled("events")
+def place_events(xlen: int, files: List[str], events_per_min: float,
+                 vol_db: float, min_len_s=0.8, max_len_s=2.0, max_overlap=0.5,
+                 rng: Optional[np.random.Generator] = None) -> np.ndarray:
+    """Smart event placement with 3-second threshold: short=one-shots, long=ambient with random start"""
+    plan=_plan_events(xlen, files, events_per_min, vol_db, min_len_s, max_len_s, max_overlap, rng)
+    return _render_events(np.zeros(xlen,dtype=np.float32), plan)
+
 # ───────────────── processor (correct chain) ─────────────────
+# Per-tier artifact multipliers (and tier stutter, which overrides the slider when > 0)
+ARTIFACT_TIER_PARAMS = {
+    "good_landline": {"dropout_boost": 0.0, "garble_boost": 0.0, "stutter_amt": 0.0},
+    "bad_landline": {"dropout_boost": 0.3, "garble_boost": 0.0, "stutter_amt": 0.0},
+    "cordless": {"dropout_boost": 0.5, "garble_boost": 0.3, "stutter_amt": 0.001},  # Light RF stutter
+    "ultra_low": {"dropout_boost": 2.0, "garble_boost": 1.8, "stutter_amt": 0.006},  # Heavy 2G/3G stutter
+    "low": {"dropout_boost": 1.5, "garble_boost": 1.4, "stutter_amt": 0.004},       # Medium 3G stutter
+    "standard": {"dropout_boost": 1.0, "garble_boost": 1.0, "stutter_amt": 0.002},  # Light cellular stutter
+    "high": {"dropout_boost": 0.5, "garble_boost": 0.5, "stutter_amt": 0.001},      # Minimal HD stutter
+    "ultra_high": {"dropout_boost": 0.2, "garble_boost": 0.2, "stutter_amt": 0.0}   # No stutter
+}
+
+@_profiled("artifacts")
+def network_artifacts(y: np.ndarray, quality_tier: str, custom_dropout_mult, custom_garble_mult,
+                      plc_ms, dropout_prob, dropout_depth_db, garble_prob, stutter_amt,
+                      jitter_intensity, buffer_prob, reorder_prob, codec_type, codec_intensity,
+                      mic_proximity, mic_type, mp3_amt, rf_amt, rng: Optional[np.random.Generator] = None) -> np.ndarray:
+    """Stage 6: digital network artifacts for cellular/VoIP tiers, analog line faults for landlines."""
+    rng = _rng(rng)
+    # Skip digital artifacts for landline tiers (they have analog-specific issues instead)
+    skip_digital_artifacts = quality_tier in ["good_landline", "bad_landline", "cordless"]
+
+    if not skip_digital_artifacts:
+        # Get quality multipliers for artifacts
+        if quality_tier == "custom":
+            dropout_mult = float(custom_dropout_mult)
+            garble_mult = float(custom_garble_mult)
+            tier_stutter_amt = 0.0  # custom: the stutter slider applies as-is
+        else:
+            # Get multipliers from quality tier
+            tier_params = ARTIFACT_TIER_PARAMS.get(quality_tier, {"dropout_boost": 1.0, "garble_boost": 1.0, "stutter_amt": 0.002})
+            dropout_mult = tier_params["dropout_boost"]
+            garble_mult = tier_params["garble_boost"]
+            tier_stutter_amt = tier_params["stutter_amt"]
+
+        # Comprehensive artifact short-circuit: skip entire chain if all artifacts are zero
+        has_artifacts = max(
+            float(dropout_prob) * dropout_mult,
+            float(garble_prob) * garble_mult,
+            tier_stutter_amt if tier_stutter_amt > 0 else float(stutter_amt),
+            float(jitter_intensity),
+            float(buffer_prob),
+            float(reorder_prob),
+            float(codec_intensity),
+            float(mp3_amt),
+            float(rf_amt)
+        ) > 0.0
+
+        if has_artifacts:
+            # Apply RF noise FIRST (affects radio signal before digital processing)
+            # Only for cellular - landlines don't have RF
+            if quality_tier not in ["good_landline", "bad_landline"]:
+                y = apply_rf_noise_old(y, float(rf_amt), rng=rng)
+
+            # Apply garble with quality scaling
+            scaled_garble_prob = float(garble_prob) * garble_mult
+            y = apply_garble_old(y, min(scaled_garble_prob, 1.0), SR, rng=rng)
+
+            # Apply dropouts with quality scaling
+            scaled_dropout_prob = float(dropout_prob) * dropout_mult
+            y = apply_dropouts_old(y, min(scaled_dropout_prob, 1.0), float(plc_ms), float(dropout_depth_db), rng=rng)
+
+            # Enhanced realistic network artifacts - use tier-specific stutter if available
+            final_stutter_amt = tier_stutter_amt if tier_stutter_amt > 0 else float(stutter_amt)
+            y = apply_stutter_old(y, final_stutter_amt, SR, rng=rng)
+            y = apply_jitter_buffering(y, float(jitter_intensity), float(buffer_prob), SR, rng=rng)
+            y = apply_packet_reordering(y, float(reorder_prob), SR, rng=rng)
+            y = apply_codec_artifacts(y, codec_type, float(codec_intensity), SR, rng=rng)
+            y = apply_mic_proximity_effects(y, float(mic_proximity), mic_type, SR, rng=rng)
+            y = apply_mp3_sizzle_old(y, float(mp3_amt), rng=rng)
+    else:
+        # Landline-specific processing
+        if quality_tier == "bad_landline":
+            # Light jitter for analog line instability (not digital jitter)
+            y = apply_jitter_buffering(y, min(float(jitter_intensity) * 0.5, 0.01), 0.0, SR, rng=rng)
+            # analog tick/crackle → use tiny dropouts instead of packet reordering
+            y = apply_dropouts_old(y, min(float(dropout_prob) * 0.2, 0.05), float(plc_ms), float(dropout_depth_db), rng=rng)
+        elif quality_tier == "cordless":
+            # Moderate dropout for range interference (not packet dropouts)
+            scaled_dropout_prob = min(float(dropout_prob) * 0.5, 0.15)
+            y = apply_dropouts_old(y, scaled_dropout_prob, float(plc_ms), float(dropout_depth_db), rng=rng)
+            # Light stutter for RF interference
+            y = apply_stutter_old(y, min(float(stutter_amt) * 0.5, 0.04), SR, rng=rng)
+            # RF noise for cordless interference (only if slider > 0)
+            y = apply_rf_noise_old(y, float(rf_amt), rng=rng)
+        # good_landline gets no additional artifacts (clean line)
+    return y
+
+def _num(v, default: float = 0.0) -> float:
+    try:
+        return float(v)
+    except Exception:
+        return default
+
+def _cleanup_wet(quality_tier: str, cleanup_mix) -> float:
+    """Wet share of the cleaned signal under the modern-tier dry/wet rules (1.0 on legacy tiers)."""
+    modern = quality_tier in ("high", "ultra_high")
+    try:
+        cleanup_mix = float(cleanup_mix)
+    except Exception:
+        cleanup_mix = 1.0 if not modern else 0.0
+    cleanup_mix = float(np.clip(cleanup_mix, 0.0, 1.0))
+    if not modern or cleanup_mix >= 0.999: return 1.0
+    return 0.0 if cleanup_mix <= 0.001 else cleanup_mix
+
+@_profiled("cleanup")
+def source_cleanup(y: np.ndarray, quality_tier: str, wpe_strength, dereverb_amt, cleanup_mix) -> Tuple[np.ndarray, str]:
+    """WPE + noise-reduction cleanup with the modern-tier dry/wet rules. Returns (audio, status note)."""
+    modern = quality_tier in ("high", "ultra_high")
+    wpe_strength = _num(wpe_strength)
+    dereverb_amt = _num(dereverb_amt)
+    cleanup_mix = _cleanup_wet(quality_tier, cleanup_mix)
+
+    user_requested_cleanup = (wpe_strength > 0.0) or (dereverb_amt > 0.0)
+    cleanup_allowed = (not modern) or user_requested_cleanup
+
+    y_base = y.astype(np.float32, copy=True)
+    wpe_note = ""
+    if cleanup_allowed and user_requested_cleanup:
+        # WPE blend + dereverb gate share one STFT and one resynthesis (cleanup_shared_stft)
+        y_proc, wpe_ok = cleanup_shared_stft(y_base, wpe_strength, dereverb_amt, 2 if wpe_strength >= 0.66 else 1)
+        if wpe_ok and (not modern or cleanup_mix > 0.0):
+            wpe_note = " · WPE"
+
+        if cleanup_mix >= 1.0:
+            y = y_proc
+        elif cleanup_mix <= 0.0:
+            y = y_base
+        else:
+            y = y_base + cleanup_mix * (y_proc - y_base)
+    else:
+        y = y_base
+    return y, wpe_note
+
+# ───────────────── render cache ─────────────────
+# Seeded renders are deterministic, so their WAV + status are kept on disk and a repeat of the
+# same request is a file copy. Key: sha1 of the input file bytes, every PROCESS_AUDIO_PARAM_ORDER
+# value (file params as _file_sig, so a replaced asset misses), the seed, the render engine, the DSP
+# engines the render resolves to ("auto" named by what it picked) and RENDER_CACHE_VERSION. Bump
+# the version whenever seeded output changes (a new noise stream, a retuned stage), so entries left
+# on disk by older code miss. Least recently used entries go past VLAB_RENDER_CACHE_MB (0 disables);
+# the directory is shared by every process using the same TMP_DIR. Unseeded renders are never
+# cached — each is a new take.
+RENDER_CACHE_MB = float(os.environ.get("VLAB_RENDER_CACHE_MB", "512"))
+RENDER_CACHE_DIR = os.environ.get("VLAB_RENDER_CACHE_DIR", os.path.join(TMP_DIR, "voicelab_render_cache"))
+RENDER_CACHE_VERSION = 2
+
+def _engine_sig() -> Tuple[str, ...]:
+    """Engines a render resolves to ("auto" picks by what is installed): each can change the samples
+    a seeded render produces."""
+    return (f"env:{env_engine()}", f"mulaw:{mulaw_engine()}", f"wpe:{WPE_ENGINE}", f"denoise:{DENOISE_ENGINE}",
+            f"opus:{_opus_resolved(OPUS_BACKEND)}")
+
+def _param_sig(v):
+    if isinstance(v, (list, tuple)): return [_param_sig(i) for i in v]
+    p = _safe_file(v)
+    return _file_sig(p) if p else v
+
+def _copy_tmp(path: str) -> str:
+    f = tempfile.NamedTemporaryFile(prefix="vlab_", delete=False, suffix=".wav", dir=TMP_DIR); f.close()
+    try: shutil.copyfile(path, f.name)
+    except OSError:
+        os.remove(f.name); raise
+    return f.name
+
+class _RenderCache:
+    def __init__(self, root: str, budget_mb: float):
+        self._lock = threading.Lock()
+        self.root = root
+        self.budget = int(max(0.0, budget_mb) * 1024 * 1024)
+        self.hits = 0; self.misses = 0; self.evictions = 0
+
+    def key(self, mic_path: str, params: list, seed, *extra) -> Optional[str]:
+        """Cache key for a seeded render, None when caching is off or the render is unseeded."""
+        if self.budget <= 0 or seed is None or seed == "": return None
+        h = hashlib.sha1()
+        with open(mic_path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""): h.update(chunk)
+        h.update(repr((_param_sig(list(params)), int(seed), extra, _engine_sig(), RENDER_CACHE_VERSION)).encode())
+        return h.hexdigest()
+
+    def _paths(self, key: str) -> Tuple[str, str]:
+        base = os.path.join(self.root, key); return base + ".wav", base + ".json"
+
+    def get(self, key: Optional[str]) -> Optional[Tuple[str, str]]:
+        """(fresh temp copy of the cached WAV, status · Cached) or None."""
+        if not key: return None
+        wav, meta = self._paths(key)
+        try:
+            with open(meta, encoding="utf-8") as f: status = json.load(f)["status"]
+            out = _copy_tmp(wav)  # callers own (and may move) what process_audio returns
+            os.utime(wav); os.utime(meta)
+        except (OSError, ValueError, KeyError):
+            with self._lock: self.misses += 1
+            return None
+        with self._lock: self.hits += 1
+        return out, f"{status} · Cached"
+
+    def put(self, key: Optional[str], path: Optional[str], status: str) -> Tuple[Optional[str], str]:
+        """Store a finished render (pass-through of process_audio's return value)."""
+        if key and path:
+            try:
+                os.makedirs(self.root, exist_ok=True)
+                wav, meta = self._paths(key); tmp = f".{os.getpid()}.{threading.get_ident()}.tmp"
+                shutil.copyfile(path, wav + tmp); os.replace(wav + tmp, wav)
+                with open(meta + tmp, "w", encoding="utf-8") as f: json.dump({"status": status}, f)
+                os.replace(meta + tmp, meta)
+                self._evict()
+            except OSError: pass
+        return path, status
+
+    def _entries(self) -> List[Tuple[float, int, str]]:
+        out = []
+        try: names = os.listdir(self.root)
+        except OSError: return out
+        for n in names:
+            if not n.endswith(".wav"): continue
+            p = os.path.join(self.root, n)
+            try:
+                st = os.stat(p); out.append((st.st_mtime, st.st_size, p))
+            except OSError: continue
+        return out
+
+    def _evict(self):
+        ents = sorted(self._entries()); total = sum(e[1] for e in ents)
+        for _, size, p in ents:
+            if total <= self.budget: break
+            for q in (p, p[:-4] + ".json"):
+                try: os.remove(q)
+                except OSError: pass
+            total -= size
+            with self._lock: self.evictions += 1
+
+    def set_budget(self, budget_mb: float):
+        self.budget = int(max(0.0, budget_mb) * 1024 * 1024); self._evict()
+
+    def clear(self):
+        shutil.rmtree(self.root, ignore_errors=True)
+
+    def stats(self) -> Dict[str, Any]:
+        ents = self._entries()
+        with self._lock:
+            return {"entries": len(ents), "bytes": sum(e[1] for e in ents), "budget": self.budget,
+                    "hits": self.hits, "misses": self.misses, "evictions": self.evictions}
+
+RENDER_CACHE = _RenderCache(RENDER_CACHE_DIR, RENDER_CACHE_MB)
+
+def render_cache_stats() -> Dict[str, Any]:
+    return RENDER_CACHE.stats()
+
+@_profiled_render
 def process_audio(
     mic_file,
     # Source
@@ -1257,68 +2659,33 @@ def process_audio(
     baby_files, baby_ev_min, baby_vol_db,
     dog_files, dog_ev_min, dog_vol_db,
     # Output
-    normalize_output
+    normalize_output,
+    # Reproducibility: same input + params + seed → bit-identical output (None: random)
+    seed: Optional[int] = None
 ):
     # input
     mic_path=_safe_file(mic_file)
     if not mic_path: return None, "No input."
-    y,sr=_load_audio(mic_path); y=_mono_sr(y,sr,SR)
+    args=locals(); params=[args[k] for k in PROCESS_AUDIO_PARAM_ORDER]
+    stream = STREAM_MIN_S > 0 and (_sf_duration(mic_path) or 0.0) >= STREAM_MIN_S  # ffmpeg-only formats render whole
+    with profile_stage("cache"):
+        cache_key=RENDER_CACHE.key(mic_path, params, seed, f"stream:{_stream_block()}:{STREAM_CONTEXT_S}" if stream else "whole")
+        hit=RENDER_CACHE.get(cache_key)
+    if hit: return hit
+    if stream:
+        return RENDER_CACHE.put(cache_key, *process_audio_stream(mic_file, *params, seed=seed))
+    rng=render_rng(seed)
+    with profile_stage("decode"):
+        y,sr=_load_audio(mic_path); y=_mono_sr(y,sr,SR)
     if len(y)<int(0.05*SR): return None,"Input too short."
     if len(y)>30*60*SR: return None,"Input too long (>30m)."
 
     # 1) Source cleanup
-    modern = quality_tier in ("high", "ultra_high")
-    try:
-        wpe_strength = float(wpe_strength)
-    except Exception:
-        wpe_strength = 0.0
-    try:
-        dereverb_amt = float(dereverb_amt)
-    except Exception:
-        dereverb_amt = 0.0
-    try:
-        leveler_amt = float(leveler_amt)
-    except Exception:
-        leveler_amt = 0.0
-
-    try:
-        cleanup_mix = float(cleanup_mix)
-    except Exception:
-        cleanup_mix = 1.0 if not modern else 0.0
-    cleanup_mix = float(np.clip(cleanup_mix, 0.0, 1.0))
-    if not modern:
-        cleanup_mix = 1.0
-
-    user_requested_cleanup = (wpe_strength > 0.0) or (dereverb_amt > 0.0)
-    cleanup_allowed = (not modern) or user_requested_cleanup
-
-    y_base = y.astype(np.float32, copy=True)
-    wpe_note = ""
-    if cleanup_allowed and user_requested_cleanup:
-        y_proc = y_base.copy()
-        if wpe_strength > 0.0:
-            try:
-                iters = 2 if wpe_strength >= 0.66 else 1
-                y_wpe, wpe_msg = wpe_dereverb(y_proc, iters, 12, 3)
-                y_proc = (1.0 - wpe_strength) * y_proc + wpe_strength * y_wpe.astype(np.float32)
-                if wpe_msg == "WPE applied" and (not modern or cleanup_mix > 0.0):
-                    wpe_note = " · WPE"
-            except Exception:
-                pass
-        if dereverb_amt > 0.0:
-            y_proc = dereverb_strong(y_proc, dereverb_amt)
-
-        if not modern or cleanup_mix >= 0.999:
-            y = y_proc
-        elif cleanup_mix <= 0.001:
-            y = y_base
-        else:
-            y = y_base + cleanup_mix * (y_proc - y_base)
-    else:
-        y = y_base
-
-    y = hpf_lpf(y, float(src_hpf), float(src_lpf))
+    y, wpe_note = source_cleanup(y, quality_tier, wpe_strength, dereverb_amt, cleanup_mix)
+    with profile_stage("source_filter"):
+        y = hpf_lpf(y, float(src_hpf), float(src_lpf))
 
+    leveler_amt = _num(leveler_amt)
     if leveler_amt > 0.0:
         y = leveler(y, float(leveler_amt))
 
@@ -1328,20 +2695,21 @@ def process_audio(
     same_ir = _same_file(_room_ir, _bg_ir_for_guard)
     _room_ir_apply = None if same_ir else _room_ir
     ir_guard_note = " · IR:BG only" if same_ir else ""
-    y = convolve_ir(y, _room_ir_apply, float(room_ir_gain_db))  # room_ir_gain_db now represents mix %
+    with profile_stage("room_ir"):
+        y = convolve_ir(y, _room_ir_apply, float(room_ir_gain_db))  # room_ir_gain_db now represents mix %
 
     # 3) Events BEFORE phone coloration (so they get processed through phone chain too)
     xlen=len(y)
     traf_ok,_ = _expand_files_with_warnings(_coerce_paths_list(traffic_files))
     baby_ok,_ = _expand_files_with_warnings(_coerce_paths_list(baby_files))
     dog_ok,_  = _expand_files_with_warnings(_coerce_paths_list(dog_files))
-    y += place_events(xlen, traf_ok, float(traffic_ev_min), float(traffic_vol_db))
-    y += place_events(xlen, baby_ok,  float(baby_ev_min),  float(baby_vol_db))
-    y += place_events(xlen, dog_ok,   float(dog_ev_min),   float(dog_vol_db))
+    y += place_events(xlen, traf_ok, float(traffic_ev_min), float(traffic_vol_db), rng=rng)
+    y += place_events(xlen, baby_ok,  float(baby_ev_min),  float(baby_vol_db), rng=rng)
+    y += place_events(xlen, dog_ok,   float(dog_ev_min),   float(dog_vol_db), rng=rng)
 
     # 4) Background bed (with Background IR and its own filters + ducking)
     bg_candidates = _coerce_paths_list(bg_file)
-    selected_bg = random.choice(bg_candidates) if bg_candidates else None
+    selected_bg = bg_candidates[int(rng.integers(len(bg_candidates)))] if bg_candidates else None
     if selected_bg and os.path.exists(selected_bg):
         bg_desc = os.path.basename(selected_bg)
     elif bg_candidates:
@@ -1350,7 +2718,7 @@ def process_audio(
         bg_desc = "none"
     y = stream_background(y, _safe_file(selected_bg), _safe_file(bg_ir_file),
                           float(bg_ir_gain_db), float(bg_gain_db),
-                          float(bg_hpf), float(bg_lpf), float(bg_duck_db))
+                          float(bg_hpf), float(bg_lpf), float(bg_duck_db), rng=rng)
 
     # Pre-limit the combined remote mix so μ-law/codec can't splatter
     peak = float(np.max(np.abs(y)) or 1.0)
@@ -1360,7 +2728,7 @@ def process_audio(
     # 5) Comprehensive Phone Quality System
     if quality_tier != "custom":
         # Use predefined quality tier
-        y, quality_description = apply_phone_quality_tier(y, quality_tier)
+        y, quality_description = apply_phone_quality_tier(y, quality_tier, rng=rng)
         codec_status = quality_description
     else:
         # Use custom parameters
@@ -1373,108 +2741,36 @@ def process_audio(
             "dropout_boost": float(custom_dropout_mult),
             "garble_boost": float(custom_garble_mult)
         }
-        y, quality_description = apply_phone_quality_tier(y, "custom", custom_params)
+        y, quality_description = apply_phone_quality_tier(y, "custom", custom_params, rng=rng)
         codec_status = f"Custom Quality ({int(custom_low_freq)}-{int(custom_high_freq)}Hz)"
 
     # Legacy processing (only for non-modern tiers)
     modern = quality_tier in ["high", "ultra_high"]
     if not modern:
-        if bandwidth_mode=="Narrowband 300–3500":
-            y=hpf_lpf(y, 300.0, 3500.0)
-        elif bandwidth_mode=="Wideband 80–7000":
-            y=hpf_lpf(y, 80.0, 7000.0)
+        with profile_stage("bandwidth"):
+            if bandwidth_mode=="Narrowband 300–3500":
+                y=hpf_lpf(y, 300.0, 3500.0)
+            elif bandwidth_mode=="Wideband 80–7000":
+                y=hpf_lpf(y, 80.0, 7000.0)
 
     # Opus processing (skip for high-quality tiers and landlines to preserve source quality)
     skip_opus = quality_tier in ["high", "ultra_high", "good_landline", "bad_landline", "cordless"]
     if not skip_opus and opus_bitrate_kbps < 32:  # Only apply Opus for lower bitrates
-        tmp_in=_save_wav_tmp(y)
-        opus_path=opus_round_trip(tmp_in, float(opus_bitrate_kbps), SR)
-        if opus_path:
-            yc,osr=_load_audio(opus_path); y=_mono_sr(yc,osr,SR)
+        y_opus,_ = opus_codec(y, float(opus_bitrate_kbps), SR)
+        if y_opus is not None:
+            y = np.array(y_opus, dtype=np.float32)
             codec_status += f" + Opus {int(float(opus_bitrate_kbps))} kbps"
 
     # Additional μ-law grit (legacy control) - reduced for more realistic calls
     if post_mu_grit>0:
         a=float(np.clip(post_mu_grit,0.0,0.15)); mu=255.0  # Reduced max from 0.35 to 0.15
-        comp=np.sign(y)*np.log1p(mu*np.abs(y))/np.log1p(mu)
-        y=((1.0-a)*y + a*comp).astype(np.float32)
+        y=mulaw_grit_into(y, a, mu, out=y if y.dtype == np.float32 and y.flags.writeable else None)
 
     # 6) Network artifacts with quality-aware scaling
-    # Skip digital artifacts for landline tiers (they have analog-specific issues instead)
-    skip_digital_artifacts = quality_tier in ["good_landline", "bad_landline", "cordless"]
-
-    if not skip_digital_artifacts:
-        # Get quality multipliers for artifacts
-        if quality_tier == "custom":
-            dropout_mult = float(custom_dropout_mult)
-            garble_mult = float(custom_garble_mult)
-        else:
-            # Get multipliers from quality tier
-            tier_params = {
-                "good_landline": {"dropout_boost": 0.0, "garble_boost": 0.0, "stutter_amt": 0.0},
-                "bad_landline": {"dropout_boost": 0.3, "garble_boost": 0.0, "stutter_amt": 0.0},
-                "cordless": {"dropout_boost": 0.5, "garble_boost": 0.3, "stutter_amt": 0.001},  # Light RF stutter
-                "ultra_low": {"dropout_boost": 2.0, "garble_boost": 1.8, "stutter_amt": 0.006},  # Heavy 2G/3G stutter
-                "low": {"dropout_boost": 1.5, "garble_boost": 1.4, "stutter_amt": 0.004},       # Medium 3G stutter
-                "standard": {"dropout_boost": 1.0, "garble_boost": 1.0, "stutter_amt": 0.002},  # Light cellular stutter
-                "high": {"dropout_boost": 0.5, "garble_boost": 0.5, "stutter_amt": 0.001},      # Minimal HD stutter
-                "ultra_high": {"dropout_boost": 0.2, "garble_boost": 0.2, "stutter_amt": 0.0}   # No stutter
-            }.get(quality_tier, {"dropout_boost": 1.0, "garble_boost": 1.0, "stutter_amt": 0.002})
-            dropout_mult = tier_params["dropout_boost"]
-            garble_mult = tier_params["garble_boost"]
-            tier_stutter_amt = tier_params["stutter_amt"]
-
-        # Comprehensive artifact short-circuit: skip entire chain if all artifacts are zero
-        has_artifacts = max(
-            float(dropout_prob) * dropout_mult,
-            float(garble_prob) * garble_mult,
-            tier_stutter_amt if tier_stutter_amt > 0 else float(stutter_amt),
-            float(jitter_intensity),
-            float(buffer_prob),
-            float(reorder_prob),
-            float(codec_intensity),
-            float(mp3_amt),
-            float(rf_amt)
-        ) > 0.0
-
-        if has_artifacts:
-            # Apply RF noise FIRST (affects radio signal before digital processing)
-            # Only for cellular - landlines don't have RF
-            if quality_tier not in ["good_landline", "bad_landline"]:
-                y = apply_rf_noise_old(y, float(rf_amt))
-
-            # Apply garble with quality scaling
-            scaled_garble_prob = float(garble_prob) * garble_mult
-            y = apply_garble_old(y, min(scaled_garble_prob, 1.0), SR)
-
-            # Apply dropouts with quality scaling
-            scaled_dropout_prob = float(dropout_prob) * dropout_mult
-            y = apply_dropouts_old(y, min(scaled_dropout_prob, 1.0), float(plc_ms), float(dropout_depth_db))
-
-            # Enhanced realistic network artifacts - use tier-specific stutter if available
-            final_stutter_amt = tier_stutter_amt if tier_stutter_amt > 0 else float(stutter_amt)
-            y = apply_stutter_old(y, final_stutter_amt, SR)
-            y = apply_jitter_buffering(y, float(jitter_intensity), float(buffer_prob), SR)
-            y = apply_packet_reordering(y, float(reorder_prob), SR)
-            y = apply_codec_artifacts(y, codec_type, float(codec_intensity), SR)
-            y = apply_mic_proximity_effects(y, float(mic_proximity), mic_type, SR)
-            y = apply_mp3_sizzle_old(y, float(mp3_amt))
-    else:
-        # Landline-specific processing
-        if quality_tier == "bad_landline":
-            # Light jitter for analog line instability (not digital jitter)
-            y = apply_jitter_buffering(y, min(float(jitter_intensity) * 0.5, 0.01), 0.0, SR)
-            # analog tick/crackle → use tiny dropouts instead of packet reordering
-            y = apply_dropouts_old(y, min(float(dropout_prob) * 0.2, 0.05), float(plc_ms), float(dropout_depth_db))
-        elif quality_tier == "cordless":
-            # Moderate dropout for range interference (not packet dropouts)
-            scaled_dropout_prob = min(float(dropout_prob) * 0.5, 0.15)
-            y = apply_dropouts_old(y, scaled_dropout_prob, float(plc_ms), float(dropout_depth_db))
-            # Light stutter for RF interference
-            y = apply_stutter_old(y, min(float(stutter_amt) * 0.5, 0.04), SR)
-            # RF noise for cordless interference (only if slider > 0)
-            y = apply_rf_noise_old(y, float(rf_amt))
-        # good_landline gets no additional artifacts (clean line)
+    y = network_artifacts(y, quality_tier, custom_dropout_mult, custom_garble_mult,
+                          plc_ms, dropout_prob, dropout_depth_db, garble_prob, stutter_amt,
+                          jitter_intensity, buffer_prob, reorder_prob, codec_type, codec_intensity,
+                          mic_proximity, mic_type, mp3_amt, rf_amt, rng=rng)
 
     # Safety before normalization to avoid nasty codec-fed hard clips
     if np.max(np.abs(y)) > 1.0:
@@ -1482,7 +2778,8 @@ def process_audio(
 
     # 7) Handset IR (post)
     if quality_tier not in ("high", "ultra_high"):
-        y = convolve_ir(y, _safe_file(handset_ir_file), float(handset_ir_gain_db))
+        with profile_stage("handset_ir"):
+            y = convolve_ir(y, _safe_file(handset_ir_file), float(handset_ir_gain_db))
 
     # 8) Final normalization
     if normalize_output:
@@ -1496,10 +2793,393 @@ def process_audio(
     room_ir_name = os.path.basename(_room_ir) if _room_ir else "none"
     bg_name = bg_desc if 'bg_desc' in locals() else "none"
     status = f"OK · Codec: {codec_status}{wpe_note} · BG:{bg_name} · IR:{room_ir_name}{ir_guard_note}{norm_note}"
-    return _save_wav_tmp(y), status
-
+    with profile_stage("write"):
+        return RENDER_CACHE.put(cache_key, _save_wav_tmp(y), status)
+
+
+# ───────────────── streaming render ─────────────────
+# process_audio_stream runs the process_audio chain block by block with carried filter,
+# envelope and convolution state. Stages that need a whole-signal number (ducking envelope
+# max, pre-limit peak, tier noise level, LUFS) or run backwards (zero-phase filters) are
+# barriers: the pass before them spools to a disk tape in TMP_DIR and the next pass reads it
+# back, so memory is O(block) at any input length and the WAV is written as it is rendered.
+# Under the same seed the result matches process_audio except for source cleanup
+# (WPE / noise reduction) and the random network-artifact chain, which run per block with
+# VLAB_STREAM_CONTEXT_S of overlap on each side.
+STREAM_BLOCK_S = float(os.environ.get("VLAB_STREAM_BLOCK_S", "10"))
+STREAM_CONTEXT_S = float(os.environ.get("VLAB_STREAM_CONTEXT_S", "2"))
+STREAM_MIN_S = float(os.environ.get("VLAB_STREAM_MIN_S", "0"))  # >0: process_audio streams inputs at least this long
+STREAM_GRID = 16384 * 15  # block multiple: OLS partition sizes (≤16384) and 20 ms Opus frames
+
+class _Tape:
+    """Disk-backed 1-D sample buffer for stream passes (read/write by sample range)."""
+    def __init__(self, n: int, dtype=np.float32):
+        self.n=int(n); self.dtype=np.dtype(dtype)
+        self.f=tempfile.NamedTemporaryFile(prefix="vlab_tape_", suffix=".raw", dir=TMP_DIR)
+        self.f.truncate(self.n*self.dtype.itemsize)
+    def read(self, i0: int, i1: int) -> np.ndarray:
+        i0=max(0, i0); i1=min(self.n, i1)
+        x=np.empty(max(0, i1-i0), dtype=self.dtype)
+        self.f.seek(i0*self.dtype.itemsize); self.f.readinto(memoryview(x).cast("B"))
+        return x
+    def write(self, i0: int, x: np.ndarray):
+        self.f.seek(i0*self.dtype.itemsize); self.f.write(np.ascontiguousarray(x, dtype=self.dtype).tobytes())
+    def close(self):
+        self.f.close()
+
+def _stream_block(block_s: Optional[float] = None) -> int:
+    q=STREAM_GRID
+    return max(1, int(round(float(block_s or STREAM_BLOCK_S)*SR/q)))*q
+
+def _stream_pass(src: _Tape, dst: Optional[_Tape], block: int, fn: Callable[[np.ndarray, int], np.ndarray],
+                 pre: Optional[Callable[[np.ndarray], np.ndarray]] = None, ctx: int = 0):
+    """dst[i0:i1] = fn(src[i0:i1], i0) block by block. pre (optional) sees ctx extra samples
+    each side of the block and its result is trimmed back before fn."""
+    for i0 in range(0, src.n, block):
+        i1=min(i0+block, src.n)
+        if pre is not None:
+            a=max(0, i0-ctx); x=pre(src.read(a, i1+ctx))[i0-a:i1-a]
+        else:
+            x=src.read(i0, i1)
+        x=fn(x, i0)
+        if dst is not None: dst.write(i0, x)
+
+def _stream_push(src: _Tape, dst: _Tape, block: int, proc: Callable[..., np.ndarray], wet: float = 1.0):
+    """dst = src + wet·(proc(src) - src) through a push-mode processor (proc(x, final=) returns
+    the samples it has ready, in order; all of them once final)."""
+    done = 0
+    for i0 in range(0, src.n, block):
+        i1 = min(i0 + block, src.n); y = proc(src.read(i0, i1), final=i1 == src.n)
+        if len(y) and wet < 1.0:
+            base = src.read(done, done + len(y)); y = base + np.float32(wet) * (y - base)
+        dst.write(done, y); done += len(y)
+
+@_profiled("decode")
+def _stream_decode(path: str, block: int) -> Optional[_Tape]:
+    """Decode + downmix + resample (exactly as _load_audio/_mono_sr) onto a tape."""
+    try:
+        f=sf.SoundFile(path)
+    except RuntimeError:  # ffmpeg-only format: no seekable reader, decode it whole
+        y,sr=_load_audio(path); y=_mono_sr(y,sr,SR)
+        tape=_Tape(len(y)); tape.write(0, y); return tape
+    with f:
+        sr=int(f.samplerate); n_in=f.frames
+        g=np.gcd(sr, SR); up,down = SR//g, sr//g
+        n=-(-n_in*up//down)
+        tape=_Tape(n)
+        bo=max(up, block//up*up)  # output block: a multiple of up keeps input offsets integral
+        for j0 in range(0, n, bo):
+            j1=min(j0+bo, n)
+            tape.write(j0, _sf_window(f, j0, j1, up, down).astype(np.float32))
+    return tape
+
+def _stream_sosfiltfilt(sos: np.ndarray, src: _Tape, dst: _Tape, block: int):
+    """sosfiltfilt(sos, src) into dst (float32; may be src itself), odd padding as SciPy."""
+    _sosfiltfilt_blocks(sos, src.n, src.read, dst.write, dst.read, block)
+
+@_profiled("zero_phase")
+def _stream_zero_phase(src: _Tape, hpf_hz: float, lpf_hz: float, block: int) -> Optional[_Tape]:
+    """hpf_lpf(..., zero_phase=True) of a tape, onto a float32 tape (None: nothing to filter)."""
+    sos=hpf_lpf_sos(hpf_hz, lpf_hz)
+    if not len(sos): return None
+    out=_Tape(src.n, np.float32)
+    _stream_sosfiltfilt(sos, src, out, block)
+    return out
 
-def process_bojan_preset(mic_file, preset_name: str, normalize_override: Optional[bool] = None):
+@functools.lru_cache(maxsize=8)
+def _k_weighting(rate: int) -> Tuple[Tuple[np.ndarray, np.ndarray], ...]:
+    """BS.1770 K-weighting as pyloudnorm designs it: RBJ high shelf (+4 dB, Q 1/√2, 1500 Hz), then RBJ
+    high-pass (Q 0.5, 38 Hz); ((b, a), (b, a)) normalized by a0."""
+    def rbj(kind, gain_db, q, fc):
+        A=10**(gain_db/40.0); w0=2.0*np.pi*fc/rate; c=np.cos(w0); al=np.sin(w0)/(2.0*q); sa=2*np.sqrt(A)*al
+        if kind == "high_shelf":
+            b=[A*((A+1)+(A-1)*c+sa), -2*A*((A-1)+(A+1)*c), A*((A+1)+(A-1)*c-sa)]
+            a=[(A+1)-(A-1)*c+sa, 2*((A-1)-(A+1)*c), (A+1)-(A-1)*c-sa]
+        else:
+            b=[(1+c)/2, -(1+c), (1+c)/2]; a=[1+al, -2*c, 1-al]
+        return np.array(b)/a[0], np.array(a)/a[0]
+    return rbj("high_shelf", 4.0, 1/np.sqrt(2), 1500.0), rbj("high_pass", 0.0, 0.5, 38.0)
+
+class _StreamLoudness:
+    """pyloudnorm Meter.integrated_loudness (mono) fed block by block — same K-weighting biquads
+    (_k_weighting), same 400 ms / 75 % overlap gating blocks. Raises ImportError without pyloudnorm,
+    so streamed renders fall back to peak normalization exactly as whole-buffer ones do."""
+    BLOCK_S, OVERLAP = 0.400, 0.75  # pyloudnorm.Meter defaults
+    def __init__(self, rate: int = SR):
+        import importlib.util
+        if importlib.util.find_spec("pyloudnorm") is None: raise ImportError("pyloudnorm")
+        self.rate=rate
+        self.stages=[(b, a, np.zeros(2)) for b, a in _k_weighting(rate)]
+        self.buf=np.zeros(0, dtype=np.float32); self.off=0; self.n=0; self.z=[]
+    def _bounds(self, j: int) -> Tuple[int, int]:
+        T_g=self.BLOCK_S; step=1.0-self.OVERLAP
+        return int(T_g*(j*step)*self.rate), int(T_g*(j*step+1)*self.rate)
+    def _drain(self, final: bool = False):
+        T_g=self.BLOCK_S
+        while True:
+            l,u=self._bounds(len(self.z))
+            if u>self.n and not final: break
+            if final and len(self.z)>=self._num_blocks(): break
+            self.z.append((1.0 / (T_g * self.rate)) * np.sum(np.square(self.buf[l-self.off:u-self.off])))
+        keep=self._bounds(len(self.z))[0]-self.off
+        if keep>0: self.buf=self.buf[keep:]; self.off+=keep
+    def _num_blocks(self) -> int:
+        T_g=self.BLOCK_S; step=1.0-self.OVERLAP
+        return int(np.round(((self.n/self.rate - T_g) / (T_g * step))))+1
+    def add(self, x: np.ndarray):
+        x=np.asarray(x, dtype=np.float32)
+        for k,(b,a,zi) in enumerate(self.stages):
+            y, zf=lfilter(b, a, x, zi=zi); self.stages[k]=(b,a,zf)
+            x=y.astype(np.float32)
+        self.buf=np.concatenate([self.buf, x]); self.n+=len(x); self._drain()
+    def integrated(self) -> float:
+        if self.n < self.BLOCK_S*self.rate: raise ValueError("Audio must have length greater than the block size.")
+        self._drain(final=True)
+        G=1.0; Gamma_a=-70.0; z=np.asarray(self.z)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            l=-0.691 + 10.0*np.log10(G*z)
+            zg=z[l>=Gamma_a]; Gamma_r=-0.691 + 10.0*np.log10(G*np.mean(zg)) - 10.0
+            zg=z[(l>Gamma_r) & (l>Gamma_a)]
+            return float(-0.691 + 10.0*np.log10(G*np.nan_to_num(np.mean(zg))))
+
+@_profiled_render
+def process_audio_stream(mic_file, *args, block_s: Optional[float] = None, seed: Optional[int] = None):
+    """process_audio in bounded memory: same arguments (PROCESS_AUDIO_PARAM_ORDER) and (path, status) result."""
+    p=dict(zip(PROCESS_AUDIO_PARAM_ORDER, args))
+    mic_path=_safe_file(mic_file)
+    if not mic_path: return None, "No input."
+    block=_stream_block(block_s); ctx=int(STREAM_CONTEXT_S*SR); rng=render_rng(seed)
+    tapes=[]
+    def tape(dtype=np.float32):
+        t=_Tape(n, dtype); tapes.append(t); return t
+    try:
+        src=_stream_decode(mic_path, block); tapes.append(src); n=src.n
+        if n<int(0.05*SR): return None,"Input too short."
+        if n>30*60*SR: return None,"Input too long (>30m)."
+        dst=tape()
+        tier=p["quality_tier"]; modern=tier in ("high", "ultra_high")
+        st: Dict[str, Any] = {"peak": 0.0}
+        def track(x, key="peak"):
+            if len(x): st[key]=max(st[key], float(np.max(np.abs(x))))
+            return x
+
+        # 1–3) cleanup (per block with context), source filters, leveler, room IR, events
+        notes={"wpe": ""}
+        def cleanup(x):
+            x, note=source_cleanup(x, tier, p["wpe_strength"], p["dereverb_amt"], p["cleanup_mix"])
+            notes["wpe"]=notes["wpe"] or note; return x
+        wpe_s=_num(p["wpe_strength"]); der=_num(p["dereverb_amt"])
+        do_clean=wpe_s>0.0 or der>0.0
+        lev_amt=_num(p["leveler_amt"])
+        _room_ir=_safe_file(p["room_ir_file"]); _bg_ir=_safe_file(p["bg_ir_file"])
+        same_ir=_same_file(_room_ir, _bg_ir); room_apply=None if same_ir else _room_ir
+        plans=[]
+        for key in ("traffic", "baby", "dog"):
+            ok,_=_expand_files_with_warnings(_coerce_paths_list(p[f"{key}_files"]))
+            plans.append(_plan_events(n, ok, float(p[f"{key}_ev_min"]), float(p[f"{key}_vol_db"]), rng=rng))
+        bg_candidates=_coerce_paths_list(p["bg_file"])
+        selected_bg=bg_candidates[int(rng.integers(len(bg_candidates)))] if bg_candidates else None
+        if selected_bg and os.path.exists(selected_bg): bg_desc=os.path.basename(selected_bg)
+        elif bg_candidates: bg_desc=f"random from {len(bg_candidates)} files"
+        else: bg_desc="none"
+        bg_path=_safe_file(selected_bg)
+        bed=open_bed(bg_path, SR)
+        bg_start=_bg_pick_start(bed.n, rng) if bed else 0
+        atk=max(1,int(SR*15.0/1000.0)); rel=max(1,int(SR*350.0/1000.0))
+        hl_st, lev_st, room_st, env_st = {}, {}, {}, {"g": 0.0}
+        st["env"]=0.0
+        def front(x, i0):
+            x=hpf_lpf(x, float(p["src_hpf"]), float(p["src_lpf"]), state=hl_st)
+            if lev_amt>0.0: x=leveler(x, lev_amt, state=lev_st)
+            x=convolve_ir(x, room_apply, float(p["room_ir_gain_db"]), state=room_st)
+            for plan in plans: x+=_render_events(np.zeros(len(x), dtype=np.float32), plan, i0)
+            if bed:
+                e=_env_ar(np.abs(x), atk, rel, g0=env_st["g"]); env_st["g"]=float(e[-1])
+                st["env"]=max(st["env"], float(e.astype(np.float32).max()))
+            return track(x)
+        if do_clean and DENOISE_ENGINE == "online" and wpe_s <= 0.0:
+            # the online estimator carries its state across blocks: one causal pass, no block context
+            with profile_stage("cleanup"):
+                _stream_push(src, dst, block, OnlineDenoiser(der), _cleanup_wet(tier, p["cleanup_mix"]))
+            src, dst = dst, src; do_clean = False
+        with profile_stage("front"):
+            _stream_pass(src, dst, block, front, cleanup if do_clean else None, ctx)
+        src, dst = dst, src
+
+        # 4) background bed: cyclic from the random start, BG IR, zero-phase filters, ducked mix
+        if bed:
+            bed_t=tape(); bir_st={}
+            def bed_block(x, i0):
+                b=bed.read(bg_start+i0, len(x))
+                if _bg_ir: b=convolve_ir(b, _bg_ir, float(p["bg_ir_gain_db"]), state=bir_st)
+                b*=0.85; return b
+            with profile_stage("background"):
+                _stream_pass(src, bed_t, block, bed_block)
+            bed_f=_stream_zero_phase(bed_t, float(p["bg_hpf"]), float(p["bg_lpf"]), block)
+            if bed_f is not None: tapes.append(bed_f)
+            env_st["g"]=0.0; m_env=float(st["env"] or 1.0); st["peak"]=0.0
+            duck_lin=10**(float(p["bg_duck_db"])/20.0); g_bg=10**(float(p["bg_gain_db"])/20.0)
+            def mix(x, i0):
+                b=_soft_clip((bed_f or bed_t).read(i0, i0+len(x)).astype(np.float32), drive=1.0)
+                e=_env_ar(np.abs(x), atk, rel, g0=env_st["g"]); env_st["g"]=float(e[-1])
+                env=(e.astype(np.float32)/m_env).astype(np.float32)
+                g_duck=duck_lin + (1.0 - duck_lin) * (1.0 - env)
+                return track((x + g_bg * b * g_duck).astype(np.float32))
+            with profile_stage("bg_mix"):
+                _stream_pass(src, dst, block, mix)
+            src, dst = dst, src
+
+        # 5) pre-limit + phone quality tier
+        peak=float(st["peak"] or 1.0)
+        if tier != "custom":
+            params=PHONE_QUALITY_TIERS.get(tier, PHONE_QUALITY_TIERS["standard"]); codec_status=params["description"]
+        else:
+            params={"bandwidth": (float(p["custom_low_freq"]), float(p["custom_high_freq"])), "sample_rate_factor": 1.0,
+                    "noise_level": float(p["custom_noise"])}
+            codec_status=f"Custom Quality ({int(p['custom_low_freq'])}-{int(p['custom_high_freq'])}Hz)"
+        lo,hi=params["bandwidth"]
+        def prelimit(x):
+            return (x * (0.707 / peak)).astype(np.float32) if peak > 0.707 else x
+        tb_st={}; st["peak"]=0.0
+        if modern:
+            _stream_pass(src, dst, block, lambda x, i0: prelimit(x)); src, dst = dst, src
+            zp=_stream_zero_phase(src, float(lo), float(hi), block)
+            if zp is not None:
+                tapes.append(zp); _stream_pass(zp, dst, block, lambda x, i0: track(x.astype(np.float32)))
+            else:
+                _stream_pass(src, dst, block, lambda x, i0: track(x))
+        else:
+            _stream_pass(src, dst, block, lambda x, i0: track(hpf_lpf(prelimit(x), float(lo), float(hi), state=tb_st)))
+        src, dst = dst, src
+        if params["sample_rate_factor"] < 1.0:  # never set by the built-in tiers; per block like cleanup
+            def srf(x):
+                t_sr = int(SR * params["sample_rate_factor"])
+                return _fit_len(resample_rate(resample_rate(x, SR, t_sr), t_sr, SR), len(x))
+            st["peak"]=0.0; _stream_pass(src, dst, block, lambda x, i0: track(x), srf, ctx); src, dst = dst, src
+        if tier in LANDLINE_MULAW:
+            mu_amt, mlo, mhi, drive = LANDLINE_MULAW[tier]
+            vb=_stream_zero_phase(src, mlo, mhi, block)
+            if vb is not None:
+                tapes.append(vb); st["vpk"]=0.0
+                _stream_pass(vb, None, block, lambda x, i0: track(x.astype(np.float32), "vpk"))
+                vpk=float(st["vpk"] or 1.0); st["peak"]=0.0
+                def mulaw(x, i0):
+                    v=vb.read(i0, i0+len(x)).astype(np.float32)
+                    return track(mulaw_color_into(v, mu_amt, drive, 0.707 / vpk if vpk > 0.707 else 1.0, base=x, out=v))
+                _stream_pass(src, dst, block, mulaw); src, dst = dst, src
+        noise_sd=params["noise_level"] * st["peak"] if params["noise_level"] > 0 else 0.0
+        bw=p["bandwidth_mode"]
+        bw_hz={"Narrowband 300–3500": (300.0, 3500.0), "Wideband 80–7000": (80.0, 7000.0)}.get(bw) if not modern else None
+        bw_st={}
+        def tier_tail(x, i0):
+            if noise_sd:
+                noise=_gauss(rng, x.shape, noise_sd); noise += x; x=noise
+            if bw_hz: x=hpf_lpf(x, bw_hz[0], bw_hz[1], state=bw_st)
+            return x
+        _stream_pass(src, dst, block, tier_tail); src, dst = dst, src
+
+        # Opus (opuslib keeps encoder/decoder state across blocks; otherwise per block with context)
+        bps=float(p["opus_bitrate_kbps"])
+        skip_opus=tier in ["high", "ultra_high", "good_landline", "bad_landline", "cordless"]
+        if not skip_opus and bps < 32:
+            if _stream_opus(src, dst, block, bps, ctx):
+                src, dst = dst, src
+                codec_status += f" + Opus {int(bps)} kbps"
+
+        # μ-law grit + 6) network artifacts (random: per block with context)
+        grit=float(p["post_mu_grit"])
+        def artifacts(x):
+            if grit>0:
+                x=mulaw_grit_into(x, float(np.clip(grit,0.0,0.15)), 255.0)
+            return _fit_len(network_artifacts(x, tier, *(p[k] for k in ("custom_dropout_mult", "custom_garble_mult",
+                "plc_ms", "dropout_prob", "dropout_depth_db", "garble_prob", "stutter_amt", "jitter_intensity",
+                "buffer_prob", "reorder_prob", "codec_type", "codec_intensity", "mic_proximity", "mic_type",
+                "mp3_amt", "rf_amt")), rng=rng), len(x))
+        st["peak"]=0.0
+        _stream_pass(src, dst, block, lambda x, i0: track(x), artifacts, ctx)
+        src, dst = dst, src
+
+        # safety clip, 7) handset IR, 8) normalization
+        clip=st["peak"] > 1.0; hs_st={}
+        handset=_safe_file(p["handset_ir_file"]) if not modern else None
+        meter=None
+        if p["normalize_output"]:
+            try: meter=_StreamLoudness(SR)
+            except ImportError: meter=None
+        st["peak"]=0.0
+        def post(x, i0):
+            if clip: x=_soft_clip(x, drive=1.1)
+            if handset: x=convolve_ir(x, handset, float(p["handset_ir_gain_db"]), state=hs_st)
+            if meter is not None: meter.add(x)
+            return track(x)
+        with profile_stage("post"):
+            _stream_pass(src, dst, block, post); src, dst = dst, src
+        gain=None
+        if p["normalize_output"]:
+            norm_note=" · Normalized"
+            if meter is not None:
+                try:
+                    import pyloudnorm as pyln
+                    loud=meter.integrated()
+                    if not (loud == float('-inf') or np.isnan(loud)):
+                        gain=lambda x: pyln.normalize.loudness(x, loud, -18.0).astype(np.float32)
+                except Exception:
+                    gain=None
+            elif st["peak"] > 0:
+                gain=lambda x, s=0.32/st["peak"]: (x * s).astype(np.float32)
+        else:
+            norm_note=""
+            if float(st["peak"] or 0.0) >= 1e-9:
+                gain=lambda x, m=float(st["peak"]): (x/m*0.97).astype(np.float32)
+        out=tempfile.NamedTemporaryFile(prefix="vlab_", delete=False, suffix=".wav", dir=TMP_DIR); out.close()
+        with profile_stage("write"), sf.SoundFile(out.name, "w", SR, 1) as wf:
+            _stream_pass(src, None, block, lambda x, i0: wf.write(gain(x) if gain else x))
+
+        room_ir_name=os.path.basename(_room_ir) if _room_ir else "none"
+        ir_guard_note=" · IR:BG only" if same_ir else ""
+        status=f"OK · Codec: {codec_status}{notes['wpe']} · BG:{bg_desc} · IR:{room_ir_name}{ir_guard_note}{norm_note} · Streamed"
+        return out.name, status
+    finally:
+        for t in tapes: t.close()
+
+@_profiled("opus")
+def _stream_opus(src: _Tape, dst: _Tape, block: int, bps: float, ctx: int) -> bool:
+    """Opus round trip tape→tape. opuslib streams frame-exact (same output as _opus_opuslib);
+    other backends run per block with context. False if no backend worked."""
+    if OPUS_BACKEND in ("auto", "opuslib"):
+        try:
+            import opuslib
+            frame=SR//50
+            enc=opuslib.Encoder(SR, 1, "audio"); enc.bitrate=int(bps*1000); dec=opuslib.Decoder(SR, 1)
+            skip=int(enc.lookahead); pos=-skip; n=src.n
+            n_frames=-(-(n+skip)//frame)
+            def run(x):
+                nonlocal pos
+                out=np.concatenate([np.frombuffer(dec.decode_float(enc.encode_float(x[i:i+frame].tobytes(), frame), frame), dtype=np.float32)
+                                    for i in range(0, len(x), frame)])
+                a=max(0, -pos); b=min(len(out), n-pos)
+                if b>a: dst.write(pos+a, out[a:b])
+                pos+=len(out)
+            for i0 in range(0, n, block):
+                x=src.read(i0, i0+block)
+                if len(x)%frame: x=np.pad(x, (0, frame-len(x)%frame))
+                run(x)
+            left=n_frames*frame-(pos+skip)
+            if left>0: run(np.zeros(left, dtype=np.float32))
+            return True
+        except Exception:
+            pass
+    ok={"any": False}
+    def codec(x):
+        y,_=opus_codec(x, bps, SR)
+        if y is None: return x
+        ok["any"]=True; return np.asarray(y, dtype=np.float32)
+    _stream_pass(src, dst, block, lambda x, i0: x, codec, ctx)
+    return ok["any"]
+
+
+def process_bojan_preset(mic_file, preset_name: str, normalize_override: Optional[bool] = None,
+                         seed: Optional[int] = None):
     """Run the simplified preset flow used by the basic Bojan UI."""
     preset = BOJAN_PRESET_CONFIGS.get(preset_name)
     if not preset:
@@ -1516,7 +3196,8 @@ def process_bojan_preset(mic_file, preset_name: str, normalize_override: Optiona
     args = [cfg[name] for name in PROCESS_AUDIO_PARAM_ORDER]
     return process_audio(
         mic_file,
-        *args
+        *args,
+        seed=seed
     )
 
 
@@ -1537,7 +3218,8 @@ def process_editor_request(
     traffic_files, traffic_ev_min, traffic_vol_db,
     baby_files, baby_ev_min, baby_vol_db,
     dog_files, dog_ev_min, dog_vol_db,
-    normalize_output
+    normalize_output,
+    seed=None
 ):
     room_ir_final = _resolve_file(room_ir_upload, room_ir_path)
     bg_file_final = _resolve_files(bg_file_upload, bg_file_path)
@@ -1560,7 +3242,8 @@ def process_editor_request(
         traffic_files, traffic_ev_min, traffic_vol_db,
         baby_files, baby_ev_min, baby_vol_db,
         dog_files, dog_ev_min, dog_vol_db,
-        normalize_output
+        normalize_output,
+        seed=seed
     )
 
 # ───────────────── presets I/O ─────────────────
@@ -1853,6 +3536,12 @@ def create_app():
 
         with gr.Tab("Output"):
             normalize_output = gr.Checkbox(False, label="Normalize Output", info="Normalize all processed audio to consistent level (-18 LUFS for radio broadcast)")
+            seed = gr.Number(None, precision=0, label="Seed", info="Same seed + settings → identical take (repeat renders come from the render cache); blank = new take each time")
+
+        with gr.Tab("Profiling"):
+            prof_on = gr.Checkbox(PROFILE, label="Profile renders", info="Per-stage wall/CPU time and peak allocation, appended to the status and logged as JSON")
+            prof_hist = gr.JSON(label="Per-stage latency histogram (this process)")
+            prof_refresh = gr.Button("Refresh histogram")
 
         with gr.Tab("SFX Generators"):
             traf_files = gr.File(file_count="multiple", label="Traffic (horns/sirens/streets)")
@@ -1898,10 +3587,12 @@ def create_app():
                 traf_files, traf_ev, traf_vol,
                 baby_files, baby_ev, baby_vol,
                 dog_files, dog_ev, dog_vol,
-                normalize_output
+                normalize_output, seed
             ],
             outputs=[out, status]
         )
+        prof_on.change(set_profiling, inputs=prof_on, outputs=None)
+        prof_refresh.click(profile_histogram, inputs=None, outputs=prof_hist, api_name="profile_histogram")
 
         # Presets (dict schema) — dropdown, save, reload
         prs_state.value = load_presets()
@@ -2031,5 +3722,6 @@ def create_app():
     return demo
 
 if __name__=="__main__":
+    PROFILE_LOG.addHandler(logging.StreamHandler()); PROFILE_LOG.setLevel(logging.INFO)
     app = create_app()
     app.queue(default_concurrency_limit=4).launch(server_name="0.0.0.0", server_port=7860)
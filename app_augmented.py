@@ -10,6 +10,8 @@ import soundfile as sf
 import scipy.signal as sig
 from scipy.signal import fftconvolve
 
+from dsp_core import dropout_events_random, apply_dropout_events, resample_rate, sos_chain
+
 # Optional dereverb (stationary spectral subtraction)
 try:
     import noisereduce as nr
@@ -30,7 +32,7 @@ def load_wav(path: str) -> Tuple[np.ndarray, int]:
 
 def mono_16k(y: np.ndarray, sr: int) -> np.ndarray:
     if y.ndim > 1: y = y.mean(axis=1)
-    if sr != SR:   y = sig.resample(y, int(len(y) * SR / sr))
+    if sr != SR:   y = resample_rate(y, sr, SR)
     return y.astype(np.float32)
 
 def save_tmp(y: np.ndarray) -> str:
@@ -72,11 +74,10 @@ def bg_random_start_loop(bg: np.ndarray, out_len: int) -> np.ndarray:
     return seq[:out_len]
 
 def bg_filter(y: np.ndarray, lp_hz: float, hp_hz: float) -> np.ndarray:
-    out = y
-    if hp_hz and hp_hz > 20:
-        out = sig.sosfilt(sig.butter(2, hp_hz/(SR/2), btype="high", output="sos"), out)
-    if lp_hz and lp_hz < SR/2:
-        out = sig.sosfilt(sig.butter(2, lp_hz/(SR/2), btype="low", output="sos"), out)
+    stages = []
+    if hp_hz and hp_hz > 20: stages.append(("high", 2, float(hp_hz), SR))
+    if lp_hz and lp_hz < SR/2: stages.append(("low", 2, float(lp_hz), SR))
+    out = sig.sosfilt(sos_chain(*stages), y) if stages else y
     return out.astype(np.float32)
 
 def mix_background(y: np.ndarray, bg: Optional[np.ndarray], gain_db: float, duck_db: float) -> np.ndarray:
@@ -101,9 +102,10 @@ def softclip(y: np.ndarray, amt: float) -> np.ndarray:
     return (np.tanh(y*drive)/drive).astype(np.float32)
 
 def bandlimit(y: np.ndarray, lo: float, hi: float) -> np.ndarray:
-    out = y
-    if lo and lo>20: out = sig.sosfilt(sig.butter(4, lo/(SR/2), btype="high", output="sos"), out)
-    if hi and hi<SR/2: out = sig.sosfilt(sig.butter(4, hi/(SR/2), btype="low", output="sos"), out)
+    stages = []
+    if lo and lo>20: stages.append(("high", 4, float(lo), SR))
+    if hi and hi<SR/2: stages.append(("low", 4, float(hi), SR))
+    out = sig.sosfilt(sos_chain(*stages), y) if stages else y
     return out.astype(np.float32)
 
 # --- Real bitrate crush: decimation (SR) + bit depth ---
@@ -113,7 +115,7 @@ def bitrate_crush(y: np.ndarray, kbps: float, depth_bits: int = 10) -> np.ndarra
     eff = float(np.interp(kbps, [6,12,24,48,64], [1800,3000,5000,9000,14000]))
     dec = max(1, int(round(SR/max(800.0, eff))))
     y_ds = y[::dec]
-    y_us = sig.resample(y_ds, len(y))
+    y_us = resample_rate(y_ds, 1, dec)[:len(y)]
     bits = int(np.clip(depth_bits, 6, 12))
     q = 2**(bits-1) - 1
     return (np.round(np.clip(y_us,-1,1)*q)/q).astype(np.float32)
@@ -128,15 +130,12 @@ def codec_mu_law(y: np.ndarray, intensity: float) -> np.ndarray:
 
 def dropouts(y: np.ndarray, per_min: float, avg_ms: float, jitter_ms: float, depth_db: float) -> np.ndarray:
     if per_min <= 0: return y
-    out = y.copy(); n = len(y)
+    n = len(y)
     count = int(max(0, per_min*(n/SR)/60.0))
-    depth = 10 ** (depth_db/20.0)  # negative
-    for _ in range(count):
-        dur = max(15.0, np.random.normal(avg_ms, jitter_ms))
-        L = int(dur*SR/1000.0)
-        s = np.random.randint(0, max(1, n-L))
-        out[s:s+L] *= depth
-    return out
+    # shared engine in app.py; Generator seeded from np.random so the Seed box still reproduces
+    ev = dropout_events_random(n, count, avg_ms, jitter_ms, 15.0, SR,
+                               rng=np.random.default_rng(np.random.randint(1 << 31)), inside=True)
+    return apply_dropout_events(y.copy(), ev, depth_db)
 
 # --- REAL intermittent garble events ---
 def stutter_events(y: np.ndarray, events_min: float, amt: float) -> np.ndarray:
@@ -0,0 +1,377 @@
+"""VoiceLab FX micro-benchmarks for the DSP hot spots.
+
+Usage:
+    python benchmark.py                     # every bench at the default lengths
+    python benchmark.py envelope            # one bench
+    python benchmark.py envelope --minutes 1,10
+
+Each bench prints one line per (engine, length) with wall time and realtime factor.
+"""
+import argparse, importlib, os, time
+import numpy as np
+
+m = importlib.import_module('app')
+SR = m.SR
+
+
+def speechlike(minutes: float, seed: int = 0) -> np.ndarray:
+    """Noise with syllable-rate AM and pauses — enough structure to exercise detectors."""
+    rng = np.random.default_rng(seed)
+    n = int(minutes * 60 * SR)
+    t = np.arange(n, dtype=np.float32) / SR
+    am = (0.5 + 0.5 * np.sin(2 * np.pi * 3.0 * t)) ** 2
+    gate = (rng.random(n // 4800 + 1) > 0.3).repeat(4800)[:n]
+    return (rng.standard_normal(n).astype(np.float32) * am * gate * 0.3).astype(np.float32)
+
+
+def riding(minutes: float, atk: int, rel: int) -> np.ndarray:
+    """Rectified input that rides the detector: each sample sits within rounding of its state,
+    alternately above and below, so the branch mask never settles (worst case for the scan)."""
+    n = int(minutes * 60 * SR); v = np.empty(n); g = 0.1; ka, kr = 1.0 / atk, 1.0 / rel
+    for i in range(n):
+        v[i] = x = g * (1.0 + (1e-15 if i & 1 else -1e-15))
+        g = (1 - ka) * g + ka * x if x > g else (1 - kr) * g + kr * x
+    return v
+
+
+def timed(fn, *a, **kw):
+    t0 = time.perf_counter(); out = fn(*a, **kw); return out, time.perf_counter() - t0
+
+
+def report(name: str, engine: str, minutes: float, sec: float, extra: str = ""):
+    rtf = (minutes * 60.0) / sec if sec > 0 else float('inf')
+    print(f"{name:<10} {engine:<8} {minutes:>5.1f} min  {sec:8.3f} s  {rtf:9.1f}x realtime  {extra}")
+
+
+# ───────────────── benches ─────────────────
+def bench_envelope(minutes_list):
+    atk = max(1, int(SR * 15.0 / 1000.0)); rel = max(1, int(SR * 350.0 / 1000.0))
+    kern = m._env_numba_kernel()
+    if kern: kern(np.zeros(16), atk, rel, 0.0)  # compile outside the timed region
+    for mins in minutes_list:
+        for name, ax in (("envelope", np.abs(speechlike(mins))), ("env-ride", riding(mins, atk, rel))):
+            ref, t_py = timed(m._env_ar_python, ax, atk, rel)
+            report(name, "python", mins, t_py)
+            out, t = timed(m._env_ar_numpy, ax, atk, rel)
+            report(name, "numpy", mins, t, f"speedup {t_py/t:6.1f}x  maxerr {np.max(np.abs(out-ref)):.2e}")
+            if kern:
+                out, t = timed(kern, ax.astype(np.float64), atk, rel, 0.0)
+                report(name, "numba", mins, t, f"speedup {t_py/t:6.1f}x  maxerr {np.max(np.abs(out-ref)):.2e}")
+
+
+def bench_leveler(minutes_list):
+    m._env_numba_kernel() and m.leveler(speechlike(0.01), 0.45)  # compile outside the timed region
+    for mins in minutes_list:
+        x = speechlike(mins)
+        prev = m.set_env_engine("python")
+        try:
+            ref, t_py = timed(m.leveler, x, 0.45)
+            report("leveler", "python", mins, t_py)
+            for eng in ("numpy", "numba"):
+                if eng == "numba" and not m._env_numba_kernel(): continue
+                m.set_env_engine(eng)
+                out, t = timed(m.leveler, x, 0.45)
+                report("leveler", eng, mins, t, f"speedup {t_py/t:6.1f}x  maxerr {np.max(np.abs(out-ref)):.2e}")
+        finally:
+            m.set_env_engine(prev)
+
+
+def bench_convolve(minutes_list):
+    import tempfile, soundfile as sf
+    from scipy.signal import fftconvolve
+    rng = np.random.default_rng(1)
+    ir = (rng.standard_normal(SR) * np.exp(-np.arange(SR) / (0.2 * SR))).astype(np.float32)  # 1 s room tail
+    ir /= np.max(np.abs(ir))
+    ir_path = tempfile.NamedTemporaryFile(delete=False, suffix='.wav').name
+    sf.write(ir_path, ir, SR, subtype='FLOAT')
+    for mins in minutes_list:
+        x = speechlike(mins)
+        ref, t_ref = timed(lambda: fftconvolve(x, ir, mode='full')[:len(x)])
+        report("convolve", "fftconv", mins, t_ref)
+        m.IR_STORE.clear()
+        wet, t_cold = timed(m.convolve_ir, x, ir_path, 100.0)
+        report("convolve", "ols-cold", mins, t_cold, f"speedup {t_ref/t_cold:6.1f}x  maxerr {np.max(np.abs(wet-ref)):.2e}")
+        wet, t_warm = timed(m.convolve_ir, x, ir_path, 100.0)
+        report("convolve", "ols-warm", mins, t_warm, f"speedup {t_ref/t_warm:6.1f}x")
+    os.remove(ir_path)
+
+
+def bench_opus(minutes_list):
+    for mins in minutes_list:
+        x = speechlike(mins)
+        t_file = None
+        for name in ("file", "pipe", "opuslib"):
+            m.OPUS_CACHE.clear()
+            out, t = timed(m.opus_codec, x, 12.0, SR, name)
+            if out is None:
+                report("opus", name, mins, float('nan'), "unavailable"); continue
+            t_file = t_file or t
+            report("opus", name, mins, t, f"speedup {t_file/t:6.1f}x vs file")
+        _, t = timed(m.opus_codec, x, 12.0, SR)
+        report("opus", "cached", mins, t)
+
+
+def bench_stream(minutes_list):
+    import tempfile, tracemalloc, soundfile as sf
+    # deterministic chain (no cleanup / random artifacts) so the two renders must agree
+    cfg = dict(m.BOJAN_PRESET_DEFAULTS)
+    cfg.update(quality_tier="bad_landline", leveler_amt=0.5, src_hpf=80.0, dropout_prob=0.0, jitter_intensity=0.0,
+               rf_amt=0.0, bg_file=None, normalize_output=True)
+    args = [cfg[k] for k in m.PROCESS_AUDIO_PARAM_ORDER]
+    for mins in minutes_list:
+        path = tempfile.NamedTemporaryFile(delete=False, suffix='.wav').name
+        sf.write(path, speechlike(mins), SR)
+        outs = {}
+        for name, fn in (("whole", m.process_audio), ("stream", m.process_audio_stream)):
+            tracemalloc.start()
+            (out, _), t = timed(fn, path, *args, seed=0)
+            peak = tracemalloc.get_traced_memory()[1] / 2**20; tracemalloc.stop()
+            outs[name] = out
+            report("stream", name, mins, t, f"peak alloc {peak:8.1f} MB")
+        a = sf.read(outs["whole"], dtype='float32')[0]; b = sf.read(outs["stream"], dtype='float32')[0]
+        print(f"{'':<10} maxdiff whole/stream {np.max(np.abs(a - b)) if len(a) == len(b) else float('inf'):.2e}")
+        for p in (path, *outs.values()): os.remove(p)
+
+
+def bench_garble(minutes_list):
+    gwin = int(0.06 * SR)
+    w = np.arange(4); m._garble_scipy(np.ones(gwin*4, np.float32), w, w*0.1+0.9, gwin)
+    m._garble_batched(np.ones(gwin*4, np.float32), w, w*0.1+0.9, gwin)  # warm up outside the timed region
+    for mins in minutes_list:
+        x = m.hpf_lpf(speechlike(mins), 300.0, 3400.0)  # garble runs after the phone band-limit
+        for p in (0.06, 0.32, 1.0):  # Street Caller, Spotty Service, every window
+            sel, f = m._garble_plan(len(x), p, gwin, np.random.default_rng(0))
+            ref, t_ref = timed(m._garble_scipy, x, sel, f, gwin)
+            out, t = timed(m._garble_batched, x, sel, f, gwin)
+            hit = np.zeros(len(x), bool)
+            for w in sel: hit[w*gwin:(w+1)*gwin] = True
+            err = np.sqrt(np.mean((out[hit] - ref[hit])**2) / (np.mean(ref[hit]**2) + 1e-20)) if hit.any() else 0.0
+            report("garble", f"p={p}", mins, t_ref, f"scipy, {len(sel)} windows")
+            report("garble", "batched", mins, t, f"speedup {t_ref/t:6.1f}x  rel-rms {err:.2e}")
+
+
+def bench_jitter(minutes_list):
+    chunk = int(0.02 * SR)
+    for mins in minutes_list:
+        x = m.hpf_lpf(speechlike(mins), 300.0, 3400.0)
+        max_d, delays = m._jitter_plan(len(x), 0.18, SR, np.random.default_rng(0))
+        def loop():  # the original per-chunk overlap-add
+            buf = np.zeros(len(x) + 2*max_d, np.float32); ov = np.zeros_like(buf)
+            for k, i in enumerate(range(0, len(x), chunk)):
+                p = i + max_d + delays[k]; buf[p:p+chunk] += x[i:i+chunk]; ov[p:p+chunk] += 1.0
+            ov[ov == 0] = 1.0; buf /= ov; return buf[max_d:max_d+len(x)]
+        ref, t_ref = timed(loop)
+        out, t = timed(m._jitter_ola, x, max_d, delays, chunk)
+        report("jitter", "loop", mins, t_ref)
+        report("jitter", "add.at", mins, t, f"speedup {t_ref/t:6.1f}x  maxerr {np.max(np.abs(out-ref)):.2e}")
+        for p in (0.3, 1.0, 20.0):  # 20: heavy overlap, ~40 events/s stacked many deep
+            plan = m._rebuffer_plan(len(x), p, SR, np.random.default_rng(0))
+            ref, t_ref = timed(m._rebuffer_scipy, x, *plan)
+            out, t = timed(m._rebuffer_batched, x, *plan)
+            err = np.sqrt(np.mean((out - ref)**2) / (np.mean(ref**2) + 1e-20))
+            waves = int(m._rebuffer_waves(plan[0], plan[0] + plan[1]).max()) + 1 if len(plan[0]) else 0
+            report("rebuffer", f"p={p}", mins, t_ref, f"scipy, {len(plan[0])} events")
+            report("rebuffer", "batched", mins, t, f"speedup {t_ref/t:6.1f}x  rel-rms {err:.2e}  {waves} waves")
+
+
+def bench_codec(minutes_list):
+    from scipy.signal import hilbert
+    pre = int(0.002 * SR)
+    def loop(x):  # the original opus branch: complex128 hilbert + per-sample transient loop
+        env = np.abs(hilbert(x)); d = np.diff(np.pad(env, (1, 0), 'edge')); hit = d > np.std(d) * 2
+        out = np.zeros_like(x)
+        for i in range(pre, len(x)):
+            if hit[i]: out[i-pre:i] += x[i] * 0.06 * env[i] * np.linspace(0, 1, pre)
+        return out
+    for mins in minutes_list:
+        x = m.hpf_lpf(speechlike(mins), 300.0, 3400.0)
+        ref, t_ref = timed(loop, x)
+        report("pre-echo", "loop", mins, t_ref)
+        out, t = timed(lambda: m.opus_pre_echo(x, m.analytic_envelope(x), 0.6))
+        err = np.sqrt(np.mean((out - ref)**2) / (np.mean(ref**2) + 1e-20))
+        report("pre-echo", "kernel", mins, t, f"speedup {t_ref/t:6.1f}x  rel-rms {err:.2e}")
+        for name, xx in (("hilbert", x), ("hilbert+1", np.append(x, 0.0).astype(np.float32))):
+            _, t_ref = timed(lambda: np.abs(hilbert(xx)))
+            _, t = timed(m.analytic_envelope, xx)
+            report("envelope", name, mins, t_ref, "scipy complex128")
+            report("envelope", "shared", mins, t, f"speedup {t_ref/t:6.1f}x")
+
+
+def next_prime(n: int) -> int:
+    def prime(k): return k > 1 and all(k % p for p in range(2, int(k ** 0.5) + 1))
+    while not prime(n): n += 1
+    return n
+
+
+def bench_amr(minutes_list):
+    from scipy.signal import hilbert, resample
+    def fft_path(x):  # the original amr_nb band-limit + transient softening (rng-free parts)
+        up = resample(resample(x, int(len(x) * 8000 / SR)), len(x))
+        env = np.abs(hilbert(x)); sm = np.convolve(env, np.ones(int(0.005*SR))/int(0.005*SR), mode='same')
+        return up * (1 - 0.3 * np.clip(env / (sm + 1e-10) - 1, 0, 1))
+    def poly_path(x):
+        env = m.analytic_envelope(x); sm = m._box_same(env, int(0.005*SR))
+        return m.narrowband_roundtrip(x) * (1 - 0.3 * np.clip(env / (sm + 1e-10) - 1, 0, 1))
+    for mins in minutes_list:
+        base = m.hpf_lpf(speechlike(mins), 300.0, 3400.0)
+        for kind, n in (("even", len(base)), ("prime", next_prime(len(base)))):
+            x = np.pad(base, (0, n - len(base)))
+            ref, t_ref = timed(fft_path, x)
+            out, t = timed(poly_path, x)
+            err = np.sqrt(np.mean((out - ref)**2) / (np.mean(ref**2) + 1e-20))
+            report("amr_nb", f"fft/{kind}", mins, t_ref, f"n={n}")
+            report("amr_nb", "poly", mins, t, f"speedup {t_ref/t:6.1f}x  rel-rms {err:.2e}")
+
+
+def bench_mulaw(minutes_list):
+    import tracemalloc
+    def old_path(y, vb):  # the original landline colour + post_mu_grit, temporaries and all
+        y = m._mulaw_curve(m._prelimit(vb, 0.707), 0.6, 255.0, 0.75) + (y - vb)
+        comp = np.sign(y) * np.log1p(255.0 * np.abs(y)) / np.log1p(255.0)
+        return ((1.0 - 0.1) * y + 0.1 * comp).astype(np.float32)
+    def fused(y, vb, eng):
+        pk = float(max(np.max(vb), -np.min(vb)))
+        y = m.mulaw_color_into(vb, 0.6, 0.75, 0.707 / pk if pk > 0.707 else 1.0, base=y, out=vb, engine=eng)
+        return m.mulaw_grit_into(y, 0.1, 255.0, out=y, engine=eng)
+    for eng in ("numexpr", "numba"): fused(np.ones(8, np.float32), np.ones(8, np.float32), eng)  # compile/warm
+    for mins in minutes_list:
+        y = m.hpf_lpf(speechlike(mins), 300.0, 3400.0); vb0 = m._zphf(y, 300.0, 2400.0)
+        for name, fn in [("old", lambda vb: old_path(y, vb))] + [(e, lambda vb, e=e: fused(y, vb, e))
+                                                                  for e in ("numexpr", "numba", "numpy")]:
+            if name != "old" and m.mulaw_engine(name) != name:
+                report("mulaw", name, mins, float('nan'), "unavailable"); continue
+            vb = vb0.copy()  # the fused path colours the band buffer in place
+            tracemalloc.start()
+            out, t = timed(fn, vb)
+            peak = tracemalloc.get_traced_memory()[1] / 2**20; tracemalloc.stop()
+            if name == "old": ref = out
+            report("mulaw", name, mins, t, f"peak alloc {peak:8.1f} MB  maxdiff {np.max(np.abs(out - ref)):.1e}")
+
+
+def bench_float32(minutes_list):
+    import tracemalloc
+    from scipy.signal import resample_poly, sosfilt, sosfiltfilt
+    sos64 = m.hpf_lpf_sos(300.0, 3400.0)
+    h64 = m.resample_filter(1, 6).astype(np.float64)
+    rng = np.random.default_rng(0)
+    pairs = {  # stage: (float64-promoting original, float32-native)
+        "hpf_lpf": (lambda x: sosfilt(sos64, x).astype(np.float32), lambda x: m.hpf_lpf(x, 300.0, 3400.0)),
+        "zero_phase": (lambda x: sosfiltfilt(sos64, x).astype(np.float32),
+                       lambda x: m.hpf_lpf(x, 300.0, 3400.0, zero_phase=True)),
+        "resample": (lambda x: resample_poly(x, 1, 6, window=h64).astype(np.float32), lambda x: m.resample_rate(x, SR, 8000)),
+        "noise": (lambda x: (x + rng.normal(0, 0.01, x.shape)).astype(np.float32),
+                  lambda x: m._gauss(rng, x.shape, 0.01).__iadd__(x)),
+        "warble": (lambda x: (x * (1 + 0.05 * np.sin(2 * np.pi * 1.3 * (np.arange(len(x)) / SR)))).astype(np.float32),
+                   lambda x: x * m._sine(len(x), 1.3, 0.05)),
+    }
+    for mins in minutes_list:
+        x = speechlike(mins)
+        for name, (old, new) in pairs.items():
+            res = []
+            for fn in (old, new):
+                tracemalloc.start()
+                out, t = timed(fn, x)
+                res.append((t, tracemalloc.get_traced_memory()[1] / 2**20, out)); tracemalloc.stop()
+            (t0, p0, a), (t1, p1, b) = res
+            report("float32", name, mins, t1, f"peak alloc {p1:7.1f} MB vs {p0:7.1f} MB float64 path ({t0:.3f} s)"
+                   f"  out {b.dtype}{'' if name == 'noise' else f'  maxdiff {np.max(np.abs(a - b)):.1e}'}")
+
+
+def bench_cleanup(minutes_list):
+    """Separate WPE + chained reduce_noise passes (one STFT/ISTFT per stage and pass) vs the shared-STFT cleanup."""
+    for mins in minutes_list:
+        x = speechlike(mins)
+        for amt in (1.0, 1.5):
+            sep, t0 = timed(lambda v: m.dereverb_strong_chained(0.3 * v + 0.7 * m.wpe_dereverb(v)[0], amt), x)
+            (shared, _), t1 = timed(m.cleanup_shared_stft, x, 0.7, amt)
+            report("cleanup", f"amt {amt:g}", mins, t1, f"separate {t0:.3f} s  x{t0 / max(t1, 1e-9):.2f}"
+                   f"  rms ratio {np.sqrt(np.mean(shared**2) / max(np.mean(sep**2), 1e-20)):.3f}")
+
+
+def bench_dereverb(minutes_list):
+    """Chained reduce_noise passes vs the single calibrated gate: cost should stay flat in amount."""
+    for mins in minutes_list:
+        x = speechlike(mins)
+        for amt in (1.0, 1.2, 2.0, 3.0):
+            ref, t0 = timed(m.dereverb_strong_chained, x, amt)
+            out, t1 = timed(m.dereverb_strong, x, amt)
+            report("dereverb", f"amt {amt:g}", mins, t1, f"chained {t0:.3f} s  x{t0 / max(t1, 1e-9):.2f}"
+                   f"  rms ratio {np.sqrt(np.mean(out**2) / max(np.mean(ref**2), 1e-20)):.3f}")
+
+
+def bench_wpe(minutes_list):
+    """nara_wpe on the whole spectrogram vs the chunked backend, single thread and one per core."""
+    import tracemalloc
+    try:
+        from nara_wpe import wpe as nara
+    except ImportError:
+        nara = None
+    cores = os.cpu_count() or 1
+    for mins in minutes_list:
+        Y = m._cleanup_stft(speechlike(mins))
+        engines = {"chunked1": lambda: m.wpe_chunked(Y, workers=1)}
+        if cores > 1: engines[f"chunked{cores}"] = lambda: m.wpe_chunked(Y, workers=cores)
+        if nara is not None and mins <= 10: engines["nara"] = lambda: nara.wpe(Y[:, None, :], taps=12, delay=3, iterations=1)
+        for name, fn in engines.items():
+            tracemalloc.start(); _, t = timed(fn); peak = tracemalloc.get_traced_memory()[1] / 2**20; tracemalloc.stop()
+            report("wpe", name, mins, t, f"peak alloc {peak:8.1f} MB  (spectrogram {Y.nbytes / 2**20:.1f} MB)")
+
+
+def bench_online(minutes_list):
+    """Look-ahead spectral gate (whole file) vs the online MCRA estimator, whole-array and pushed in 0.5 s blocks."""
+    blk = SR // 2
+    for mins in minutes_list:
+        x = speechlike(mins)
+        ref, t0 = timed(m.dereverb_strong, x, 1.0)
+        out, t1 = timed(m.denoise_online, x, 1.0)
+        report("online", "gate", mins, t0)
+        report("online", "mcra", mins, t1, f"rms ratio vs gate {np.sqrt(np.mean(out**2) / max(np.mean(ref**2), 1e-20)):.3f}")
+        den = m.OnlineDenoiser(1.0)
+        _, t2 = timed(lambda: [den(x[i:i + blk], final=i + blk >= len(x)) for i in range(0, len(x), blk)])
+        report("online", "push", mins, t2, f"{len(x) // blk + 1} blocks")
+
+
+def bench_bed(minutes_list):
+    """Background bed of the given length (44.1 kHz stereo, resampled to SR): full decode vs a 30 s excerpt."""
+    import tempfile, tracemalloc, soundfile as sf
+    for mins in minutes_list:
+        path = tempfile.NamedTemporaryFile(delete=False, suffix='.wav').name
+        x = speechlike(mins)[:int(mins * 60 * 44100)]; sf.write(path, np.stack([x, x[::-1]], axis=1), 44100)
+        for name, fn in (("full", lambda: m._decode_any_to_float32(path, SR)),
+                         ("excerpt", lambda: m.open_bed(path, SR).read(SR * 60, 30 * SR))):
+            m._bed_probe.cache_clear(); tracemalloc.start()
+            out, t = timed(fn)
+            peak = tracemalloc.get_traced_memory()[1] / 2**20; tracemalloc.stop()
+            report("bed", name, mins, t, f"{len(out) / SR:7.1f} s decoded, peak alloc {peak:8.1f} MB")
+        os.remove(path)
+
+
+BENCHES = {
+    "envelope": bench_envelope,
+    "leveler": bench_leveler,
+    "convolve": bench_convolve,
+    "opus": bench_opus,
+    "stream": bench_stream,
+    "garble": bench_garble,
+    "jitter": bench_jitter,
+    "codec": bench_codec,
+    "amr": bench_amr,
+    "mulaw": bench_mulaw,
+    "float32": bench_float32,
+    "cleanup": bench_cleanup,
+    "dereverb": bench_dereverb,
+    "wpe": bench_wpe,
+    "online": bench_online,
+    "bed": bench_bed,
+}
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("bench", nargs="*", help=f"benches to run (default: all of {', '.join(BENCHES)})")
+    ap.add_argument("--minutes", default="1,10,30", help="comma-separated input lengths in minutes")
+    opts = ap.parse_args()
+    mins = [float(v) for v in opts.minutes.split(",") if v.strip()]
+    unknown = [b for b in opts.bench if b not in BENCHES]
+    if unknown: ap.error(f"unknown bench: {', '.join(unknown)}")
+    for name in (opts.bench or list(BENCHES)):
+        BENCHES[name](mins)
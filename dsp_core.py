@@ -0,0 +1,146 @@
+# dsp_core.py — DSP helpers shared by app.py and the standalone apps (app_augmented.py,
+# voice_lab_fx_improved.py): resampling, the Butterworth SOS registry and the dropout engine.
+# Plain numpy/scipy with no import-time side effects, so importing it does not pull in the
+# Gradio app, its caches or its temp-file housekeeping.
+
+from __future__ import annotations
+import functools
+from typing import Any, Optional, Tuple
+
+import numpy as np
+from scipy.signal import resample_poly, butter, firwin
+
+SR = 48000
+
+def _rng(rng: Optional[np.random.Generator] = None) -> np.random.Generator:
+    """The render's Generator; direct calls without one get a fresh unseeded Generator."""
+    return rng if rng is not None else np.random.default_rng()
+
+# ───────────────── resampling ─────────────────
+# Every sample-rate change goes through resample_poly with one cached Kaiser low-pass per reduced
+# up/down ratio (the filter resample_poly would design itself, stored float32 so the float32 upfirdn
+# path runs: no float64 copy of the signal, and faster), so any upload rate
+# costs linear time whatever the signal length. StreamResampler is the push-mode form: feed
+# consecutive blocks, get back the output they complete; the pieces join into the whole-signal result.
+@functools.lru_cache(maxsize=32)
+def resample_filter(up: int, down: int) -> np.ndarray:
+    """Polyphase anti-alias FIR for up/down (read-only; resample_poly scales its own copy)."""
+    m = max(int(up), int(down))
+    h = firwin(20 * m + 1, 1.0 / m, window=("kaiser", 5.0)).astype(np.float32); h.setflags(write=False)
+    return h
+
+def resample_ratio(sr_in: int, sr_out: int) -> Tuple[int, int]:
+    g = np.gcd(int(sr_in), int(sr_out)); return int(sr_out) // g, int(sr_in) // g
+
+def resample_rate(x: np.ndarray, sr_in: int, sr_out: int) -> np.ndarray:
+    """x from sr_in to sr_out as float32, ceil(len(x)·sr_out/sr_in) samples."""
+    up, down = resample_ratio(sr_in, sr_out)
+    if up == down: return np.asarray(x, np.float32)
+    return resample_poly(np.asarray(x, np.float32), up, down, window=resample_filter(up, down))
+
+class StreamResampler:
+    """Push-mode resample_rate. Each call returns the output samples whose filter support the
+    input so far covers; final=True flushes the rest (the end is zero-padded, as resample_poly)."""
+    def __init__(self, sr_in: int, sr_out: int):
+        self.up, self.down = resample_ratio(sr_in, sr_out)
+        self.h = resample_filter(self.up, self.down) if self.up != self.down else None
+        self.half = 10 * max(self.up, self.down)
+        self.buf = np.zeros(0, np.float32); self.base = 0  # input index of buf[0]
+        self.n_in = 0; self.done = 0                     # input seen, output emitted
+
+    def _start(self, k: int) -> int:
+        """First input sample (a multiple of down, so output offsets stay integral) output k needs."""
+        return max(0, (k * self.down - self.half) // self.up // self.down * self.down)
+
+    def __call__(self, x: np.ndarray, final: bool = False) -> np.ndarray:
+        up, down = self.up, self.down
+        self.buf = np.concatenate([self.buf, np.asarray(x, np.float32)]); self.n_in += len(x)
+        if up == down:
+            out, self.buf = self.buf, np.zeros(0, np.float32); self.base = self.n_in; return out
+        if final: k1 = -(-self.n_in * up // down)
+        else: k1 = max(0, ((self.n_in - 1) * up - self.half) // down + 1)
+        k0 = self.done
+        if k1 <= k0: return np.zeros(0, np.float32)
+        s0 = self._start(k0); s1 = min(self.n_in, ((k1 - 1) * down + self.half) // up + 2)
+        y = resample_poly(self.buf[s0 - self.base:s1 - self.base], up, down, window=self.h)
+        off = s0 * up // down; y = y[k0 - off:k1 - off]
+        self.done = k1
+        keep = self._start(k1); self.buf = self.buf[keep - self.base:]; self.base = keep
+        return y
+
+# ───────────────── filter designs ─────────────────
+@functools.lru_cache(maxsize=128)
+def design_sos(btype: str, order: int, cutoff, sr: int = SR) -> np.ndarray:
+    """Butterworth SOS (cutoff in Hz: a float, or a (lo, hi) tuple for band), designed once per
+    (type, order, cutoff(s), rate); zero-phase use applies the same design. Shared between callers,
+    so never modify it (it stays writeable only because sosfilt's Cython kernel insists)."""
+    return butter(int(order), np.asarray(cutoff, dtype=float) / (sr / 2), btype=btype, output="sos")
+
+@functools.lru_cache(maxsize=128)
+def sos_chain(*stages: Tuple[str, int, Any, int]) -> np.ndarray:
+    """Registry stages fused into one cascade, so one sosfilt pass applies them all."""
+    return np.vstack([design_sos(*st) for st in stages]) if stages else np.zeros((0, 6))
+
+# ───────────────── dropouts ─────────────────
+# Dropout engine shared by every app: events are [start, end) sample spans drawn in one
+# vectorized call (chunk grid or random placement); apply_dropout_events turns them into a
+# per-sample gain mask — depth per event, overlaps compound, optional log-domain ramps of
+# `fade` samples inside each edge — and multiplies it in place, DROPOUT_BLOCK samples at a
+# time so memory stays flat on long inputs and untouched blocks cost nothing.
+DROPOUT_BLOCK = 1 << 16
+
+def dropout_events_grid(n: int, drop_p: float, chunk: int, rng: Optional[np.random.Generator] = None) -> np.ndarray:
+    """Every `chunk`-sample slot dropped with probability drop_p, runs of adjacent slots merged
+    into one event; (k, 2) int64 [start, end)."""
+    hit = np.concatenate([[False], _rng(rng).random(-(-n // chunk)) < drop_p, [False]])
+    edge = np.flatnonzero(hit[1:] != hit[:-1]).astype(np.int64) * chunk
+    return np.stack([edge[0::2], np.minimum(edge[1::2], n)], axis=1)
+
+def dropout_events_random(n: int, count: int, avg_ms: float, jitter_ms: float, min_ms: float, sr: int = SR,
+                          rng: Optional[np.random.Generator] = None, inside: bool = False) -> np.ndarray:
+    """`count` dropouts of normal(avg_ms, jitter_ms) ≥ min_ms at uniform starts (inside: span fits before n)."""
+    rng = _rng(rng)
+    lens = (np.maximum(min_ms, rng.normal(avg_ms, jitter_ms, count)) * sr / 1000.0).astype(np.int64)
+    starts = rng.integers(0, np.maximum(1, n - lens)) if inside else rng.integers(0, max(1, n), count)
+    return np.stack([starts, np.minimum(starts + lens, n)], axis=1)
+
+def apply_dropout_events(y: np.ndarray, events: np.ndarray, depth_db: float, fade: int = 0) -> np.ndarray:
+    """Multiply y in place by the dropout mask of `events`; returns y."""
+    ev = np.asarray(events, dtype=np.int64).reshape(-1, 2)
+    n = len(y); ev = ev[(ev[:, 1] > ev[:, 0]) & (ev[:, 0] < n)]
+    if not len(ev): return y
+    s, e = ev[:, 0], np.minimum(ev[:, 1], n)
+    f = np.minimum(int(fade), (e - s) // 2); r = f > 0; fr = f[r].astype(np.float64)
+    # breakpoints: open-event count steps, level steps (hard edges), slope steps (±1/f ramps)
+    pos = np.concatenate([s, e, s[r] + f[r], e[r] - f[r], [0]])  # trailing 0: segment from the start
+    z = np.zeros(2 * r.sum() + 1)
+    d_cnt = np.concatenate([np.ones(len(s)), -np.ones(len(s)), z])
+    d_lev = np.concatenate([np.where(r, 0.0, 1.0), np.where(r, 0.0, -1.0), z])
+    inv_f = np.where(r, 1.0 / np.maximum(f, 1), 0.0)
+    d_slo = np.concatenate([inv_f, inv_f, -1.0 / fr, -1.0 / fr, [0.0]])
+    u, inv = np.unique(pos, return_inverse=True)
+    cnt = np.cumsum(np.bincount(inv, d_cnt, len(u)))
+    slope = np.cumsum(np.bincount(inv, d_slo, len(u)))
+    lev = np.bincount(inv, d_lev, len(u))
+    seg_len = np.diff(np.append(u, n))
+    before = np.concatenate([[0.0], np.cumsum(lev + slope * seg_len)[:-1]])  # shape just before each segment
+    c0 = before + lev + slope * (1 - u)  # shape(t) = c0 + slope * t inside the segment
+    active = np.rint(cnt) > 0; ramp = active & (slope != 0)
+    g = 10 ** (depth_db / 20.0)
+    gain = np.where(active & ~ramp, np.power(g, np.maximum(c0, 0.0)), 1.0).astype(y.dtype)
+    for b0 in range(int(s.min()) // DROPOUT_BLOCK * DROPOUT_BLOCK, n, DROPOUT_BLOCK):
+        b1 = min(n, b0 + DROPOUT_BLOCK)
+        i0 = max(0, int(np.searchsorted(u, b0, "right")) - 1); i1 = int(np.searchsorted(u, b1))
+        act = np.flatnonzero(active[i0:i1])
+        if not len(act): continue
+        i0, i1 = i0 + act[0], i0 + act[-1] + 1  # multiply only from the first to the last dropped sample
+        st = np.clip(u[i0:i1], b0, b1); a0 = int(st[0]); a1 = int(min(b1, u[i1] if i1 < len(u) else n))
+        ln = np.diff(np.append(st, a1))
+        mask = np.repeat(gain[i0:i1], ln)
+        rs = np.flatnonzero(ramp[i0:i1])
+        if len(rs):
+            rl = ln[rs]; t = np.repeat(st[rs] - np.cumsum(rl) + rl, rl) + np.arange(rl.sum())
+            k = np.repeat(rs + i0, rl)
+            mask[t - a0] = np.power(g, np.maximum(c0[k] + slope[k] * t, 0.0))
+        y[a0:a1] *= mask
+    return y
@@ -9,6 +9,8 @@ import soundfile as sf
 import scipy.signal as sig
 import os
 
+from dsp_core import dropout_events_random, apply_dropout_events, resample_rate, design_sos, sos_chain
+
 # Audio processing constants
 SR = 16000
 AMB_WAV = "assets/city_trimmed.wav"
@@ -79,7 +81,7 @@ def load_wav(path, sr=SR):
     if x.ndim > 1: 
         x = x.mean(1)
     if s != sr: 
-        x = sig.resample(x, int(len(x)*sr/s))
+        x = resample_rate(x, s, sr)
     return x.astype(np.float32)
 
 def save_wav(arr, sr=SR):
@@ -91,21 +93,14 @@ def dropout_fx(x, rate_per_min=0.0, avg_ms=160, jitter_ms=80, depth_db=-35):
     if rate_per_min <= 0:
         return x
     
-    x = x.copy()
     duration_sec = len(x) / SR
     num_dropouts = int(rate_per_min * duration_sec / 60)
     
-    for _ in range(num_dropouts):
-        start_idx = np.random.randint(0, len(x))
-        dropout_ms = max(20, np.random.normal(avg_ms, jitter_ms))
-        dropout_samples = int(dropout_ms * SR / 1000)
-        end_idx = min(start_idx + dropout_samples, len(x))
-        
-        # Apply dropout as gain reduction, not complete silence
-        dropout_gain = 10 ** (depth_db / 20)
-        x[start_idx:end_idx] *= dropout_gain
-    
-    return x
+    # Shared dropout engine (app.py); drawn from the global np.random state like the other effects
+    events = dropout_events_random(len(x), num_dropouts, avg_ms, jitter_ms, 20, SR,
+                                   rng=np.random.default_rng(np.random.randint(1 << 31)))
+    # Apply dropout as gain reduction, not complete silence
+    return apply_dropout_events(x.copy(), events, depth_db)
 
 def bitcrush_fx(x, bits=16):
     if bits >= 16: 
@@ -140,15 +135,10 @@ def compand_fx(x, in_knee=6, ratio=3.0, makeup_db=0, attack_ms=10, release_ms=25
     return y
 
 def bandlimit_fx(x, low_hz=300, high_hz=3400):
-    if low_hz > 50:
-        b, a = sig.butter(4, low_hz / (SR/2), btype='high')
-        x = sig.lfilter(b, a, x)
-    
-    if high_hz < SR // 2:
-        b, a = sig.butter(4, high_hz / (SR/2), btype='low')
-        x = sig.lfilter(b, a, x)
-    
-    return x
+    stages = []
+    if low_hz > 50: stages.append(("high", 4, float(low_hz), SR))
+    if high_hz < SR // 2: stages.append(("low", 4, float(high_hz), SR))
+    return sig.sosfilt(sos_chain(*stages), x) if stages else x
 
 def softclip_fx(x, amount=0.1):
     if amount <= 0:
@@ -184,8 +174,7 @@ def ambience_fx(length, target_lufs=-28, amb_files=None):
     # Fallback: generate synthetic ambience
     noise = np.random.normal(0, 0.01, length)
     # Color the noise to sound more like city ambience
-    b, a = sig.butter(2, [200, 2000], btype='band', fs=SR)
-    colored_noise = sig.lfilter(b, a, noise)
+    colored_noise = sig.sosfilt(design_sos("band", 2, (200.0, 2000.0), SR), noise)
     
     # Normalize to target level
     target_rms = 10 ** (target_lufs / 20)
@@ -594,8 +583,7 @@ def process_audio_local(voice_path: str, preset_name: str, seed: Any, *control_v
         device_ir_mix = chain.get("device_ir", {}).get("mix", 0.0)
         if device_ir_mix > 0:
             # Simple telephone-like filtering
-            b, a = sig.butter(2, [400, 3000], btype='band', fs=SR)
-            ir_processed = sig.lfilter(b, a, mix)
+            ir_processed = sig.sosfilt(design_sos("band", 2, (400.0, 3000.0), SR), mix)
             mix = mix * (1 - device_ir_mix) + ir_processed * device_ir_mix
         
         # Normalize output
@@ -0,0 +1,186 @@
+"""voicelab-batch: render dry reads through Bojan presets across a process pool.
+
+Usage:
+    python voicelab_batch.py "reads/*.wav" -o renders/                      # every preset
+    python voicelab_batch.py "reads/*.wav" -p "🚦 Street Caller" -p "📶 Spotty Service" -o renders/
+    python voicelab_batch.py --manifest jobs.jsonl -o renders/ --workers 8
+    python voicelab_batch.py "reads/*.wav" -o renders/ --resume             # skip jobs already done
+    python voicelab_batch.py "reads/*.wav" -o renders/ --seed 42            # reproducible takes
+
+Manifest: JSONL lines {"input": path, "presets": [names]} ("preset": name also works), or a
+plain list of input paths, one per line. Outputs are <out>/<input stem>__<preset>__<dir hash>.wav
+(the hash of the input's directory keeps same-named reads from different folders apart); one JSON
+record per render is appended to <out>/report.jsonl as it finishes, which --resume reads back.
+With --seed every job renders with that seed, so a rerun reproduces the same takes bit for bit.
+With --profile each record also carries the render's per-stage wall/CPU/peak-allocation profile.
+Each worker process keeps its own decoded-asset / IR caches warm for the whole run.
+"""
+import argparse, glob, hashlib, json, os, re, shutil, sys, time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import soundfile as sf
+
+import app
+
+REPORT = "report.jsonl"
+APP_DIR = os.path.dirname(os.path.abspath(app.__file__))  # preset asset paths are relative to it
+
+
+def preset_slug(name: str) -> str:
+    return re.sub(r"[^a-z0-9]+", "_", name.lower()).strip("_") or "preset"
+
+
+def output_name(input_path: str, preset: str) -> str:
+    """<stem>__<preset>__<8 hex of the input's absolute directory>.wav"""
+    path = os.path.abspath(input_path)
+    tag = hashlib.sha1(os.path.dirname(path).encode("utf-8")).hexdigest()[:8]
+    return f"{os.path.splitext(os.path.basename(path))[0]}__{preset_slug(preset)}__{tag}.wav"
+
+
+def job_key(input_path: str, preset: str) -> str:
+    return f"{os.path.abspath(input_path)}|{preset}"
+
+
+def load_jobs(inputs, manifest, presets):
+    """[(input, preset)] from glob patterns and/or a manifest, inputs made absolute."""
+    pairs = []
+    for pat in inputs or []:
+        hits = sorted(glob.glob(pat)) or ([pat] if os.path.exists(pat) else [])
+        if not hits: print(f"warning: no input matches {pat!r}", file=sys.stderr)
+        pairs += [(p, None) for p in hits]
+    if manifest:
+        with open(manifest, encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line or line.startswith("#"): continue
+                if line.startswith("{"):
+                    rec = json.loads(line)
+                    names = rec.get("presets") or ([rec["preset"]] if rec.get("preset") else [None])
+                    pairs += [(rec["input"], n) for n in names]
+                else:
+                    pairs.append((line, None))
+    jobs = []
+    for path, name in pairs:
+        for preset in ([name] if name else presets):
+            jobs.append((os.path.abspath(path), preset))
+    return list(dict.fromkeys(jobs))
+
+
+def read_done(report_path: str) -> set:
+    done = set()
+    if not os.path.exists(report_path): return done
+    with open(report_path, encoding="utf-8") as f:
+        for line in f:
+            try: rec = json.loads(line)
+            except ValueError: continue  # torn last line from an interrupted run
+            if rec.get("ok") and os.path.exists(rec.get("output", "")):
+                done.add(job_key(rec["input"], rec["preset"]))
+    return done
+
+
+# ───────────────── worker side ─────────────────
+def _warm_worker(presets, stream_min_s, profile=False):
+    """Pool initializer: resolve preset assets and pull them into this worker's caches once."""
+    os.chdir(APP_DIR)
+    if stream_min_s is not None: app.STREAM_MIN_S = float(stream_min_s)
+    if profile: app.set_profiling(True)
+    for name in presets:
+        cfg = app.BOJAN_PRESET_CONFIGS.get(name, {})
+        for p in app._coerce_paths_list(cfg.get("bg_file")):
+            app.open_bed(p)  # header probe only: renders decode just their excerpt
+        for key in ("traffic_files", "baby_files", "dog_files"):
+            for p in app._expand_files_with_warnings(app._coerce_paths_list(cfg.get(key)))[0]:
+                app.load_event_cached(p)
+        for key in ("room_ir_file", "bg_ir_file", "handset_ir_file"):
+            p = app._safe_file(cfg.get(key))
+            if p:
+                ir = app.ir_load_cached(p)
+                if len(ir) >= 8: app.ir_partitions_cached(p, app._ols_block(len(ir)))
+
+
+def _render(input_path, preset, output, normalize, seed=None):
+    t0 = time.perf_counter()
+    rec = {"input": input_path, "preset": preset, "output": output, "worker": os.getpid(), "seed": seed}
+    try:
+        tmp, status = app.process_bojan_preset(input_path, preset, normalize, seed)
+        rec["status"] = status
+        if app.last_render_profile(): rec["profile"] = app.last_render_profile()
+        if not tmp: raise RuntimeError(status)
+        shutil.move(tmp, output)
+        rec["audio_s"] = round(sf.info(output).duration, 3)  # the render keeps the input's length; any input format
+        rec["ok"] = True
+    except Exception as e:
+        rec.update(ok=False, error=f"{type(e).__name__}: {e}")
+    rec["seconds"] = round(time.perf_counter() - t0, 3)
+    if rec.get("ok") and rec["seconds"] > 0: rec["rtf"] = round(rec["audio_s"] / rec["seconds"], 2)
+    return rec
+
+
+# ───────────────── driver ─────────────────
+def run(jobs, out_dir, workers=None, resume=False, normalize=None, stream_min_s=None, seed=None, profile=False,
+        log=print):
+    """Render jobs, appending to out_dir/report.jsonl. Returns the summary dict."""
+    os.makedirs(out_dir, exist_ok=True)
+    report_path = os.path.join(out_dir, REPORT)
+    done = read_done(report_path) if resume else set()
+    todo = [(i, p) for i, p in jobs if job_key(i, p) not in done]
+    log(f"{len(jobs)} jobs, {len(jobs) - len(todo)} already done, {len(todo)} to render")
+    presets = sorted({p for _, p in todo})
+    n_ok = n_fail = 0; audio_s = 0.0
+    t0 = time.perf_counter()
+    with open(report_path, "a" if resume else "w", encoding="utf-8") as rep, \
+         ProcessPoolExecutor(max_workers=workers, initializer=_warm_worker, initargs=(presets, stream_min_s, profile)) as pool:
+        futs = [pool.submit(_render, i, p, os.path.join(os.path.abspath(out_dir), output_name(i, p)), normalize, seed)
+                for i, p in todo]
+        try:
+            for k, fut in enumerate(as_completed(futs), 1):
+                rec = fut.result()
+                rep.write(json.dumps(rec, ensure_ascii=False) + "\n"); rep.flush()
+                if rec["ok"]: n_ok += 1; audio_s += rec["audio_s"]
+                else: n_fail += 1
+                log(f"[{k}/{len(todo)}] {'ok  ' if rec['ok'] else 'FAIL'} {os.path.basename(rec['input'])} × "
+                    f"{rec['preset']}  {rec['seconds']:.1f}s{'' if rec['ok'] else '  ' + rec['error']}")
+        except KeyboardInterrupt:
+            for f in futs: f.cancel()
+            log("interrupted — rerun with --resume to continue")
+            raise
+    wall = time.perf_counter() - t0
+    summary = {"rendered": n_ok, "failed": n_fail, "skipped": len(jobs) - len(todo), "wall_s": round(wall, 2),
+               "renders_per_min": round(n_ok / wall * 60.0, 2) if wall > 0 else 0.0,
+               "realtime_factor": round(audio_s / wall, 2) if wall > 0 else 0.0}
+    log(f"{n_ok} rendered, {n_fail} failed in {wall:.1f}s — "
+        f"{summary['renders_per_min']:.1f} renders/min, {summary['realtime_factor']:.1f}x realtime")
+    return summary
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(prog="voicelab-batch", description=__doc__,
+                                 formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("inputs", nargs="*", help="input files or glob patterns")
+    ap.add_argument("-m", "--manifest", help="JSONL or path-per-line manifest")
+    ap.add_argument("-p", "--preset", action="append", dest="presets",
+                    help="preset name (repeatable; default: every preset)")
+    ap.add_argument("-o", "--out", required=True, help="output directory (report.jsonl lives here)")
+    ap.add_argument("-j", "--workers", type=int, default=None, help="worker processes (default: CPU count)")
+    ap.add_argument("--resume", action="store_true", help="skip jobs recorded ok in the existing report")
+    norm = ap.add_mutually_exclusive_group()
+    norm.add_argument("--normalize", dest="normalize", action="store_const", const=True, help="force LUFS normalization")
+    norm.add_argument("--no-normalize", dest="normalize", action="store_const", const=False, help="force peak normalization")
+    ap.add_argument("--stream-min-s", type=float, default=None,
+                    help="stream-render inputs at least this long (see VLAB_STREAM_MIN_S)")
+    ap.add_argument("--seed", type=int, default=None, help="render seed for reproducible output (default: fresh per render)")
+    ap.add_argument("--profile", action="store_true", help="record per-stage timings in report.jsonl (see VLAB_PROFILE)")
+    opts = ap.parse_args(argv)
+    presets = opts.presets or list(app.BOJAN_PRESET_CONFIGS)
+    unknown = [p for p in presets if p not in app.BOJAN_PRESET_CONFIGS]
+    if unknown: ap.error(f"unknown preset: {', '.join(unknown)} (have: {', '.join(app.BOJAN_PRESET_CONFIGS)})")
+    if not opts.inputs and not opts.manifest: ap.error("give input files/globs or --manifest")
+    jobs = load_jobs(opts.inputs, opts.manifest, presets)
+    if not jobs: ap.error("no inputs found")
+    summary = run(jobs, opts.out, opts.workers, opts.resume, opts.normalize, opts.stream_min_s, opts.seed,
+                  opts.profile)
+    return 1 if summary["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())